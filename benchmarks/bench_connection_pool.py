@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Compare per-request latency with and without pooled keep-alive connections.
+
+Runs against the local stub server, which can simulate the handshake cost a
+fresh connection pays (``--handshake-ms``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+for path in (PROJECT_ROOT, SRC_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.stub_server import StubOCRServer
+from screenshot_ocr.transport import HTTPTransport
+
+
+def run_case(server: StubOCRServer, transport: HTTPTransport, requests_count: int) -> list[float]:
+    client = SiliconFlowOCR(api_key="sk-bench", base_url=server.base_url, transport=transport)
+    payload = client._build_payload("")
+    latencies: list[float] = []
+    for _ in range(requests_count):
+        started_at = time.perf_counter()
+        client._request(payload)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    transport.close()
+    return latencies
+
+
+def format_stats(name: str, latencies: list[float], connections: int) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{name:<10} mean={statistics.mean(latencies):7.2f}ms "
+        f"p50={statistics.median(latencies):7.2f}ms p95={p95:7.2f}ms connections={connections}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=150.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with StubOCRServer(handshake_delay=args.handshake_ms / 1000, latency=args.latency_ms / 1000) as server:
+        cases = [
+            ("no-pool", HTTPTransport(keep_alive=False)),
+            ("pooled", HTTPTransport()),
+        ]
+        for name, transport in cases:
+            before = server.connection_count
+            latencies = run_case(server, transport, args.requests)
+            print(format_stats(name, latencies, server.connection_count - before))
+
+
+if __name__ == "__main__":
+    main()
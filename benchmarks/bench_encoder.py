@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare encode time against payload bytes for each upload encoding.
+
+Every image in ``tests/`` (``*.png`` and ``*.jpg``) is encoded with each
+method in :data:`screenshot_ocr.encoder.ENCODE_METHODS`, as a JPEG and in
+``auto`` mode, plus passed through when the file qualifies. ``send`` adds
+the time to upload the payload at ``--bandwidth`` Mbit/s, which is what
+``auto`` minimises.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import io
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+for path in (PROJECT_ROOT, SRC_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from PIL import Image
+
+from screenshot_ocr.encoder import AUTO, ENCODE_METHODS, JPEG_METHOD, EncodedImage, ImageEncoder
+
+
+def find_images() -> list[str]:
+    tests_dir = os.path.join(PROJECT_ROOT, "tests")
+    return sorted(glob.glob(os.path.join(tests_dir, "*.png")) + glob.glob(os.path.join(tests_dir, "*.jpg")))
+
+
+def time_encode(encode, repeat: int) -> tuple[float, EncodedImage]:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        encoded = encode()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings), encoded
+
+
+def encode_jpeg(image: Image.Image) -> EncodedImage:
+    buffer = io.BytesIO()
+    image.save(buffer, format=JPEG_METHOD.format, **JPEG_METHOD.options)
+    return EncodedImage(buffer.getbuffer(), JPEG_METHOD.mime_type, image.size, JPEG_METHOD.name)
+
+
+def cases(image_path: str, upload_bytes_per_second: float):
+    with Image.open(image_path) as opened:
+        image = opened.convert("RGB")
+    encoder = ImageEncoder(AUTO, upload_bytes_per_second=upload_bytes_per_second)
+    if encoder._pass_through(image_path) is not None:
+        yield "passthrough", lambda: encoder._pass_through(image_path)
+    for name in ENCODE_METHODS:
+        yield name, lambda name=name: ImageEncoder(name, passthrough=False).encode(image)
+    yield JPEG_METHOD.name, lambda: encode_jpeg(image)
+    yield AUTO, lambda: encoder.encode(image_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="*", help="images to encode (default: tests/*.png and tests/*.jpg)")
+    parser.add_argument("--bandwidth", type=float, default=10.0, help="upload bandwidth in Mbit/s")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    upload_bytes_per_second = args.bandwidth * 1_000_000 / 8
+    for image_path in args.images or find_images():
+        with Image.open(image_path) as opened:
+            print(f"{os.path.basename(image_path)}: {opened.format} {opened.mode} {opened.size[0]}x{opened.size[1]}")
+        for name, encode in cases(image_path, upload_bytes_per_second):
+            seconds, encoded = time_encode(encode, args.repeat)
+            send = seconds + len(encoded.data) / upload_bytes_per_second
+            label = f"{name} ({encoded.method})" if name == AUTO else name
+            print(
+                f"  {label:<28} {encoded.mime_type:<11} encode={seconds * 1000:7.1f}ms "
+                f"bytes={len(encoded.data) / 1024:8.1f}KB send={send * 1000:7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
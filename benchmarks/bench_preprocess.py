@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Accuracy against upload size for each preprocessing setting, offline.
+
+Every sample image is recognised once per variant in :data:`VARIANTS`
+through the real client, replaying responses from a cassette. The
+``original`` variant is the reference: each other variant reports how many
+of its characters it still recognises (in order, whitespace ignored), the
+characters it lost and its payload size relative to the reference.
+
+Record the cassette against the real service once with ``--record
+--base-url ... --api-key ...``; later runs replay it. Without ``--base-url``
+the cassette is recorded from the local stub server, which answers every
+image with the same text, so that only exercises the pipeline and every
+variant scores 100%.
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+for path in (PROJECT_ROOT, SRC_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from screenshot_ocr.cassette import Cassette, RecordingTransport, ReplayTransport
+from screenshot_ocr.encoder import ImageEncoder
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.preprocess import PreprocessOptions
+from screenshot_ocr.stub_server import StubOCRServer
+
+SAMPLE_IMAGES = [os.path.join(PROJECT_ROOT, "tests", name) for name in ("test2.png", "test3.jpg", "tset.png")]
+DEFAULT_CASSETTE = os.path.join(PROJECT_ROOT, "benchmarks", "cassettes", "preprocess.json")
+REPLAY_BASE_URL = "http://replay.invalid/v1"
+REFERENCE = "original"
+
+VARIANTS: dict[str, PreprocessOptions | None] = {
+    REFERENCE: None,
+    "gray": PreprocessOptions(grayscale=True),
+    "levels-4": PreprocessOptions(levels=4),
+    "binary": PreprocessOptions(levels=2),
+    "x20-gray": PreprocessOptions(target_x_height=20, grayscale=True),
+    "x16-gray": PreprocessOptions(target_x_height=16, grayscale=True),
+    "x16-levels-4": PreprocessOptions(target_x_height=16, levels=4),
+    "x16-binary": PreprocessOptions(target_x_height=16, levels=2),
+    "x12-levels-4": PreprocessOptions(target_x_height=12, levels=4),
+    "x12-binary": PreprocessOptions(target_x_height=12, levels=2),
+}
+
+
+def character_recall(reference: str, hypothesis: str) -> tuple[float, int]:
+    """Fraction of ``reference`` characters found in order in ``hypothesis``, and how many are missing."""
+    reference = "".join(reference.split())
+    hypothesis = "".join(hypothesis.split())
+    if not reference:
+        return 1.0, 0
+    matcher = difflib.SequenceMatcher(None, reference, hypothesis, autojunk=False)
+    matched = sum(block.size for block in matcher.get_matching_blocks())
+    return matched / len(reference), len(reference) - matched
+
+
+def make_client(transport, base_url: str, api_key: str, options: PreprocessOptions | None) -> SiliconFlowOCR:
+    return SiliconFlowOCR(
+        api_key=api_key,
+        base_url=base_url,
+        transport=transport,
+        encoder=ImageEncoder(preprocess=options),
+    )
+
+
+def record(cassette_path: str, base_url: str | None, api_key: str) -> None:
+    def run(url: str, key: str) -> None:
+        transport = RecordingTransport(cassette_path)
+        for options in VARIANTS.values():
+            client = make_client(transport, url, key, options)
+            for image_path in SAMPLE_IMAGES:
+                client.recognize(image_path)
+
+    if base_url:
+        run(base_url, api_key)
+        return
+    print("no --base-url: recording from the stub server, recall will be 100% for every variant")
+    with StubOCRServer(content="第一行\n第二行\n第三行") as server:
+        run(server.base_url, "sk-bench")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--record", action="store_true", help="re-record even if the cassette exists")
+    parser.add_argument("--base-url", help="record from this server instead of the stub")
+    parser.add_argument("--api-key", default=os.environ.get("SILICONFLOW_API_KEY", ""))
+    parser.add_argument("--min-recall", type=float, default=0.995, help="recall a variant must keep to be suggested")
+    parser.add_argument("--verbose", action="store_true", help="print every image, not just the totals")
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(args.cassette):
+        if os.path.exists(args.cassette):
+            os.remove(args.cassette)
+        record(args.cassette, args.base_url, args.api_key)
+
+    transport = ReplayTransport(Cassette(args.cassette))
+    texts: dict[tuple[str, str], str] = {}
+    sizes: dict[tuple[str, str], int] = {}
+    encode_seconds: dict[str, float] = {}
+    for name, options in VARIANTS.items():
+        client = make_client(transport, REPLAY_BASE_URL, "sk-bench", options)
+        encode_seconds[name] = 0.0
+        for image_path in SAMPLE_IMAGES:
+            started_at = time.perf_counter()
+            encoded = client.encoder.encode(image_path)
+            encode_seconds[name] += time.perf_counter() - started_at
+            sizes[name, image_path] = len(encoded.data)
+            texts[name, image_path] = "\n".join(client.recognize(image_path))
+
+    reference_bytes = sum(sizes[REFERENCE, image_path] for image_path in SAMPLE_IMAGES)
+    suggestion = None
+    print(f"{'variant':<14} {'bytes':>10} {'smaller':>8} {'recall':>8} {'lost':>6} {'encode':>9}")
+    for name in VARIANTS:
+        total_bytes = sum(sizes[name, image_path] for image_path in SAMPLE_IMAGES)
+        matched = lost = characters = 0
+        for image_path in SAMPLE_IMAGES:
+            reference = texts[REFERENCE, image_path]
+            recall, missing = character_recall(reference, texts[name, image_path])
+            length = len("".join(reference.split()))
+            characters += length
+            matched += length - missing
+            lost += missing
+            if args.verbose:
+                print(
+                    f"  {os.path.basename(image_path):<12} {name:<14} {sizes[name, image_path] / 1024:8.1f}KB "
+                    f"recall={recall:.3f} lost={missing}"
+                )
+        recall = matched / characters if characters else 1.0
+        print(
+            f"{name:<14} {total_bytes / 1024:8.1f}KB {reference_bytes / max(total_bytes, 1):7.1f}x "
+            f"{recall:8.3f} {lost:6d} {encode_seconds[name] * 1000:7.0f}ms"
+        )
+        if recall >= args.min_recall and (suggestion is None or total_bytes < suggestion[1]):
+            suggestion = (name, total_bytes)
+
+    if suggestion is not None:
+        print(f"\nsmallest variant with recall >= {args.min_recall:.3f}: {suggestion[0]} {VARIANTS[suggestion[0]]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""End-to-end OCR throughput and latency over the sample images, offline.
+
+Replays a cassette through the real client pipeline (image encoding, request
+body, response parsing), optionally sleeping for the recorded latencies.
+When the cassette does not exist it is recorded first: against
+``--base-url`` with ``--api-key`` (or ``SILICONFLOW_API_KEY``) for real
+traffic, otherwise against the local stub server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+for path in (PROJECT_ROOT, SRC_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from screenshot_ocr.cassette import Cassette, RecordingTransport, ReplayTransport
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.stub_server import StubOCRServer
+
+SAMPLE_IMAGES = [os.path.join(PROJECT_ROOT, "tests", name) for name in ("test2.png", "test3.jpg", "tset.png")]
+DEFAULT_CASSETTE = os.path.join(PROJECT_ROOT, "benchmarks", "cassettes", "sample_images.json")
+REPLAY_BASE_URL = "http://replay.invalid/v1"
+
+
+def record(cassette_path: str, base_url: str | None, api_key: str, stub_latency: float) -> None:
+    if base_url:
+        client = SiliconFlowOCR(api_key=api_key, base_url=base_url, transport=RecordingTransport(cassette_path))
+        for image_path in SAMPLE_IMAGES:
+            client.recognize(image_path)
+        return
+
+    with StubOCRServer(content="第一行\n第二行\n第三行", latency=stub_latency) as server:
+        client = SiliconFlowOCR(api_key="sk-bench", base_url=server.base_url, transport=RecordingTransport(cassette_path))
+        for image_path in SAMPLE_IMAGES:
+            client.recognize(image_path)
+
+
+def run_worker(transport: ReplayTransport, rounds: int) -> list[float]:
+    # One client per worker so identical images are not coalesced in flight.
+    client = SiliconFlowOCR(api_key="sk-bench", base_url=REPLAY_BASE_URL, transport=transport)
+    latencies: list[float] = []
+    for _ in range(rounds):
+        for image_path in SAMPLE_IMAGES:
+            started_at = time.perf_counter()
+            client.recognize(image_path)
+            latencies.append((time.perf_counter() - started_at) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--record", action="store_true", help="re-record even if the cassette exists")
+    parser.add_argument("--base-url", help="record from this server instead of the stub")
+    parser.add_argument("--api-key", default=os.environ.get("SILICONFLOW_API_KEY", ""))
+    parser.add_argument("--stub-latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-scale", type=float, default=0.0, help="fraction of recorded latency to replay")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(args.cassette):
+        if os.path.exists(args.cassette):
+            os.remove(args.cassette)
+        record(args.cassette, args.base_url, args.api_key, args.stub_latency_ms / 1000)
+
+    cassette = Cassette(args.cassette)
+    transport = ReplayTransport(cassette, latency_scale=args.latency_scale)
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [
+            executor.submit(run_worker, transport, args.rounds)
+            for _ in range(max(1, args.concurrency))
+        ]
+        latencies = [latency for future in futures for latency in future.result()]
+    elapsed = time.perf_counter() - started_at
+
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"cassette: {len(cassette)} recordings, latency scale {args.latency_scale}")
+    print(
+        f"images={len(latencies)} throughput={len(latencies) / elapsed:6.2f}/s "
+        f"mean={statistics.mean(latencies):7.1f}ms p50={statistics.median(latencies):7.1f}ms p95={p95:7.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
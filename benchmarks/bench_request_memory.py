@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare peak memory of building a request body with and without streaming.
+
+``dict`` is the old path: base64 string, data URL, payload dict and the JSON
+bytes ``requests`` serialises from it. ``streamed`` hands ``requests`` a
+:class:`StreamingJSONBody` and consumes it the way the connection does.
+Peak allocations are measured with ``tracemalloc``; the PNG bytes both paths
+start from are excluded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import os
+import sys
+import tracemalloc
+from typing import Callable
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+for path in (PROJECT_ROOT, SRC_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import numpy as np
+from PIL import Image
+from requests.models import PreparedRequest
+
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+
+
+def load_png_bytes(image_path: str | None, width: int, height: int) -> bytes:
+    if image_path:
+        image = Image.open(image_path).convert("RGB")
+    else:
+        # Noise compresses badly, which makes it a worst case for PNG size.
+        pixels = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def send_dict(client: SiliconFlowOCR, png_bytes: bytes) -> int:
+    image_base64 = base64.b64encode(png_bytes).decode("utf-8")
+    payload = client._build_payload(image_base64)
+    request = PreparedRequest()
+    request.prepare_headers(client.headers)
+    request.prepare_body(data=None, files=None, json=payload)
+    return len(request.body)
+
+
+def send_streamed(client: SiliconFlowOCR, png_bytes: bytes) -> int:
+    body = client._build_body(png_bytes)
+    request = PreparedRequest()
+    request.prepare_headers(client.headers)
+    request.prepare_body(data=body, files=None)
+    return sum(len(chunk) for chunk in request.body)
+
+
+def measure(func: Callable[[SiliconFlowOCR, bytes], int], client: SiliconFlowOCR, png_bytes: bytes) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        size = func(client, png_bytes)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", help="measure this image instead of a synthetic capture")
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    args = parser.parse_args()
+
+    png_bytes = load_png_bytes(args.image, args.width, args.height)
+    client = SiliconFlowOCR(api_key="sk-bench")
+    print(f"PNG size: {len(png_bytes) / 1024 / 1024:.1f}MB")
+    for name, func in (("dict", send_dict), ("streamed", send_streamed)):
+        size, peak = measure(func, client, png_bytes)
+        print(f"{name:<10} body={size / 1024 / 1024:6.1f}MB peak={peak / 1024 / 1024:6.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
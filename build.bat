@@ -39,6 +39,7 @@ REM Build the EXE with hidden imports and config directory
     --hidden-import=PIL.ImageDraw ^
     --hidden-import=PIL.ImageFont ^
     --hidden-import=PIL.ImageTk ^
+    --hidden-import=numpy ^
     --hidden-import=pyperclip ^
     --hidden-import=keyboard ^
     --hidden-import=pystray ^
@@ -47,6 +48,7 @@ REM Build the EXE with hidden imports and config directory
     --hidden-import=plyer.platforms.win ^
     --hidden-import=plyer.platforms.win.notification ^
     --hidden-import=screenshot_ocr ^
+    --exclude-module=aiohttp ^
     --add-binary "D:\program\BIO\pymol\Library\bin\ffi-8.dll;." ^
     --add-binary "D:\program\BIO\pymol\Library\bin\libcrypto-3-x64.dll;." ^
     --add-binary "D:\program\BIO\pymol\Library\bin\libssl-3-x64.dll;." ^
@@ -36,11 +36,13 @@ REM Build the EXE with console window (remove --windowed for debugging)
     --hidden-import=PIL.ImageDraw ^
     --hidden-import=PIL.ImageFont ^
     --hidden-import=PIL.ImageTk ^
+    --hidden-import=numpy ^
     --hidden-import=pyperclip ^
     --hidden-import=keyboard ^
     --hidden-import=pystray ^
     --hidden-import=plyer ^
     --hidden-import=screenshot_ocr ^
+    --exclude-module=aiohttp ^
     --add-binary "D:\program\BIO\pymol\Library\bin\ffi-8.dll;." ^
     --add-binary "D:\program\BIO\pymol\Library\bin\libcrypto-3-x64.dll;." ^
     --add-binary "D:\program\BIO\pymol\Library\bin\libssl-3-x64.dll;." ^
@@ -10,7 +10,89 @@ class OCRConfig:
     API_KEY = ""  # 用户需要自行配置
     SERVER_URL = "https://api.siliconflow.cn/v1"
     MODEL_NAME = "PaddlePaddle/PaddleOCR-VL-1.5"
+    # OCR 后端: "vllm-server"（远程 HTTP 服务）、"rapidocr"（本地 CPU 识别，需 pip install rapidocr_onnxruntime）、
+    # "hybrid"（小截图本地识别、其余走远程；未安装本地引擎时全部走远程）
     BACKEND = "vllm-server"
+    # hybrid 模式下本地识别的最大截图面积（像素）
+    LOCAL_MAX_AREA = 200_000
+
+    # 额外的 OpenAI 兼容端点（自建 vLLM 镜像等），用于故障转移和按延迟负载均衡。
+    # 每项格式: {"name": "mirror-1", "base_url": "http://host:8000/v1",
+    #           "model": "PaddlePaddle/PaddleOCR-VL", "api_key": ""}
+    # 填写 model 的端点总是使用自己的模型名；省略时使用按截图选择的模型或 MODEL_NAME
+    ENDPOINTS: list[dict[str, str]] = []
+
+    # 按截图特征选择模型（面积像素、估计行数、墨迹密度）。各模型先按列表顺序各试用几次，
+    # 之后在可用的模型中选择在线学习到的预计延迟最短者。为空时所有截图都使用 MODEL_NAME。
+    # 示例: [{"model": "轻量模型名", "max_area": 300000, "max_lines": 3},
+    #        {"model": MODEL_NAME}]
+    MODEL_ROUTES: list[dict[str, object]] = []
+
+    # 流式识别：逐行返回结果，边识别边更新状态浮窗和剪贴板
+    STREAM_RESULTS = True
+    # 流式识别时两次写入剪贴板的最小间隔（秒），识别完成时总会写入完整结果
+    STREAM_CLIPBOARD_INTERVAL = 0.5
+
+    # HTTP 连接池配置（保持长连接，避免每次识别重新握手）
+    HTTP_POOL_CONNECTIONS = 2
+    HTTP_POOL_MAXSIZE = 8
+    HTTP_KEEP_ALIVE = True
+
+    # 连接预热：按下热键/打开框选窗口时提前建立连接，松开鼠标即可直接上传
+    PREWARM_CONNECTION = True
+    PREWARM_PROBE = False  # 预热时额外发送一个轻量请求 (GET /models)
+    # 空闲保活：最近 HEARTBEAT_MAX_IDLE 秒内用过 OCR 时，每 HEARTBEAT_INTERVAL 秒发送一次心跳（0 表示关闭）
+    HEARTBEAT_INTERVAL = 25
+    HEARTBEAT_MAX_IDLE = 600
+
+    # 自适应请求预算：根据历史请求（截图面积、墨迹密度 -> 输出 token 数和延迟）在线拟合，
+    # 为每次请求设置 max_tokens、连接/读取超时和总截止时间，后端卡住时尽快失败
+    ADAPTIVE_REQUEST_BUDGET = True
+    REQUEST_CONNECT_TIMEOUT = 5
+    REQUEST_DEADLINE = 60  # 单次识别（含重试）的最长时间（秒）
+
+    # 图片编码：已是 RGB/灰度的 PNG、JPEG 文件原样上传；其余按编码方式压缩
+    # "auto" 根据上传带宽在编码耗时和上传字节数之间权衡，也可固定为 "png-fast"、"png" 或 "webp-lossless"
+    IMAGE_ENCODING = "auto"
+    UPLOAD_BANDWIDTH_MBPS = 10  # 估计的上传带宽（Mbit/s）
+
+    # 上传前预处理：缩放到目标 x-height（像素，中文为整字高度）、转灰度、量化灰阶（2 为二值化，0 不量化）
+    # 会改变上传的图片，先用 benchmarks/bench_preprocess.py 对照真实服务校准后再开启
+    IMAGE_PREPROCESS = False
+    PREPROCESS_X_HEIGHT = 16
+    PREPROCESS_GRAYSCALE = True
+    PREPROCESS_LEVELS = 0
+
+    # 识别前分析截图内容：没有文字的截图直接返回空结果，不发送请求；大片空白边距先裁掉再上传
+    SKIP_BLANK_CAPTURES = True
+    TRIM_CAPTURE_MARGINS = True
+
+    # 大截图分块识别：高于 TILE_MAX_HEIGHT 或宽于 TILE_MAX_WIDTH（像素）的截图沿空白处切成相互重叠的块，
+    # 最多 TILE_CONCURRENCY 块并发识别，再按阅读顺序拼接并去掉重叠区域的重复行
+    TILE_LARGE_CAPTURES = True
+    TILE_MAX_HEIGHT = 2048
+    TILE_MAX_WIDTH = 2560
+    TILE_OVERLAP = 96
+    TILE_CONCURRENCY = 4
+
+    # 对冲请求：请求超过近期 p95 延迟仍未返回时，额外发送一个副本并取先返回者
+    HEDGE_REQUESTS = False
+    HEDGE_PERCENTILE = 0.95
+    HEDGE_BUDGET_RATIO = 0.1  # 对冲请求最多占总请求数的比例
+
+    # 用量统计：记录每次请求的 token、上传字节数和延迟（data/usage.jsonl）
+    # 查看汇总: python -m screenshot_ocr.usage --day 2026-01-01
+    USAGE_LEDGER = True
+    # token 配额（0 表示不限制）：接近每分钟配额时自动放慢请求，超出每日配额时停止请求
+    TOKENS_PER_MINUTE = 0
+    TOKENS_PER_DAY = 0
+
+    # 离线队列：网络/API 不可用导致识别失败时保存截图（data/spool/），
+    # 服务恢复后按并发上限批量补识别，结果追加到 data/spool/results.txt 并通知
+    # （不写剪贴板，以免覆盖刚识别的截图）
+    JOB_SPOOL = True
+    SPOOL_CONCURRENCY = 2
+    SPOOL_DRAIN_INTERVAL = 30  # 检查服务是否恢复的间隔（秒）
 
     # 路径配置
     INPUT_DIR = "./images/input"
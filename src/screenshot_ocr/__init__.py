@@ -9,8 +9,33 @@ from .config import (
     save_app_config,
 )
 from .app import OCRService
-from .capture import capture_region_to_temp_file, delete_file_quietly, save_image_to_temp_file
+from .atlas import AtlasOCR, pack_atlases
+from .backends import (
+    BackendCapabilities,
+    FakeOCRBackend,
+    HybridOCRBackend,
+    LocalOCRBackend,
+    OCRBackend,
+    available_backends,
+    create_backend,
+    register_backend,
+)
+from .budget import RequestBudget, RequestBudgetModel
+from .cassette import Cassette, RecordingTransport, ReplayTransport
+from .capture import (
+    capture_region,
+    capture_region_to_temp_file,
+    capture_regions,
+    delete_file_quietly,
+    save_image_to_temp_file,
+)
+from .content import CaptureFilter, ContentAnalysis, analyze_content
+from .encoder import EncodedImage, ImageEncoder
+from .endpoints import Endpoint, EndpointPool
+from .errors import CircuitOpenError, OCRRequestError
+from .hedging import HedgeCancel, HedgePolicy, RequestHedger
 from .hotkeys import DEFAULT_HOTKEY, HotkeyListener, SUPPORTED_HOTKEYS, normalize_hotkey
+from .image_features import ImageFeatures, compute_image_features
 from .logging_utils import log_debug, log_error, log_info, log_ok, log_warn
 from .main import main
 from .notifier import (
@@ -20,11 +45,30 @@ from .notifier import (
     build_success_message,
     show_notification,
 )
-from .ocr_client import PaddleOCRVL, SiliconFlowOCR, extract_text_from_prediction
+from .ocr_client import (
+    AsyncSiliconFlowOCR,
+    MultiEndpointOCR,
+    PaddleOCRVL,
+    RemoteOCRBackend,
+    SiliconFlowOCR,
+    extract_text_from_prediction,
+)
+from .preprocess import PreprocessOptions, preprocess_image
+from .prewarm import ConnectionWarmer, HeartbeatPolicy
+from .repetition import RepetitionGuard
+from .request_body import StreamingJSONBody
+from .results import OCRResult, TextLine
+from .retry import CircuitBreaker, RetryPolicy
+from .routing import ModelRoute, ModelRouter
+from .spool import JobSpool, SpoolDrainer
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .tiling import TiledOCRBackend, TilePolicy, merge_overlap, plan_tiles
+from .transport import HTTPTransport
 from .tray_app import HotkeyOCR
 from .ui_status import StatusToast
 from .ui_selection import RegionSelector, normalize_region
 from .ui_tray import create_tray_icon, create_tray_icon_image
+from .usage import QuotaExceededError, TokenThrottle, UsageLedger, UsageRecord
 
 __all__ = [
     "OCRService",
@@ -37,7 +81,9 @@ __all__ = [
     "get_config_path",
     "load_app_config",
     "save_app_config",
+    "capture_region",
     "capture_region_to_temp_file",
+    "capture_regions",
     "delete_file_quietly",
     "save_image_to_temp_file",
     "log_debug",
@@ -57,7 +103,64 @@ __all__ = [
     "normalize_region",
     "create_tray_icon",
     "create_tray_icon_image",
+    "AsyncSiliconFlowOCR",
     "PaddleOCRVL",
     "SiliconFlowOCR",
     "extract_text_from_prediction",
+    "HTTPTransport",
+    "OCRRequestError",
+    "CircuitOpenError",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "HedgeCancel",
+    "HedgePolicy",
+    "RequestHedger",
+    "Endpoint",
+    "EndpointPool",
+    "MultiEndpointOCR",
+    "ImageFeatures",
+    "compute_image_features",
+    "ImageEncoder",
+    "EncodedImage",
+    "PreprocessOptions",
+    "preprocess_image",
+    "CaptureFilter",
+    "ContentAnalysis",
+    "analyze_content",
+    "TiledOCRBackend",
+    "TilePolicy",
+    "plan_tiles",
+    "merge_overlap",
+    "ModelRoute",
+    "ModelRouter",
+    "RepetitionGuard",
+    "AtlasOCR",
+    "pack_atlases",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "UsageLedger",
+    "UsageRecord",
+    "TokenThrottle",
+    "QuotaExceededError",
+    "StreamingJSONBody",
+    "ConnectionWarmer",
+    "HeartbeatPolicy",
+    "Cassette",
+    "RecordingTransport",
+    "ReplayTransport",
+    "OCRBackend",
+    "BackendCapabilities",
+    "FakeOCRBackend",
+    "HybridOCRBackend",
+    "LocalOCRBackend",
+    "RemoteOCRBackend",
+    "available_backends",
+    "create_backend",
+    "register_backend",
+    "OCRResult",
+    "TextLine",
+    "RequestBudget",
+    "RequestBudgetModel",
+    "JobSpool",
+    "SpoolDrainer",
 ]
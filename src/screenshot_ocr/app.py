@@ -2,11 +2,20 @@
 
 from __future__ import annotations
 
-from typing import Callable
+import time
+from typing import Callable, Iterable, Iterator
 
+from .atlas import AtlasOCR
+from .capture import capture_regions
 from .config import AppConfig
+from .content import CaptureFilter
+from .image_features import ImageFeatures, features_for, features_hint
+from .image_io import ImageInput
 from .logging_utils import log_info, log_ok
 from .ocr_client import PaddleOCRVL, extract_text_from_prediction
+from .prewarm import ConnectionWarmer
+from .routing import ModelRouter
+from .transport import HTTPTransport
 
 
 class OCRService:
@@ -20,12 +29,22 @@ class OCRService:
         model_name: str,
         backend: str,
         pipeline_factory: Callable[..., PaddleOCRVL] = PaddleOCRVL,
+        transport: HTTPTransport | None = None,
+        model_router: ModelRouter | None = None,
+        warmer: ConnectionWarmer | None = None,
+        capture_filter: CaptureFilter | None = None,
     ):
         self.config = config
         self.server_url = server_url
         self.model_name = model_name
         self.backend = backend
         self.pipeline_factory = pipeline_factory
+        # Owned here so pooled connections survive pipeline re-initialisation.
+        self.transport = transport or HTTPTransport()
+        self.model_router = model_router
+        self.warmer = warmer
+        # Runs before any request: blank captures never reach the network.
+        self.capture_filter = capture_filter
         self.pipeline: PaddleOCRVL | None = None
 
     def initialize(self) -> None:
@@ -35,16 +54,77 @@ class OCRService:
             vl_rec_server_url=self.server_url,
             vl_rec_api_model_name=self.model_name,
             vl_rec_api_key=self.config.api_key,
+            vl_rec_transport=self.transport,
         )
+        if self.warmer is not None:
+            self.warmer.headers = {"Authorization": f"Bearer {self.config.api_key}"}
         log_ok("OCR 初始化完成")
 
     def update_api_key(self, api_key: str) -> None:
         self.config.api_key = api_key.strip()
         self.initialize()
 
-    def recognize_file(self, image_path: str) -> list[str]:
+    def prewarm(self) -> bool:
+        """Start opening the server connection in the background, if configured."""
+        if self.warmer is None:
+            return False
+        return self.warmer.trigger()
+
+    def _ensure_pipeline(self) -> PaddleOCRVL:
         if self.pipeline is None:
             self.initialize()
         assert self.pipeline is not None
-        results = self.pipeline.predict(image_path)
+        return self.pipeline
+
+    def _route(self, image: ImageInput) -> tuple[str | None, ImageFeatures | None]:
+        if self.model_router is None:
+            return None, None
+        features = features_for(image)
+        return self.model_router.choose(features), features
+
+    def _record_route(self, model: str | None, features: ImageFeatures | None, started_at: float) -> None:
+        if self.model_router is not None and model is not None and features is not None:
+            self.model_router.record(model, time.perf_counter() - started_at, features)
+
+    def _prepare(self, image: ImageInput) -> ImageInput | None:
+        if self.capture_filter is None:
+            return image
+        return self.capture_filter.prepare(image)
+
+    def recognize_file(self, image: ImageInput) -> list[str]:
+        """Recognize a file path or an in-memory image (PIL image, pixel array, encoded bytes)."""
+        pipeline = self._ensure_pipeline()
+        image = self._prepare(image)
+        if image is None:
+            return []
+        model, features = self._route(image)
+        if model is None or features is None:
+            return extract_text_from_prediction(pipeline.predict(image))
+
+        started_at = time.perf_counter()
+        with features_hint(image, features):
+            results = pipeline.predict(image, model=model)
+        self._record_route(model, features, started_at)
         return extract_text_from_prediction(results)
+
+    def recognize_file_stream(self, image: ImageInput) -> Iterator[str]:
+        """Yield recognised lines progressively as the model produces them."""
+        pipeline = self._ensure_pipeline()
+        image = self._prepare(image)
+        if image is None:
+            return
+        model, features = self._route(image)
+        started_at = time.perf_counter()
+        if model is None or features is None:
+            yield from pipeline.predict_stream(image)
+        else:
+            with features_hint(image, features):
+                yield from pipeline.predict_stream(image, model=model)
+        self._record_route(model, features, started_at)
+
+    def recognize_regions(self, regions: Iterable[tuple[int, int, int, int]]) -> list[list[str]]:
+        """Recognize several screen regions, packing them into as few requests as fit."""
+        crops = capture_regions(regions)
+        if not crops:
+            return []
+        return AtlasOCR(self.recognize_file).recognize_images(crops)
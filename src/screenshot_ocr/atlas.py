@@ -0,0 +1,154 @@
+"""Pack many small crops into composite images and OCR them together.
+
+Each crop gets its own row, labelled on the left with a ``[#k]`` marker. The
+model reads the canvas top to bottom, and the markers in its answer show
+which lines belong to which crop. Rows never share a line, so text from
+neighbouring crops cannot interleave. Crops the answer has no lines for,
+e.g. because the model skipped their markers, are recognised on their own.
+Blank crops are answered with no lines and never packed or sent.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .content import analyze_content
+from .image_io import ImageInput
+from .logging_utils import log_debug, log_warn
+
+# Brackets are required: "#1 priority" or "# 2024 Report" are text, not markers.
+MARKER_PATTERN = re.compile(r"^\s*[\[【]\s*#\s*(\d+)\s*[\]】]\s*(.*)$")
+MARKER_FONT_SIZE = 22
+
+
+@dataclass
+class AtlasPlacement:
+    index: int
+    box: tuple[int, int, int, int]
+
+
+@dataclass
+class Atlas:
+    image: Image.Image
+    placements: list[AtlasPlacement] = field(default_factory=list)
+
+    @property
+    def indices(self) -> list[int]:
+        return [placement.index for placement in self.placements]
+
+
+def format_marker(index: int) -> str:
+    return f"[#{index + 1}]"
+
+
+def _marker_font() -> ImageFont.ImageFont | ImageFont.FreeTypeFont:
+    try:
+        return ImageFont.load_default(size=MARKER_FONT_SIZE)
+    except (TypeError, OSError):
+        return ImageFont.load_default()
+
+
+def pack_atlases(
+    images: Sequence[Image.Image],
+    *,
+    max_height: int = 2048,
+    padding: int = 12,
+    marker_width: int = 96,
+) -> list[Atlas]:
+    """Bin-pack crops into as few canvases as fit within ``max_height``.
+
+    Uses first-fit decreasing on row height. Crops taller than
+    ``max_height`` get a canvas of their own.
+    """
+    font = _marker_font()
+    row_heights = [max(image.height, MARKER_FONT_SIZE) + 2 * padding for image in images]
+    order = sorted(range(len(images)), key=lambda index: row_heights[index], reverse=True)
+
+    bins: list[list[int]] = []
+    used: list[int] = []
+    for index in order:
+        for bin_index, bin_items in enumerate(bins):
+            if used[bin_index] + row_heights[index] <= max_height:
+                bin_items.append(index)
+                used[bin_index] += row_heights[index]
+                break
+        else:
+            bins.append([index])
+            used.append(row_heights[index])
+
+    atlases: list[Atlas] = []
+    for bin_items in bins:
+        bin_items.sort()
+        width = marker_width + max(images[index].width for index in bin_items) + 2 * padding
+        height = sum(row_heights[index] for index in bin_items)
+        canvas = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(canvas)
+        atlas = Atlas(image=canvas)
+        top = 0
+        for index in bin_items:
+            crop = images[index]
+            row_height = row_heights[index]
+            crop_top = top + (row_height - crop.height) // 2
+            left = marker_width + padding
+            canvas.paste(crop.convert("RGB"), (left, crop_top))
+            marker = format_marker(index)
+            text_box = draw.textbbox((0, 0), marker, font=font)
+            text_top = top + (row_height - (text_box[3] - text_box[1])) // 2 - text_box[1]
+            draw.text((padding, text_top), marker, fill="black", font=font)
+            atlas.placements.append(AtlasPlacement(index, (left, crop_top, crop.width, crop.height)))
+            top += row_height
+        atlases.append(atlas)
+    log_debug(f"图集打包: {len(images)} 张小图 -> {len(atlases)} 张画布")
+    return atlases
+
+
+def map_lines_to_crops(lines: Sequence[str], indices: Sequence[int]) -> dict[int, list[str]]:
+    """Assign recognised lines to crops by the ``[#k]`` markers preceding them.
+
+    A marker for a crop not in ``indices`` is kept as text of the current
+    crop. Lines before the first marker belong to no crop and are dropped.
+    """
+    expected = set(indices)
+    assigned: dict[int, list[str]] = {index: [] for index in indices}
+    current: int | None = None
+    for line in lines:
+        match = MARKER_PATTERN.match(line)
+        if match and int(match.group(1)) - 1 in expected:
+            current = int(match.group(1)) - 1
+            line = match.group(2).strip()
+            if not line:
+                continue
+        if current is None:
+            log_debug(f"图集识别: 丢弃无标记的行 {line!r}")
+            continue
+        assigned[current].append(line)
+    return assigned
+
+
+class AtlasOCR:
+    """OCR many small crops with one request per packed canvas."""
+
+    def __init__(self, recognize_file: Callable[[ImageInput], list[str]], **pack_options: int):
+        self.recognize_file = recognize_file
+        self.pack_options = pack_options
+
+    def recognize_images(self, images: Sequence[Image.Image]) -> list[list[str]]:
+        results: list[list[str]] = [[] for _ in images]
+        kept = [index for index, image in enumerate(images) if not analyze_content(image).blank]
+        if len(kept) < len(images):
+            log_debug(f"图集识别: 跳过 {len(images) - len(kept)} 张空白小图")
+        crops = [images[index] for index in kept]
+        for atlas in pack_atlases(crops, **self.pack_options):
+            lines = self.recognize_file(atlas.image)
+            for position, crop_lines in map_lines_to_crops(lines, atlas.indices).items():
+                results[kept[position]] = crop_lines
+            missing = [position for position in atlas.indices if not results[kept[position]]]
+            if missing:
+                log_warn(f"图集识别结果缺少 {len(missing)} 张小图的标记，改为逐张识别")
+                for position in missing:
+                    results[kept[position]] = self.recognize_file(crops[position])
+        return results
@@ -0,0 +1,327 @@
+"""Pluggable OCR backends selected by ``vl_rec_backend``.
+
+A backend turns an image (see :mod:`screenshot_ocr.image_io`) into text lines. Factories are registered
+under one or more names; :class:`~screenshot_ocr.ocr_client.PaddleOCRVL`
+looks the configured name up with :func:`create_backend` and passes every
+``vl_rec_*`` option without the prefix, so each factory picks the options it
+understands and ignores the rest. The remote HTTP backend is registered by
+``ocr_client``; this module holds the local engine, the fake engine for
+tests and the hybrid backend that keeps small captures on-box.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from PIL import Image
+
+from .image_io import ImageInput, image_size, is_image_path
+from .logging_utils import log_debug, log_warn
+from .results import OCRResult, TextLine
+
+DEFAULT_BACKEND = "vllm-server"
+RAPIDOCR_MODULE = "rapidocr_onnxruntime"
+
+
+@dataclass(frozen=True)
+class BackendCapabilities:
+    """What a backend can do beyond one-shot recognition."""
+
+    streaming: bool = False
+    batching: bool = False
+    local: bool = False
+
+
+class OCRBackend(ABC):
+    """Base class for OCR backends; subclasses implement :meth:`recognize`."""
+
+    name = "base"
+    capabilities = BackendCapabilities()
+
+    @abstractmethod
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        """Recognize one image into text lines in reading order."""
+
+    def recognize_result(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        """Recognize one image into a typed result; only the total time is known here."""
+        started_at = time.perf_counter()
+        lines = self.recognize(image, model)
+        return OCRResult.from_texts(
+            lines,
+            timings={"total": time.perf_counter() - started_at},
+            model=model,
+            backend=self.name,
+        )
+
+    def recognize_stream(self, image: ImageInput, model: str | None = None) -> Iterator[str]:
+        """Yield lines progressively; backends without streaming yield them at the end."""
+        yield from self.recognize(image, model)
+
+    def recognize_batch(self, images: Sequence[ImageInput], model: str | None = None) -> list[list[str]]:
+        return [self.recognize(image, model) for image in images]
+
+    def warm_up(self) -> bool:
+        """Prepare for the first request; return whether any work was done."""
+        return False
+
+
+_BACKENDS: dict[str, Callable[..., OCRBackend]] = {}
+
+
+def register_backend(*names: str) -> Callable[[Callable[..., OCRBackend]], Callable[..., OCRBackend]]:
+    """Register a backend factory (a class or function) under ``names``."""
+
+    def decorator(factory: Callable[..., OCRBackend]) -> Callable[..., OCRBackend]:
+        for name in names:
+            _BACKENDS[name.lower()] = factory
+        return factory
+
+    return decorator
+
+
+def available_backends() -> list[str]:
+    return sorted(_BACKENDS)
+
+
+def create_backend(name: str | None, **options: Any) -> OCRBackend:
+    key = (name or DEFAULT_BACKEND).lower()
+    factory = _BACKENDS.get(key)
+    if factory is None:
+        raise ValueError(f"未知的 OCR 后端: {name}（可选: {', '.join(available_backends())}）")
+    return factory(**options)
+
+
+def group_boxes(items: Iterable[tuple[Sequence[Sequence[float]], str, float]]) -> list[TextLine]:
+    """Join detected text boxes that share a baseline into reading-order lines.
+
+    Each item is a quadrilateral (four ``(x, y)`` points), its text and a
+    confidence. Boxes whose vertical centres are within half a box height of
+    a line's centre belong to that line; lines are ordered top to bottom and
+    boxes left to right. A line's box encloses its parts and its score is
+    the lowest part score.
+    """
+    boxes = []
+    for points, text, score in items:
+        if not text.strip():
+            continue
+        xs = [point[0] for point in points]
+        ys = [point[1] for point in points]
+        boxes.append((min(xs), min(ys), max(xs), max(ys), text.strip(), float(score)))
+    boxes.sort(key=lambda box: (box[1] + box[3]) / 2)
+
+    groups: list[tuple[list[float], list[tuple[float, float, float, float, str, float]]]] = []
+    for box in boxes:
+        centre = (box[1] + box[3]) / 2
+        height = max(box[3] - box[1], 1.0)
+        if groups and abs(centre - groups[-1][0][0]) <= height / 2:
+            line_centre, parts = groups[-1]
+            parts.append(box)
+            line_centre[0] += (centre - line_centre[0]) / len(parts)
+        else:
+            groups.append(([centre], [box]))
+
+    lines: list[TextLine] = []
+    for _, parts in groups:
+        parts.sort()
+        lines.append(
+            TextLine(
+                " ".join(part[4] for part in parts),
+                box=(
+                    min(part[0] for part in parts),
+                    min(part[1] for part in parts),
+                    max(part[2] for part in parts),
+                    max(part[3] for part in parts),
+                ),
+                score=min(part[5] for part in parts),
+            )
+        )
+    return lines
+
+
+def group_boxes_into_lines(items: Iterable[tuple[Sequence[Sequence[float]], str]]) -> list[str]:
+    """Like :func:`group_boxes` for ``(points, text)`` items, returning only the text."""
+    return [line.content for line in group_boxes((points, text, 1.0) for points, text in items)]
+
+
+@register_backend("rapidocr", "local")
+class LocalOCRBackend(OCRBackend):
+    """CPU OCR with RapidOCR (ONNX Runtime), no network involved.
+
+    The engine is imported and its models loaded on first use or in
+    :meth:`warm_up`, so creating the backend stays cheap. Creating it raises
+    ``ImportError`` when ``rapidocr_onnxruntime`` is not installed.
+    """
+
+    name = "rapidocr"
+    capabilities = BackendCapabilities(local=True)
+
+    def __init__(self, *, min_score: float = 0.5, engine: Any | None = None, **_: Any):
+        if engine is None and importlib.util.find_spec(RAPIDOCR_MODULE) is None:
+            raise ImportError(f"请安装 {RAPIDOCR_MODULE} 库: pip install {RAPIDOCR_MODULE}")
+        self.min_score = min_score
+        self._engine = engine
+        self._lock = threading.Lock()
+
+    def _get_engine(self) -> Any:
+        with self._lock:
+            if self._engine is None:
+                from rapidocr_onnxruntime import RapidOCR
+
+                started_at = time.perf_counter()
+                self._engine = RapidOCR()
+                log_debug(f"[本地 OCR] 模型加载完成 ({time.perf_counter() - started_at:.2f}s)")
+            return self._engine
+
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        return self.recognize_result(image, model).texts
+
+    def recognize_result(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        engine = self._get_engine()
+        started_at = time.perf_counter()
+        detected, _ = engine(bytes(image) if isinstance(image, (bytearray, memoryview)) else image)
+        recognised_at = time.perf_counter()
+        lines = group_boxes(item for item in detected or [] if float(item[2]) >= self.min_score)
+        finished_at = time.perf_counter()
+        return OCRResult(
+            lines,
+            timings={
+                "recognize": recognised_at - started_at,
+                "parse": finished_at - recognised_at,
+                "total": finished_at - started_at,
+            },
+            raw=detected,
+            backend=self.name,
+        )
+
+    def warm_up(self) -> bool:
+        with self._lock:
+            loaded = self._engine is not None
+        if loaded:
+            return False
+        # One pass over a blank image loads the ONNX sessions.
+        self._get_engine()(Image.new("RGB", (32, 32), "white"))
+        return True
+
+
+@register_backend("fake")
+class FakeOCRBackend(OCRBackend):
+    """Return canned lines without touching the network; used by tests.
+
+    ``responses`` maps image paths to their lines, anything else gets
+    ``lines``. Every call is appended to ``calls``.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        *,
+        lines: Sequence[str] = ("fake text",),
+        responses: dict[str, Sequence[str]] | None = None,
+        latency: float = 0.0,
+        streaming: bool = True,
+        batching: bool = True,
+        time_module: Any | None = None,
+        **_: Any,
+    ):
+        self.lines = list(lines)
+        self.responses = {path: list(value) for path, value in (responses or {}).items()}
+        self.latency = latency
+        self.capabilities = BackendCapabilities(streaming=streaming, batching=batching, local=True)
+        self.time_module = time_module or time
+        self.calls: list[tuple[str, str | None]] = []
+        self.warm_count = 0
+
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        self.calls.append((image, model))
+        if self.latency:
+            self.time_module.sleep(self.latency)
+        if not is_image_path(image):
+            return list(self.lines)
+        return list(self.responses.get(os.fspath(image), self.lines))
+
+    def warm_up(self) -> bool:
+        self.warm_count += 1
+        return True
+
+
+class HybridOCRBackend(OCRBackend):
+    """Recognise small captures locally and everything else remotely.
+
+    Captures of at most ``max_local_area`` pixels go to ``local``; when it
+    fails or finds no text the request falls through to ``remote``, so the
+    local engine can only save latency, never lose a result.
+    """
+
+    name = "hybrid"
+
+    def __init__(self, local: OCRBackend, remote: OCRBackend, *, max_local_area: int = 200_000):
+        self.local = local
+        self.remote = remote
+        self.max_local_area = max_local_area
+        self.capabilities = BackendCapabilities(
+            streaming=remote.capabilities.streaming,
+            batching=remote.capabilities.batching,
+        )
+
+    def _try_local(self, image: ImageInput) -> OCRResult | None:
+        width, height = image_size(image)
+        if width * height > self.max_local_area:
+            return None
+        try:
+            result = self.local.recognize_result(image)
+        except Exception as exc:
+            log_warn(f"本地 OCR 失败，改用远程服务: {exc}")
+            return None
+        if not result.texts:
+            log_debug("本地 OCR 未识别到文字，改用远程服务")
+            return None
+        log_debug(f"本地 OCR 识别完成: {width}x{height}")
+        return result
+
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        return self.recognize_result(image, model).texts
+
+    def recognize_result(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        result = self._try_local(image)
+        if result is not None:
+            return result
+        return self.remote.recognize_result(image, model)
+
+    def recognize_stream(self, image: ImageInput, model: str | None = None) -> Iterator[str]:
+        result = self._try_local(image)
+        if result is not None:
+            yield from result.texts
+            return
+        yield from self.remote.recognize_stream(image, model)
+
+    def recognize_batch(self, images: Sequence[ImageInput], model: str | None = None) -> list[list[str]]:
+        return self.remote.recognize_batch(images, model)
+
+    def warm_up(self) -> bool:
+        local_warmed = self.local.warm_up()
+        return self.remote.warm_up() or local_warmed
+
+
+@register_backend("hybrid", "auto")
+def create_hybrid_backend(
+    *,
+    local_backend: str = "rapidocr",
+    remote_backend: str = DEFAULT_BACKEND,
+    local_max_area: int = 200_000,
+    **options: Any,
+) -> OCRBackend:
+    """Build a :class:`HybridOCRBackend`, or just the remote one if no local engine is installed."""
+    remote = create_backend(remote_backend, **options)
+    try:
+        local = create_backend(local_backend, **options)
+    except ImportError as exc:
+        log_warn(f"本地 OCR 引擎不可用，全部使用远程服务: {exc}")
+        return remote
+    return HybridOCRBackend(local, remote, max_local_area=local_max_area)
@@ -0,0 +1,98 @@
+"""Size ``max_tokens``, timeouts and deadlines per request from past requests."""
+
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+
+from .image_features import ImageFeatures
+from .latency import OnlineLinearFit
+from .logging_utils import log_debug
+
+
+@dataclass(frozen=True)
+class RequestBudget:
+    """Limits for one OCR request; ``deadline`` covers every retry of it."""
+
+    max_tokens: int
+    connect_timeout: float
+    read_timeout: float
+    deadline: float
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+
+def ink_pixels(features: ImageFeatures) -> float:
+    """Roughly how much text a capture holds: its area covered by ink."""
+    return features.area * features.ink_density
+
+
+class RequestBudgetModel:
+    """Predict output size and latency of a capture, fitted online.
+
+    Completion tokens are fitted against the capture's ink pixels and
+    latency against completion tokens, both with decayed least squares.
+    ``max_tokens`` is the predicted output times ``token_headroom``, and the
+    read timeout the predicted latency at that many tokens times
+    ``latency_headroom``. Until ``min_samples`` requests have been seen every
+    request gets the configured maximums.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_tokens: int = 15000,
+        min_tokens: int = 256,
+        token_headroom: float = 2.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        min_read_timeout: float = 8.0,
+        latency_headroom: float = 2.5,
+        deadline: float = 60.0,
+        min_samples: int = 5,
+        decay: float = 0.98,
+    ):
+        self.max_tokens = max_tokens
+        self.min_tokens = min(min_tokens, max_tokens)
+        self.token_headroom = token_headroom
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.min_read_timeout = min(min_read_timeout, read_timeout)
+        self.latency_headroom = latency_headroom
+        self.deadline = deadline
+        self.min_samples = min_samples
+        self.token_fit = OnlineLinearFit(decay)
+        self.latency_fit = OnlineLinearFit(decay)
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def default_budget(self) -> RequestBudget:
+        return RequestBudget(self.max_tokens, self.connect_timeout, self.read_timeout, self.deadline)
+
+    def plan(self, features: ImageFeatures) -> RequestBudget:
+        with self._lock:
+            warmed_up = self.samples >= self.min_samples
+        if not warmed_up:
+            return self.default_budget()
+
+        tokens = self.token_fit.predict(ink_pixels(features)) or 0.0
+        max_tokens = min(self.max_tokens, max(self.min_tokens, math.ceil(tokens * self.token_headroom)))
+        latency = self.latency_fit.predict(max_tokens) or self.read_timeout
+        read_timeout = min(self.read_timeout, max(self.min_read_timeout, latency * self.latency_headroom))
+        # Leave room for one retry after a stuck attempt, never beyond the cap.
+        deadline = min(self.deadline, self.connect_timeout + 2 * read_timeout)
+        budget = RequestBudget(max_tokens, self.connect_timeout, read_timeout, deadline)
+        log_debug(
+            f"请求预算: 预计 {tokens:.0f} tokens -> max_tokens={max_tokens}, "
+            f"读取超时 {read_timeout:.1f}s, 截止 {deadline:.1f}s"
+        )
+        return budget
+
+    def record(self, features: ImageFeatures, completion_tokens: int, latency: float) -> None:
+        self.token_fit.update(ink_pixels(features), completion_tokens)
+        self.latency_fit.update(completion_tokens, latency)
+        with self._lock:
+            self.samples += 1
@@ -4,9 +4,9 @@ from __future__ import annotations
 
 import os
 import tempfile
-from typing import Protocol
+from typing import Iterable, Protocol
 
-from PIL import ImageGrab
+from PIL import Image, ImageGrab
 
 
 class SavableImage(Protocol):
@@ -23,13 +23,34 @@ def save_image_to_temp_file(image: SavableImage, suffix: str = ".png") -> str:
     return temp_path
 
 
+def capture_region(x1: int, y1: int, x2: int, y2: int) -> Image.Image:
+    """Capture a screen region into memory."""
+    return ImageGrab.grab(bbox=(x1, y1, x2, y2))
+
+
 def capture_region_to_temp_file(x1: int, y1: int, x2: int, y2: int) -> tuple[str, tuple[int, int]]:
     """Capture a screen region and store it as a temp file."""
-    screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
+    screenshot = capture_region(x1, y1, x2, y2)
     temp_path = save_image_to_temp_file(screenshot)
     return temp_path, screenshot.size
 
 
+def capture_regions(regions: Iterable[tuple[int, int, int, int]]) -> list[Image.Image]:
+    """Capture several screen regions from a single screen grab."""
+    regions = list(regions)
+    if not regions:
+        return []
+    left = min(region[0] for region in regions)
+    top = min(region[1] for region in regions)
+    right = max(region[2] for region in regions)
+    bottom = max(region[3] for region in regions)
+    screenshot = ImageGrab.grab(bbox=(left, top, right, bottom), all_screens=True)
+    return [
+        screenshot.crop((x1 - left, y1 - top, x2 - left, y2 - top))
+        for x1, y1, x2, y2 in regions
+    ]
+
+
 def delete_file_quietly(path: str | None) -> None:
     """Delete a file if it exists and ignore cleanup failures."""
     if not path:
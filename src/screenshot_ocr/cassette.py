@@ -0,0 +1,213 @@
+"""Record real OCR traffic to a cassette file and replay it offline.
+
+A cassette maps a fingerprint of each request (URL path plus JSON body) to the
+recorded status, headers, body and latency. Request headers are never
+stored, so cassettes do not contain API keys. Fingerprints cover the image
+bytes as the client encoded them; a different Pillow/zlib build can encode
+the same image differently, in which case the cassette must be re-recorded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterable
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .logging_utils import log_debug
+from .request_body import StreamingJSONBody
+from .transport import HTTPTransport
+
+CASSETTE_VERSION = 1
+RECORDED_HEADERS = ("Content-Type", "Retry-After")
+
+
+class CassetteMissError(LookupError):
+    """A replayed request has no recording in the cassette."""
+
+
+def request_fingerprint(
+    url: str,
+    *,
+    json_payload: dict[str, Any] | None = None,
+    data: StreamingJSONBody | bytes | str | None = None,
+) -> str:
+    """Hash the URL path and request body the way they go over the wire.
+
+    The host is left out so a cassette recorded against one server replays
+    under any base URL. Dict payloads are serialised like
+    :class:`StreamingJSONBody` does, so a request fingerprints the same
+    whichever way the client built it.
+    """
+    digest = hashlib.sha256(urlsplit(url).path.encode("utf-8") + b"\0")
+    chunks: Iterable[bytes | str]
+    if json_payload is not None:
+        chunks = [json.dumps(json_payload, ensure_ascii=False, separators=(",", ":"))]
+    elif data is None:
+        chunks = []
+    elif isinstance(data, (bytes, str)):
+        chunks = [data]
+    else:
+        chunks = data
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class Interaction:
+    url: str
+    status_code: int
+    body: str
+    latency: float
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = "utf-8"
+        response._content = self.body.encode("utf-8")
+        response._content_consumed = True
+        return response
+
+
+class Cassette:
+    """Recorded interactions keyed by request fingerprint, saved as JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: dict[str, list[Interaction]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return sum(len(recorded) for recorded in self.interactions.values())
+
+    def load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"不支持的录制文件版本: {data.get('version')}")
+        self.interactions = {
+            fingerprint: [Interaction(**item) for item in recorded]
+            for fingerprint, recorded in data["interactions"].items()
+        }
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "interactions": {
+                    fingerprint: [asdict(item) for item in recorded]
+                    for fingerprint, recorded in self.interactions.items()
+                },
+            }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.path)
+
+    def add(self, fingerprint: str, interaction: Interaction) -> None:
+        with self._lock:
+            self.interactions.setdefault(fingerprint, []).append(interaction)
+
+
+class RecordingTransport(HTTPTransport):
+    """Send requests for real and record every response into a cassette.
+
+    Streamed responses are read to the end before they are returned, so
+    recording loses progressive output but keeps the full event stream.
+    """
+
+    def __init__(self, cassette: Cassette | str, **transport_options: Any):
+        super().__init__(**transport_options)
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+
+    def post(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] | None = 60,
+        **kwargs: Any,
+    ) -> requests.Response:
+        fingerprint = request_fingerprint(url, json_payload=kwargs.get("json"), data=kwargs.get("data"))
+        started_at = time.perf_counter()
+        response = super().post(url, headers=headers, timeout=timeout, **kwargs)
+        try:
+            body = response.content.decode("utf-8")
+        finally:
+            response.close()
+        interaction = Interaction(
+            url=url,
+            status_code=response.status_code,
+            body=body,
+            latency=round(time.perf_counter() - started_at, 4),
+            headers={name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+        )
+        self.cassette.add(fingerprint, interaction)
+        self.cassette.save()
+        log_debug(f"已录制请求: {fingerprint[:12]} ({response.status_code}, {interaction.latency:.3f}s)")
+        return interaction.to_response()
+
+
+class ReplayTransport(HTTPTransport):
+    """Answer requests from a cassette without touching the network.
+
+    Repeated recordings of one request (e.g. a 503 then a 200) are served
+    in order and the last one repeats. ``latency_scale`` sleeps for that
+    fraction of each recorded latency, ``0`` replays instantly.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette | str,
+        *,
+        latency_scale: float = 0.0,
+        time_module: Any | None = None,
+        **transport_options: Any,
+    ):
+        super().__init__(**transport_options)
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.latency_scale = latency_scale
+        self.time_module = time_module or time
+        self._played: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _next_interaction(self, fingerprint: str) -> Interaction:
+        recorded = self.cassette.interactions.get(fingerprint)
+        if not recorded:
+            raise CassetteMissError(f"录制文件中没有此请求: {fingerprint[:12]}，请重新录制")
+        with self._lock:
+            index = self._played.get(fingerprint, 0)
+            self._played[fingerprint] = index + 1
+        return recorded[min(index, len(recorded) - 1)]
+
+    def post(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] | None = 60,
+        **kwargs: Any,
+    ) -> requests.Response:
+        self.last_used = self.last_activity = time.monotonic()
+        fingerprint = request_fingerprint(url, json_payload=kwargs.get("json"), data=kwargs.get("data"))
+        interaction = self._next_interaction(fingerprint)
+        if self.latency_scale > 0:
+            self.time_module.sleep(interaction.latency * self.latency_scale)
+        return interaction.to_response()
+
+    def connect(self, url: str, *, timeout: float = 10) -> bool:
+        return False
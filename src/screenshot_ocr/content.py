@@ -0,0 +1,134 @@
+"""Find where a capture has text before sending it anywhere.
+
+:func:`analyze_content` looks for edges (sharp luminance steps) in a
+reduced grayscale copy of the capture. Rows holding edges form runs in the
+horizontal projection; runs too thin to be text, such as separators and
+window borders, are ignored. A capture with no text-like rows is blank and
+:class:`CaptureFilter` answers it without an OCR request; otherwise it is
+cropped to the bounding box of its text plus a margin.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from .image_features import find_runs, to_grayscale_array
+from .image_io import ImageInput, open_image
+from .logging_utils import log_debug, log_info
+
+ANALYSIS_MAX_WIDTH = 2048
+EDGE_CONTRAST = 24
+# Text rows span at least this many analysis rows; thinner runs are rules.
+MIN_TEXT_ROWS = 3
+# Fewer edge pixels than this is noise, not even a single glyph.
+MIN_EDGE_PIXELS = 8
+
+
+@dataclass(frozen=True)
+class ContentAnalysis:
+    """Where a capture's text is; ``box`` is ``(left, top, right, bottom)``, ``None`` if blank."""
+
+    width: int
+    height: int
+    std: float
+    edge_density: float
+    box: tuple[int, int, int, int] | None
+
+    @property
+    def blank(self) -> bool:
+        return self.box is None
+
+    @property
+    def trimmed_fraction(self) -> float:
+        """Share of the capture's area outside ``box``."""
+        if self.box is None:
+            return 1.0
+        left, top, right, bottom = self.box
+        return 1.0 - (right - left) * (bottom - top) / max(self.width * self.height, 1)
+
+
+def edge_mask(gray: np.ndarray, contrast: int = EDGE_CONTRAST) -> np.ndarray:
+    """Mark pixels whose right or lower neighbour differs by more than ``contrast``."""
+    values = gray.astype(np.int16)
+    mask = np.zeros(gray.shape, dtype=bool)
+    mask[:, :-1] |= np.abs(np.diff(values, axis=1)) > contrast
+    mask[:-1, :] |= np.abs(np.diff(values, axis=0)) > contrast
+    return mask
+
+
+def analyze_content(
+    image: Image.Image,
+    *,
+    contrast: int = EDGE_CONTRAST,
+    padding: int = 8,
+    max_width: int = ANALYSIS_MAX_WIDTH,
+) -> ContentAnalysis:
+    """Decide whether ``image`` holds text and find the box around it.
+
+    ``padding`` pixels of the original image are kept around the text box.
+    """
+    width, height = image.size
+    gray = to_grayscale_array(image, max_width)
+    std = float(gray.std()) if gray.size else 0.0
+    mask = edge_mask(gray, contrast)
+    edge_density = float(mask.mean()) if mask.size else 0.0
+
+    rows = [(start, end) for start, end in find_runs(mask.any(axis=1)) if end - start >= MIN_TEXT_ROWS]
+    if rows:
+        text_mask = np.zeros(mask.shape[0], dtype=bool)
+        for start, end in rows:
+            text_mask[start:end] = True
+        mask = mask & text_mask[:, None]
+    if not rows or np.count_nonzero(mask) < MIN_EDGE_PIXELS:
+        return ContentAnalysis(width, height, std, edge_density, None)
+
+    columns = np.flatnonzero(mask.any(axis=0))
+    scale = width / gray.shape[1]
+    box = (
+        max(0, int(columns[0] * scale) - padding),
+        max(0, int(rows[0][0] * scale) - padding),
+        min(width, int(np.ceil((columns[-1] + 2) * scale)) + padding),
+        min(height, int(np.ceil((rows[-1][1] + 1) * scale)) + padding),
+    )
+    return ContentAnalysis(width, height, std, edge_density, box)
+
+
+class CaptureFilter:
+    """Skip blank captures and crop padded ones before they are recognised.
+
+    Crops that would remove less than ``min_trim`` of the area are not
+    worth losing a byte-for-byte upload of the original file for.
+    """
+
+    def __init__(
+        self,
+        *,
+        skip_blank: bool = True,
+        trim: bool = True,
+        min_trim: float = 0.1,
+        padding: int = 8,
+    ):
+        self.skip_blank = skip_blank
+        self.trim = trim
+        self.min_trim = min_trim
+        self.padding = padding
+
+    def prepare(self, image: ImageInput) -> ImageInput | None:
+        """Return the image to recognise, a crop of it, or ``None`` if it is blank."""
+        with open_image(image) as opened:
+            analysis = analyze_content(opened, padding=self.padding)
+            log_debug(
+                f"内容分析: 标准差 {analysis.std:.1f}, 边缘密度 {analysis.edge_density:.4f}, 文字区域 {analysis.box}"
+            )
+            if analysis.blank:
+                if self.skip_blank:
+                    log_info("截图中没有文字，跳过识别")
+                    return None
+                return image
+            if self.trim and analysis.trimmed_fraction >= self.min_trim:
+                log_debug(f"裁掉空白边距: {analysis.width}x{analysis.height} -> {analysis.box}")
+                return opened.crop(analysis.box)
+        return image
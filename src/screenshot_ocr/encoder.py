@@ -0,0 +1,174 @@
+"""Encode images for upload, passing compatible files through untouched.
+
+With :class:`~screenshot_ocr.preprocess.PreprocessOptions` the image is
+first shrunk by :func:`~screenshot_ocr.preprocess.preprocess_image`.
+Files and encoded bytes the API accepts as they are (PNG or JPEG without
+transparency) are otherwise sent byte-for-byte. Everything else is encoded with an
+:class:`EncodeMethod` chosen by :class:`ImageEncoder`: a fixed one, or in
+``"auto"`` mode the one with the lowest predicted encode time plus upload
+time at the configured bandwidth.
+"""
+
+from __future__ import annotations
+
+import io
+import time
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from PIL import Image
+
+from .image_io import ImageInput, is_image_path, open_image
+from .logging_utils import log_debug
+from .preprocess import PreprocessOptions, preprocess_image
+
+AUTO = "auto"
+PASSTHROUGH = "passthrough"
+PASSTHROUGH_FORMATS = {"PNG": "image/png", "JPEG": "image/jpeg"}
+# Modes sent without conversion; anything else becomes RGB first.
+UPLOAD_MODES = frozenset({"RGB", "L", "1"})
+DEFAULT_UPLOAD_BYTES_PER_SECOND = 1_250_000
+
+
+@dataclass(frozen=True)
+class EncodeMethod:
+    """One way to encode an image, with its cost per megapixel of a typical capture."""
+
+    name: str
+    format: str
+    mime_type: str
+    options: dict[str, Any] = field(default_factory=dict)
+    seconds_per_megapixel: float = 0.0
+    bytes_per_megapixel: float = 0.0
+
+    def predicted_cost(self, megapixels: float, upload_bytes_per_second: float) -> float:
+        """Seconds to encode and upload an image of ``megapixels``."""
+        upload = self.bytes_per_megapixel / upload_bytes_per_second
+        return megapixels * (self.seconds_per_megapixel + upload)
+
+
+# Costs measured on screenshots with ``benchmarks/bench_encoder.py``.
+ENCODE_METHODS = {
+    method.name: method
+    for method in (
+        EncodeMethod("png-fast", "PNG", "image/png", {"compress_level": 1}, 0.035, 80_000),
+        EncodeMethod("png", "PNG", "image/png", {"compress_level": 6}, 0.055, 65_000),
+        EncodeMethod(
+            "webp-lossless",
+            "WEBP",
+            "image/webp",
+            {"lossless": True, "quality": 50, "method": 4},
+            0.35,
+            35_000,
+        ),
+    )
+}
+# JPEG sources are already lossy, so converting one only needs to stay JPEG.
+JPEG_METHOD = EncodeMethod("jpeg", "JPEG", "image/jpeg", {"quality": 95}, 0.004, 120_000)
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """Upload-ready image data and the MIME type for its data URL."""
+
+    data: bytes | memoryview
+    mime_type: str
+    size: tuple[int, int]
+    method: str
+    seconds: float = 0.0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.method == PASSTHROUGH
+
+
+def _is_opaque(image: Image.Image) -> bool:
+    return image.mode == "RGBA" and image.getchannel("A").getextrema() == (255, 255)
+
+
+def _keeps_mode(image: Image.Image) -> bool:
+    return image.mode in UPLOAD_MODES or (image.mode == "P" and "transparency" not in image.info)
+
+
+class ImageEncoder:
+    """Turn any :data:`~screenshot_ocr.image_io.ImageInput` into an :class:`EncodedImage`.
+
+    ``method`` is ``"auto"`` or a name from :data:`ENCODE_METHODS`; auto
+    picks among ``candidates`` by :meth:`EncodeMethod.predicted_cost`.
+    """
+
+    def __init__(
+        self,
+        method: str = AUTO,
+        *,
+        upload_bytes_per_second: float = DEFAULT_UPLOAD_BYTES_PER_SECOND,
+        candidates: Sequence[str] | None = None,
+        passthrough: bool = True,
+        preprocess: PreprocessOptions | None = None,
+    ):
+        if method != AUTO and method not in ENCODE_METHODS:
+            raise ValueError(f"未知的图片编码方式: {method}（可选: {AUTO}, {', '.join(ENCODE_METHODS)}）")
+        self.method = method
+        self.upload_bytes_per_second = max(1.0, upload_bytes_per_second)
+        self.candidates = [ENCODE_METHODS[name] for name in (candidates or ENCODE_METHODS)]
+        self.passthrough = passthrough
+        self.preprocess = preprocess if preprocess is not None and preprocess.enabled else None
+
+    def choose(self, size: tuple[int, int]) -> EncodeMethod:
+        if self.method != AUTO:
+            return ENCODE_METHODS[self.method]
+        megapixels = size[0] * size[1] / 1_000_000
+        return min(self.candidates, key=lambda method: method.predicted_cost(megapixels, self.upload_bytes_per_second))
+
+    def encode(self, image: ImageInput) -> EncodedImage:
+        started_at = time.perf_counter()
+        encoded = self._preprocess(image) if self.preprocess is not None else None
+        if encoded is None and self.passthrough:
+            encoded = self._pass_through(image)
+        if encoded is None:
+            encoded = self._encode(image)
+        seconds = time.perf_counter() - started_at
+        log_debug(
+            f"图片编码: {encoded.method} {encoded.mime_type} {encoded.size[0]}x{encoded.size[1]}, "
+            f"{len(encoded.data) // 1024}KB, {seconds * 1000:.0f}ms"
+        )
+        return EncodedImage(encoded.data, encoded.mime_type, encoded.size, encoded.method, seconds)
+
+    def _pass_through(self, image: ImageInput) -> EncodedImage | None:
+        """Return files and encoded bytes the API accepts unchanged, else ``None``."""
+        if not (is_image_path(image) or isinstance(image, (bytes, bytearray, memoryview))):
+            return None
+        with open_image(image) as opened:
+            mime_type = PASSTHROUGH_FORMATS.get(opened.format)
+            if mime_type is None or not (_keeps_mode(opened) or _is_opaque(opened)):
+                return None
+            size = opened.size
+        if is_image_path(image):
+            with open(image, "rb") as file:
+                data: bytes | memoryview = file.read()
+        else:
+            data = image
+        return EncodedImage(data, mime_type, size, PASSTHROUGH)
+
+    def _preprocess(self, image: ImageInput) -> EncodedImage | None:
+        """Encode the preprocessed image, or ``None`` if preprocessing left it as it was."""
+        with open_image(image) as opened:
+            prepared = preprocess_image(opened, self.preprocess)
+            if prepared is opened:
+                return None
+            return self._encode(prepared, source_format=opened.format)
+
+    def _encode(self, image: ImageInput, *, source_format: str | None = None) -> EncodedImage:
+        buffer = io.BytesIO()
+        with open_image(image) as opened:
+            log_debug(f"原始图片尺寸: {opened.size}, 模式: {opened.mode}")
+            source_format = source_format or opened.format
+            # Continuous-tone JPEG sources stay JPEG; quantised tones suit PNG.
+            if source_format == "JPEG" and opened.mode not in ("1", "P"):
+                method = JPEG_METHOD
+            else:
+                method = self.choose(opened.size)
+            converted = opened if _keeps_mode(opened) else opened.convert("RGB")
+            converted.save(buffer, format=method.format, **method.options)
+            size = opened.size
+        return EncodedImage(buffer.getbuffer(), method.mime_type, size, method.name)
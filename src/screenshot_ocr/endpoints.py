@@ -0,0 +1,141 @@
+"""Endpoint list with passive health checks and latency-aware ranking."""
+
+from __future__ import annotations
+
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from .latency import EWMA
+from .logging_utils import log_info, log_warn
+
+
+@dataclass
+class Endpoint:
+    """One OpenAI-compatible gateway and the credentials used to reach it.
+
+    An empty ``model`` serves whichever model the request asks for.
+    """
+
+    base_url: str
+    model: str = ""
+    api_key: str = ""
+    name: str = ""
+
+    def __post_init__(self) -> None:
+        self.base_url = self.base_url.rstrip("/")
+        if not self.name:
+            self.name = f"{self.base_url}#{self.model}" if self.model else self.base_url
+
+    @classmethod
+    def from_value(cls, value: "Endpoint | dict[str, Any]") -> "Endpoint":
+        if isinstance(value, Endpoint):
+            return value
+        return cls(
+            base_url=str(value["base_url"]),
+            model=str(value.get("model") or ""),
+            api_key=str(value.get("api_key", "")),
+            name=str(value.get("name", "")),
+        )
+
+
+@dataclass
+class EndpointStats:
+    latency: EWMA = field(default_factory=EWMA)
+    error_rate: EWMA = field(default_factory=lambda: EWMA(initial=0.0))
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+
+
+class EndpointPool:
+    """Rank endpoints by EWMA latency weighted by their recent error rate.
+
+    Health is tracked passively from real traffic: an endpoint that fails
+    ``failures_to_eject`` times in a row is skipped for ``eject_seconds``.
+    Endpoints without latency samples are scored at the median of the
+    measured ones, so a mirror that only ever fails still sinks through its
+    error rate instead of ranking first forever.
+    """
+
+    def __init__(
+        self,
+        endpoints: Iterable[Endpoint | dict[str, Any]],
+        *,
+        alpha: float = 0.3,
+        error_penalty: float = 4.0,
+        failures_to_eject: int = 3,
+        eject_seconds: float = 30.0,
+        time_module: Any | None = None,
+    ):
+        self.endpoints = [Endpoint.from_value(endpoint) for endpoint in endpoints]
+        if not self.endpoints:
+            raise ValueError("至少需要配置一个 OCR 服务端点")
+        self.error_penalty = error_penalty
+        self.failures_to_eject = max(1, int(failures_to_eject))
+        self.eject_seconds = eject_seconds
+        self.time_module = time_module or time
+        self.stats = {
+            endpoint.name: EndpointStats(latency=EWMA(alpha), error_rate=EWMA(alpha, initial=0.0))
+            for endpoint in self.endpoints
+        }
+        self._lock = threading.Lock()
+
+    def latency_prior(self) -> float:
+        """Median measured latency, or 1.0 before any endpoint has answered."""
+        measured = sorted(
+            stats.latency.value for stats in self.stats.values() if stats.latency.value is not None
+        )
+        if not measured:
+            return 1.0
+        return statistics.median(measured)
+
+    def score(self, endpoint: Endpoint, prior: float | None = None) -> float:
+        stats = self.stats[endpoint.name]
+        latency = stats.latency.value
+        if latency is None:
+            latency = self.latency_prior() if prior is None else prior
+        return latency * (1.0 + self.error_penalty * (stats.error_rate.value or 0.0))
+
+    def is_healthy(self, endpoint: Endpoint) -> bool:
+        return self.stats[endpoint.name].ejected_until <= self.time_module.monotonic()
+
+    def ranked(self, exclude: Iterable[str] = ()) -> list[Endpoint]:
+        """Return candidate endpoints, best first.
+
+        Healthy endpoints come first; ejected ones follow ordered by how soon
+        they recover, so a request still has somewhere to go if all are down.
+        """
+        excluded = set(exclude)
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.name not in excluded]
+            prior = self.latency_prior()
+            healthy = sorted(
+                (endpoint for endpoint in candidates if self.is_healthy(endpoint)),
+                key=lambda endpoint: self.score(endpoint, prior),
+            )
+            ejected = sorted(
+                (endpoint for endpoint in candidates if not self.is_healthy(endpoint)),
+                key=lambda endpoint: self.stats[endpoint.name].ejected_until,
+            )
+        return healthy + ejected
+
+    def record_success(self, endpoint: Endpoint, latency: float) -> None:
+        with self._lock:
+            stats = self.stats[endpoint.name]
+            stats.latency.update(latency)
+            stats.error_rate.update(0.0)
+            if stats.ejected_until:
+                log_info(f"OCR 端点已恢复: {endpoint.name}")
+            stats.consecutive_failures = 0
+            stats.ejected_until = 0.0
+
+    def record_failure(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            stats = self.stats[endpoint.name]
+            stats.error_rate.update(1.0)
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.failures_to_eject:
+                stats.ejected_until = self.time_module.monotonic() + self.eject_seconds
+                log_warn(f"OCR 端点连续失败 {stats.consecutive_failures} 次，暂停使用 {self.eject_seconds:.0f} 秒: {endpoint.name}")
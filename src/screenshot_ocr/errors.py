@@ -0,0 +1,26 @@
+"""Exception types raised by the OCR request layer."""
+
+from __future__ import annotations
+
+
+class OCRRequestError(Exception):
+    """A failed OCR API call, classified for retry decisions."""
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        status_code: int | None = None,
+        retryable: bool = False,
+        retry_after: float | None = None,
+        timed_out: bool = False,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.timed_out = timed_out
+
+
+class CircuitOpenError(OCRRequestError):
+    """Raised without touching the network while the circuit breaker is open."""
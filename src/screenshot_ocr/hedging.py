@@ -0,0 +1,168 @@
+"""Hedged requests: race a duplicate when the first one is unusually slow."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+from .latency import LatencyTracker
+from .logging_utils import log_debug
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgePolicy:
+    """When to fire a hedge and how much extra traffic hedging may cost.
+
+    A hedge fires once the primary request has been outstanding for the
+    rolling ``percentile`` of recent latencies. ``budget_ratio`` caps hedges
+    to that fraction of all requests, with ``budget_burst`` allowed up front.
+    """
+
+    percentile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.3
+    max_delay: float = 10.0
+    budget_ratio: float = 0.1
+    budget_burst: float = 2.0
+    window: int = 200
+
+
+class HedgeBudget:
+    """Token bucket refilled by ``ratio`` tokens per request; a hedge costs one."""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = max(0.0, ratio)
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+class HedgeCancel(threading.Event):
+    """Event set when a racer loses; runs the racer's registered closers.
+
+    ``Future.cancel`` cannot stop a request that is already running, so a
+    racer registers whatever holds its connection (usually
+    ``response.close``) and losing closes it mid-download.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._closers: list[Callable[[], object]] = []
+        self._closers_lock = threading.Lock()
+
+    def on_cancel(self, closer: Callable[[], object]) -> None:
+        with self._closers_lock:
+            if not self.is_set():
+                self._closers.append(closer)
+                return
+        closer()
+
+    def set(self) -> None:
+        with self._closers_lock:
+            super().set()
+            closers, self._closers = self._closers, []
+        for closer in closers:
+            try:
+                closer()
+            except Exception as exc:
+                log_debug(f"关闭落败的对冲请求失败: {exc}")
+
+
+class RequestHedger:
+    """Run a request, racing a duplicate after the hedge delay.
+
+    ``send`` receives a ``HedgeCancel`` that is set when its result is no
+    longer wanted, so a losing request can release its connection early.
+    Hedges run on their own workers so a full primary pool cannot starve them.
+    """
+
+    def __init__(
+        self,
+        policy: HedgePolicy | None = None,
+        *,
+        tracker: LatencyTracker | None = None,
+        max_workers: int = 4,
+    ):
+        self.policy = policy or HedgePolicy()
+        self.tracker = tracker or LatencyTracker(self.policy.window)
+        self.budget = HedgeBudget(self.policy.budget_ratio, self.policy.budget_burst)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ocr-primary")
+        self.hedge_executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ocr-hedge")
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.hedge_count = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> float | None:
+        if len(self.tracker) < self.policy.min_samples:
+            return None
+        observed = self.tracker.percentile(self.policy.percentile)
+        if observed is None:
+            return None
+        return min(self.policy.max_delay, max(self.policy.min_delay, observed))
+
+    def _timed(self, send: Callable[[HedgeCancel], T], cancelled: HedgeCancel) -> T:
+        started_at = time.perf_counter()
+        result = send(cancelled)
+        self.tracker.record(time.perf_counter() - started_at)
+        return result
+
+    def run(self, send: Callable[[HedgeCancel], T]) -> T:
+        with self._lock:
+            self.request_count += 1
+        self.budget.deposit()
+        delay = self.hedge_delay()
+        primary_cancelled = HedgeCancel()
+        primary = self.executor.submit(self._timed, send, primary_cancelled)
+
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.budget.try_spend():
+            return primary.result()
+
+        with self._lock:
+            self.hedge_count += 1
+        log_debug(f"请求超过 {delay:.2f}s 仍未返回，发送对冲请求")
+        hedge_cancelled = HedgeCancel()
+        hedge = self.hedge_executor.submit(self._timed, send, hedge_cancelled)
+        racers: dict[Future[T], HedgeCancel] = {
+            primary: primary_cancelled,
+            hedge: hedge_cancelled,
+        }
+
+        pending = set(racers)
+        last_error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    last_error = error
+                    continue
+                for loser in pending:
+                    racers[loser].set()
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return future.result()
+        assert last_error is not None
+        raise last_error
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.hedge_executor.shutdown(wait=False, cancel_futures=True)
@@ -38,6 +38,7 @@ class HotkeyListener:
         mode: str,
         long_press_time: float,
         on_trigger: Callable[[], None],
+        on_press: Callable[[], None] | None = None,
         keyboard_module: Any | None = None,
         time_module: Any | None = None,
     ):
@@ -45,6 +46,8 @@ class HotkeyListener:
         self.mode = mode
         self.long_press_time = long_press_time
         self.on_trigger = on_trigger
+        # Called as soon as the key goes down, e.g. to pre-warm the connection.
+        self.on_press = on_press
         self.keyboard_module = keyboard_module
         self.time_module = time_module or time
         self.key_pressed = False
@@ -62,7 +65,7 @@ class HotkeyListener:
         keyboard = self._keyboard()
         log_ok(f"热键监听已启动: {self.hotkey}")
         if "+" in self.hotkey:
-            keyboard.add_hotkey(self.hotkey, self.on_trigger)
+            keyboard.add_hotkey(self.hotkey, self._on_combination)
             log_ok(f"组合键热键已注册: {self.hotkey}")
         else:
             keyboard.on_press_key(self.hotkey, self.on_key_press)
@@ -74,12 +77,19 @@ class HotkeyListener:
         keyboard.unhook_all()
         keyboard.clear_hotkeys()
 
+    def _on_combination(self) -> None:
+        if self.on_press is not None:
+            self.on_press()
+        self.on_trigger()
+
     def on_key_press(self, _event: Any) -> None:
         if self.key_pressed:
             return
         self.key_pressed = True
         self.key_press_time = self.time_module.time()
         log_debug("按键按下")
+        if self.on_press is not None:
+            self.on_press()
         if self.mode == "instant":
             self.on_trigger()
 
@@ -0,0 +1,109 @@
+"""Cheap image statistics computed locally before any OCR request."""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+import numpy as np
+from PIL import Image
+
+from .image_io import ImageInput, open_image
+
+# Larger images are sampled at reduced width; line detection only needs rows.
+ANALYSIS_MAX_WIDTH = 1024
+INK_CONTRAST = 48
+
+
+@dataclass(frozen=True)
+class ImageFeatures:
+    width: int
+    height: int
+    ink_density: float
+    line_count: int
+
+    @property
+    def area(self) -> int:
+        return self.width * self.height
+
+
+def to_grayscale_array(image: Image.Image, max_width: int = ANALYSIS_MAX_WIDTH) -> np.ndarray:
+    """Return a ``uint8`` luminance array, downscaled to at most ``max_width``."""
+    gray = image.convert("L")
+    if gray.width > max_width:
+        height = max(1, round(gray.height * max_width / gray.width))
+        gray = gray.resize((max_width, height), Image.Resampling.BOX)
+    return np.asarray(gray, dtype=np.uint8)
+
+
+def ink_mask(gray: np.ndarray, contrast: int = INK_CONTRAST) -> np.ndarray:
+    """Mark pixels that differ clearly from the dominant background tone."""
+    background = int(np.median(gray))
+    return np.abs(gray.astype(np.int16) - background) > contrast
+
+
+def find_runs(profile: np.ndarray, *, min_gap: int = 1) -> list[tuple[int, int]]:
+    """Return ``[start, end)`` runs where ``profile`` is true.
+
+    Gaps shorter than ``min_gap`` are bridged so broken glyphs stay together.
+    """
+    active = np.flatnonzero(profile)
+    if active.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(active) > min_gap)
+    starts = np.concatenate(([active[0]], active[breaks + 1]))
+    ends = np.concatenate((active[breaks], [active[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def estimate_line_count(mask: np.ndarray, *, min_height: int = 3) -> int:
+    """Count text lines as runs of inked rows in the horizontal projection."""
+    if mask.size == 0:
+        return 0
+    row_ink = mask.mean(axis=1) > 0.002
+    return sum(1 for start, end in find_runs(row_ink, min_gap=1) if end - start >= min_height)
+
+
+def compute_image_features(image: Image.Image) -> ImageFeatures:
+    gray = to_grayscale_array(image)
+    mask = ink_mask(gray)
+    return ImageFeatures(
+        width=image.width,
+        height=image.height,
+        ink_density=float(mask.mean()) if mask.size else 0.0,
+        line_count=estimate_line_count(mask),
+    )
+
+
+_HINTS: dict[int, tuple[Any, ImageFeatures]] = {}
+_HINTS_LOCK = threading.Lock()
+
+
+@contextmanager
+def features_hint(image: ImageInput, features: ImageFeatures) -> Iterator[None]:
+    """Let :func:`features_for` reuse ``features`` for this exact ``image`` object.
+
+    The service computes features to route a capture; the client needs the
+    same ones to plan its budget. The hint lasts for the ``with`` block and
+    holds ``image`` so its ``id`` cannot be reused meanwhile.
+    """
+    key = id(image)
+    with _HINTS_LOCK:
+        _HINTS[key] = (image, features)
+    try:
+        yield
+    finally:
+        with _HINTS_LOCK:
+            _HINTS.pop(key, None)
+
+
+def features_for(image: ImageInput) -> ImageFeatures:
+    """Return the hinted features for ``image``, computing them if there are none."""
+    with _HINTS_LOCK:
+        hint = _HINTS.get(id(image))
+    if hint is not None and hint[0] is image:
+        return hint[1]
+    with open_image(image) as opened:
+        return compute_image_features(opened)
@@ -0,0 +1,53 @@
+"""Accept images as files, PIL images, pixel arrays or encoded bytes alike."""
+
+from __future__ import annotations
+
+import io
+import os
+from contextlib import contextmanager
+from typing import Any, Iterator, Protocol, Union
+
+from PIL import Image
+
+
+class PixelArray(Protocol):
+    """A ``uint8`` pixel array (H x W [x C]), e.g. a NumPy ``ndarray``."""
+
+    @property
+    def __array_interface__(self) -> dict[str, Any]:
+        ...
+
+
+# A file path, a PIL image, a pixel array or the bytes of an encoded image file.
+ImageInput = Union[str, "os.PathLike[str]", Image.Image, bytes, bytearray, memoryview, PixelArray]
+
+
+def is_image_path(source: ImageInput) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+@contextmanager
+def open_image(source: ImageInput) -> Iterator[Image.Image]:
+    """Yield ``source`` as a PIL image, closing it afterwards only if opened here."""
+    if isinstance(source, Image.Image):
+        yield source
+        return
+    if is_image_path(source):
+        image = Image.open(source)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        image = Image.open(io.BytesIO(source))
+    elif hasattr(source, "__array_interface__"):
+        image = Image.fromarray(source)
+    else:
+        raise TypeError(f"不支持的图片输入类型: {type(source).__name__}")
+    try:
+        yield image
+    finally:
+        image.close()
+
+
+def image_size(source: ImageInput) -> tuple[int, int]:
+    """Return ``(width, height)``; files and encoded bytes only have their header read."""
+    with open_image(source) as image:
+        return image.size
+
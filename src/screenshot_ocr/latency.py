@@ -0,0 +1,88 @@
+"""Rolling latency statistics shared by request scheduling features."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """Keep the most recent latency samples and answer percentile queries."""
+
+    def __init__(self, window: int = 200):
+        self.window = max(1, int(window))
+        self._samples: deque[float] = deque(maxlen=self.window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(max(0.0, float(seconds)))
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the nearest-rank percentile for ``fraction`` in ``[0, 1]``."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        fraction = min(1.0, max(0.0, fraction))
+        rank = max(1, math.ceil(fraction * len(ordered)))
+        return ordered[rank - 1]
+
+
+class EWMA:
+    """Exponentially weighted moving average; ``value`` is None until first sample."""
+
+    def __init__(self, alpha: float = 0.3, initial: float | None = None):
+        self.alpha = min(1.0, max(0.0, alpha))
+        self.value = initial
+
+    def update(self, sample: float) -> float:
+        if self.value is None:
+            self.value = float(sample)
+        else:
+            self.value = self.alpha * float(sample) + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class OnlineLinearFit:
+    """Least-squares fit of ``y = a + b * x`` over exponentially decayed samples.
+
+    With fewer than two distinct ``x`` values the prediction is the mean of
+    ``y``, which keeps early estimates sane.
+    """
+
+    def __init__(self, decay: float = 0.98):
+        self.decay = min(1.0, max(0.0, decay))
+        self.samples = 0
+        self.weight = 0.0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.sum_xx = 0.0
+        self.sum_xy = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, x: float, y: float) -> None:
+        with self._lock:
+            self.samples += 1
+            self.weight = self.weight * self.decay + 1.0
+            self.sum_x = self.sum_x * self.decay + x
+            self.sum_y = self.sum_y * self.decay + y
+            self.sum_xx = self.sum_xx * self.decay + x * x
+            self.sum_xy = self.sum_xy * self.decay + x * y
+
+    def predict(self, x: float) -> float | None:
+        with self._lock:
+            if self.weight <= 0.0:
+                return None
+            mean_x = self.sum_x / self.weight
+            mean_y = self.sum_y / self.weight
+            variance = self.sum_xx / self.weight - mean_x * mean_x
+            if variance <= 1e-9:
+                return mean_y
+            slope = (self.sum_xy / self.weight - mean_x * mean_y) / variance
+        return max(0.0, mean_y + slope * (x - mean_x))
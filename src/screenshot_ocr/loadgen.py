@@ -0,0 +1,227 @@
+"""Drive the OCR client at a target request rate and report latency and errors.
+
+Requests are scheduled open-loop: the n-th request is due at ``n / rps``
+whether or not earlier ones finished, and latency is measured from that due
+time. Queueing behind busy workers therefore shows up in the percentiles
+instead of silently lowering the offered load.
+
+Run ``python -m screenshot_ocr.loadgen --help``; ``--stub`` starts a local
+stub server so concurrency and retry settings can be sized offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+from PIL import Image, ImageDraw
+
+from .app import OCRService
+from .config import AppConfig
+from .errors import CircuitOpenError, OCRRequestError
+from .latency import LatencyTracker
+from .logging_utils import set_debug_enabled
+from .ocr_client import PaddleOCRVL, SiliconFlowOCR
+from .retry import RetryPolicy
+from .stub_server import CANNED_OUTPUTS, LatencyDistribution, StubOCRServer, parse_fault_spec
+from .transport import HTTPTransport
+
+
+def classify_error(exc: BaseException) -> str:
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(exc, OCRRequestError):
+        if exc.status_code is not None:
+            return f"http_{exc.status_code}"
+        return "timeout" if exc.timed_out else "request_error"
+    return type(exc).__name__
+
+
+@dataclass
+class LoadReport:
+    sent: int = 0
+    succeeded: int = 0
+    elapsed: float = 0.0
+    errors: dict[str, int] = field(default_factory=dict)
+    latencies: LatencyTracker = field(default_factory=lambda: LatencyTracker(window=1_000_000))
+    server_requests: int | None = None
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / self.sent if self.sent else 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        def ms(fraction: float) -> str:
+            value = self.latencies.percentile(fraction)
+            return "-" if value is None else f"{value * 1000:.0f}ms"
+
+        lines = [
+            f"发送 {self.sent}  成功 {self.succeeded}  失败 {self.failed} ({self.error_rate:.1%})  "
+            f"用时 {self.elapsed:.1f}s  吞吐 {self.throughput:.2f}/s",
+            f"延迟 p50={ms(0.5)}  p95={ms(0.95)}  p99={ms(0.99)}",
+        ]
+        if self.errors:
+            lines.append("错误: " + ", ".join(f"{kind}={count}" for kind, count in sorted(self.errors.items())))
+        if self.server_requests is not None and self.sent:
+            lines.append(f"服务端请求 {self.server_requests} (含重试，放大 {self.server_requests / self.sent:.2f}x)")
+        return "\n".join(lines)
+
+
+def make_image_variants(image_paths: Sequence[str], count: int, directory: str) -> list[str]:
+    """Write ``count`` images that differ by one pixel so none are coalesced."""
+    variants: list[str] = []
+    for index in range(max(1, count)):
+        if image_paths:
+            with Image.open(image_paths[index % len(image_paths)]) as source:
+                image = source.convert("RGB")
+        else:
+            image = Image.new("RGB", (640, 160), "white")
+            ImageDraw.Draw(image).text((16, 60), f"Load test sample {index}", fill="black")
+        image.putpixel((0, 0), (index % 256, index // 256 % 256, 255))
+        path = os.path.join(directory, f"variant_{index:04d}.png")
+        image.save(path)
+        variants.append(path)
+    return variants
+
+
+def run_load(
+    recognize: Callable[[str], Any],
+    images: Sequence[str],
+    *,
+    rps: float,
+    duration: float,
+    concurrency: int = 8,
+    time_module: Any | None = None,
+) -> LoadReport:
+    time_module = time_module or time
+    report = LoadReport()
+    lock = threading.Lock()
+    total = max(1, int(rps * duration))
+
+    def task(image_path: str, due_at: float) -> None:
+        try:
+            recognize(image_path)
+        except Exception as exc:
+            kind = classify_error(exc)
+            with lock:
+                report.errors[kind] = report.errors.get(kind, 0) + 1
+            return
+        report.latencies.record(time_module.perf_counter() - due_at)
+        with lock:
+            report.succeeded += 1
+
+    started_at = time_module.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for index in range(total):
+            due_at = started_at + index / rps
+            delay = due_at - time_module.perf_counter()
+            if delay > 0:
+                time_module.sleep(delay)
+            report.sent += 1
+            executor.submit(task, images[index % len(images)], due_at)
+    report.elapsed = time_module.perf_counter() - started_at
+    return report
+
+
+def build_recognizer(args: argparse.Namespace, base_url: str) -> Callable[[str], Any]:
+    transport = HTTPTransport(pool_maxsize=args.concurrency)
+    retry_policy = RetryPolicy(max_attempts=args.max_attempts)
+    if args.target == "service":
+        service = OCRService(
+            AppConfig(api_key=args.api_key),
+            server_url=base_url,
+            model_name=args.model,
+            backend="vllm-server",
+            pipeline_factory=functools.partial(PaddleOCRVL, vl_rec_retry_policy=retry_policy),
+            transport=transport,
+        )
+        service.initialize()
+        if args.stream:
+            return lambda path: list(service.recognize_file_stream(path))
+        return service.recognize_file
+
+    client = SiliconFlowOCR(
+        api_key=args.api_key,
+        base_url=base_url,
+        model=args.model,
+        transport=transport,
+        retry_policy=retry_policy,
+    )
+    if args.stream:
+        return lambda path: list(client.recognize_stream(path))
+    return client.recognize
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="OCR 压测工具：按目标 RPS 发送请求并统计延迟和错误率")
+    parser.add_argument("--rps", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=20.0, help="压测时长（秒）")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--target", choices=("client", "service"), default="client")
+    parser.add_argument("--stream", action="store_true", help="使用流式识别")
+    parser.add_argument("--image", action="append", default=[], help="压测图片（可重复），默认生成合成图片")
+    parser.add_argument("--variants", type=int, default=32, help="生成的不同图片数量")
+    parser.add_argument("--base-url", default="https://api.siliconflow.cn/v1")
+    parser.add_argument("--api-key", default=os.environ.get("SILICONFLOW_API_KEY", ""))
+    parser.add_argument("--model", default="PaddlePaddle/PaddleOCR-VL")
+    parser.add_argument("--stub", action="store_true", help="压测本地模拟服务")
+    parser.add_argument("--stub-latency", default="lognormal:0.8:0.4")
+    parser.add_argument("--stub-fault", action="append", default=[], help="如 429:0.05（可重复）")
+    parser.add_argument("--stub-retry-after", type=float)
+    parser.add_argument("--stub-content", action="append", help=f"预置名称: {', '.join(CANNED_OUTPUTS)}")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true", help="输出调试日志")
+    args = parser.parse_args(argv)
+    set_debug_enabled(args.verbose)
+
+    stub: StubOCRServer | None = None
+    base_url = args.base_url
+    if args.stub:
+        stub = StubOCRServer(
+            content=[CANNED_OUTPUTS.get(item, item) for item in args.stub_content or ["receipt"]],
+            latency=LatencyDistribution.parse(args.stub_latency),
+            faults=dict(parse_fault_spec(spec) for spec in args.stub_fault),
+            retry_after=args.stub_retry_after,
+            seed=args.seed,
+        ).start()
+        base_url = stub.base_url
+        args.api_key = args.api_key or "sk-stub"
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="ocr_load_") as directory:
+            images = make_image_variants(args.image, args.variants, directory)
+            recognize = build_recognizer(args, base_url)
+            print(f"压测 {base_url}: {args.rps} rps x {args.duration}s, 并发 {args.concurrency}, 目标 {args.target}")
+            report = run_load(
+                recognize,
+                images,
+                rps=args.rps,
+                duration=args.duration,
+                concurrency=args.concurrency,
+            )
+    finally:
+        if stub is not None:
+            stub.stop()
+    if stub is not None:
+        report.server_requests = stub.request_count
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,21 @@ from __future__ import annotations
 
 import traceback
 
+_debug_enabled = True
+
+
+def set_debug_enabled(enabled: bool) -> None:
+    global _debug_enabled
+    _debug_enabled = enabled
+
 
 def _log(level: str, message: str) -> None:
     print(f"[{level}] {message}")
 
 
 def log_debug(message: str) -> None:
-    _log("DEBUG", message)
+    if _debug_enabled:
+        _log("DEBUG", message)
 
 
 def log_info(message: str) -> None:
@@ -2,20 +2,47 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
-import io
-from typing import Any
+import re
+import time
+from typing import Any, Callable, Iterable, Iterator, Sequence, TypeVar
 
 import requests
-from PIL import Image
 
+from .budget import RequestBudget, RequestBudgetModel
+from .backends import BackendCapabilities, OCRBackend, create_backend, register_backend
+from .endpoints import Endpoint, EndpointPool
+from .encoder import EncodedImage, ImageEncoder
+from .errors import CircuitOpenError, OCRRequestError
+from .image_io import ImageInput
+from .hedging import HedgeCancel, HedgePolicy, RequestHedger
+from .image_features import ImageFeatures, features_for
 from .logging_utils import log_debug, log_warn
+from .repetition import RepetitionGuard
+from .request_body import StreamingJSONBody, image_placeholder
+from .results import OCRResult
+from .retry import CircuitBreaker, RetryPolicy, parse_retry_after
+from .singleflight import AsyncSingleFlight, SingleFlight, image_content_key
+from .streaming import LineAssembler, iter_content_deltas, iter_sse_data
+from .tiling import TiledOCRBackend, TilePolicy
+from .transport import HTTPTransport
+from .usage import TokenThrottle, UsageLedger, UsageRecord, estimate_request_bytes
+
+T = TypeVar("T")
+
+DEFAULT_MAX_TOKENS = 15000
+DEFAULT_TIMEOUT = 60
+DEFAULT_MIME_TYPE = "image/png"
 
 
 def extract_text_from_prediction(results: list[dict[str, Any]]) -> list[str]:
     """Extract normalized text lines from compatibility prediction results."""
     text_list: list[str] = []
     for result in results:
+        if isinstance(result, OCRResult):
+            text_list.extend(result.texts)
+            continue
         parsing_res = result.get("parsing_res_list", [])
         for item in parsing_res:
             content = getattr(item, "content", "")
@@ -24,8 +51,14 @@ def extract_text_from_prediction(results: list[dict[str, Any]]) -> list[str]:
     return text_list
 
 
-def _deduplicate_lines(raw_lines: list[str]) -> list[str]:
-    unique_lines: list[str] = []
+def _finish_reason(result: dict[str, Any]) -> str | None:
+    try:
+        return result["choices"][0].get("finish_reason")
+    except (KeyError, IndexError, AttributeError):
+        return None
+
+
+def _iter_deduplicated_lines(raw_lines: Iterable[str]) -> Iterator[str]:
     prev_line: str | None = None
     for line in raw_lines:
         if line == prev_line:
@@ -43,44 +76,182 @@ def _deduplicate_lines(raw_lines: list[str]) -> list[str]:
         if dedup_line != line:
             log_debug(f"去重: 行内去重 {line!r} -> {dedup_line!r}")
 
-        unique_lines.append(dedup_line)
+        yield dedup_line
         prev_line = line
-    return unique_lines
 
 
-class SiliconFlowOCR:
-    """Lightweight SiliconFlow OCR client using the OpenAI-compatible endpoint."""
+def _deduplicate_lines(raw_lines: list[str]) -> list[str]:
+    return list(_iter_deduplicated_lines(raw_lines))
+
+
+BATCH_MARKER_PATTERN = re.compile(r"^\s*=+\s*IMAGE\s*(\d+)\s*=+\s*$", re.IGNORECASE)
+
+
+def build_batch_prompt(image_count: int) -> str:
+    return (
+        f"OCR each of the {image_count} images above separately. "
+        "Before the text of image k, output a line containing exactly "
+        "\"=== IMAGE k ===\". Output nothing else, and output the marker "
+        "even when an image has no text."
+    )
+
+
+def split_batch_content(content: str, image_count: int) -> list[str] | None:
+    """Split a batched answer on ``=== IMAGE k ===`` markers.
+
+    Returns ``None`` unless every image from 1 to ``image_count`` appears
+    exactly once, so callers can fall back to one request per image.
+    """
+    sections: dict[int, list[str]] = {}
+    current: list[str] | None = None
+    for line in content.split("\n"):
+        match = BATCH_MARKER_PATTERN.match(line)
+        if match:
+            index = int(match.group(1))
+            if index in sections:
+                return None
+            current = sections.setdefault(index, [])
+            continue
+        if current is not None:
+            current.append(line)
+    if sorted(sections) != list(range(1, image_count + 1)):
+        return None
+    return ["\n".join(sections[index]) for index in range(1, image_count + 1)]
+
+
+class _SiliconFlowClientBase:
+    """Payload building and response parsing shared by sync and async clients."""
 
     def __init__(
         self,
         api_key: str,
         base_url: str = "https://api.siliconflow.cn/v1",
         model: str = "PaddlePaddle/PaddleOCR-VL",
+        *,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        usage_ledger: UsageLedger | None = None,
+        throttle: TokenThrottle | None = None,
+        encoder: ImageEncoder | None = None,
     ):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.usage_ledger = usage_ledger
+        self.throttle = throttle
+        self.encoder = encoder or ImageEncoder()
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
 
-    def _encode_image(self, image_path: str) -> str:
-        image = Image.open(image_path)
-        log_debug(f"原始图片尺寸: {image.size}, 模式: {image.mode}")
+    @property
+    def completions_url(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    def _status_error(self, status_code: int, text: str, retry_after: str | None) -> OCRRequestError:
+        return OCRRequestError(
+            f"API 请求失败 (状态码 {status_code}): {text}",
+            status_code=status_code,
+            retry_after=parse_retry_after(retry_after),
+        )
+
+    def _before_attempt(self) -> None:
+        if not self.circuit_breaker.allow_request():
+            remaining = self.circuit_breaker.remaining_open_time()
+            raise CircuitOpenError(f"API 暂时不可用（熔断中），请 {remaining:.0f} 秒后再试")
 
-        if image.mode != "RGB":
-            image = image.convert("RGB")
+    def _after_failure(self, exc: OCRRequestError, attempt: int) -> float:
+        """Record a failed attempt and return the delay before the next one.
 
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        Re-raises when the policy gives up on the request. Any HTTP answer
+        that is not worth retrying, such as a 400, shows the endpoint is up
+        and closes the breaker.
+        """
+        if self.retry_policy.is_retryable(exc) or exc.status_code is None:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        if not self.retry_policy.should_retry(exc, attempt):
+            if exc.timed_out and attempt > 1:
+                raise OCRRequestError(
+                    f"API 请求超时: 已重试 {attempt} 次",
+                    retryable=True,
+                    timed_out=True,
+                ) from exc
+            raise exc
+        delay = self.retry_policy.compute_delay(attempt, exc.retry_after)
+        log_warn(f"{exc}，{delay:.1f} 秒后重试 ({attempt}/{self.retry_policy.max_attempts})...")
+        return delay
+
+    def _record_usage(
+        self,
+        payload: dict[str, Any] | StreamingJSONBody,
+        usage: dict[str, Any] | None,
+        latency: float,
+        *,
+        ok: bool = True,
+    ) -> None:
+        if self.usage_ledger is None and self.throttle is None:
+            return
+        if isinstance(payload, StreamingJSONBody):
+            model, bytes_uploaded = payload.model, len(payload)
+        else:
+            model, bytes_uploaded = payload.get("model"), estimate_request_bytes(payload)
+        record = UsageRecord.from_usage(
+            usage,
+            model=model or self.model,
+            bytes_uploaded=bytes_uploaded,
+            latency=latency,
+            ok=ok,
+        )
+        if self.usage_ledger is not None:
+            self.usage_ledger.record(record)
+        if self.throttle is not None:
+            self.throttle.record(record.total_tokens)
+
+    def _encode_image(self, image: ImageInput) -> str:
+        encoded = base64.b64encode(self.encoder.encode(image).data).decode("utf-8")
         log_debug(f"Base64 编码后大小: {len(encoded)} 字符 (~{len(encoded)//1024}KB)")
         return encoded
 
-    def _build_payload(self, image_base64: str) -> dict[str, Any]:
+    def _build_body(
+        self,
+        image: EncodedImage | bytes | memoryview,
+        model: str | None = None,
+        *,
+        stream: bool = False,
+        max_tokens: int | None = None,
+    ) -> StreamingJSONBody:
+        """Build a streamed request body for one image, base64-encoded lazily.
+
+        Raw bytes are taken to be PNG data.
+        """
+        if isinstance(image, EncodedImage):
+            image_data, mime_type = image.data, image.mime_type
+        else:
+            image_data, mime_type = image, DEFAULT_MIME_TYPE
+        payload = self._build_payload(image_placeholder(0), model, max_tokens=max_tokens, mime_type=mime_type)
+        if stream:
+            payload["stream"] = True
+            # Without this OpenAI-compatible servers stream no usage at all.
+            payload["stream_options"] = {"include_usage": True}
+        body = StreamingJSONBody(payload, [image_data])
+        log_debug(f"请求体大小: {len(body)} 字节 (~{len(body)//1024}KB)")
+        return body
+
+    def _build_payload(
+        self,
+        image_base64: str,
+        model: str | None = None,
+        *,
+        max_tokens: int | None = None,
+        mime_type: str = DEFAULT_MIME_TYPE,
+    ) -> dict[str, Any]:
         return {
-            "model": self.model,
+            "model": model or self.model,
             "messages": [
                 {
                     "role": "user",
@@ -88,7 +259,7 @@ class SiliconFlowOCR:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{image_base64}",
+                                "url": f"data:{mime_type};base64,{image_base64}",
                             },
                         },
                         {"type": "text", "text": "OCR:"},
@@ -96,42 +267,43 @@ class SiliconFlowOCR:
                 }
             ],
             "temperature": 0.0,
-            "max_tokens": 15000,
+            "max_tokens": max_tokens or DEFAULT_MAX_TOKENS,
         }
 
-    def _request(self, payload: dict[str, Any]) -> dict[str, Any]:
-        url = f"{self.base_url}/chat/completions"
-        log_debug(f"发送请求到: {url}")
-        log_debug(f"模型: {self.model}")
-
-        max_retries = 3
-        response = None
-        for attempt in range(max_retries):
-            try:
-                response = requests.post(url, json=payload, headers=self.headers, timeout=60)
-                log_debug(f"响应状态码: {response.status_code}")
-                break
-            except requests.exceptions.Timeout:
-                if attempt < max_retries - 1:
-                    log_warn(f"请求超时，正在重试 ({attempt + 1}/{max_retries})...")
-                    continue
-                raise Exception(f"API 请求超时: 已重试 {max_retries} 次")
-            except requests.exceptions.RequestException as exc:
-                raise Exception(f"API 请求失败: {exc}")
-
-        if response is None:
-            raise Exception("API 请求失败: 未收到响应")
-        if response.status_code != 200:
-            raise Exception(f"API 请求失败 (状态码 {response.status_code}): {response.text}")
-        return response.json()
+    def _build_batch_payload(
+        self,
+        images_base64: list[str],
+        model: str | None = None,
+        *,
+        mime_types: Sequence[str] | None = None,
+    ) -> dict[str, Any]:
+        mime_types = mime_types or [DEFAULT_MIME_TYPE] * len(images_base64)
+        content: list[dict[str, Any]] = []
+        for index, (image_base64, mime_type) in enumerate(zip(images_base64, mime_types), start=1):
+            content.append({"type": "text", "text": f"Image {index}:"})
+            content.append(
+                {
+                    "type": "image_url",
+                    "image_url": {"url": f"data:{mime_type};base64,{image_base64}"},
+                }
+            )
+        content.append({"type": "text", "text": build_batch_prompt(len(images_base64))})
+        return {
+            "model": model or self.model,
+            "messages": [{"role": "user", "content": content}],
+            "temperature": 0.0,
+            "max_tokens": DEFAULT_MAX_TOKENS,
+        }
 
-    def _parse_response(self, result: dict[str, Any]) -> list[str]:
+    def _extract_content(self, result: dict[str, Any]) -> str:
         try:
             content = result["choices"][0]["message"]["content"]
-        except (KeyError, IndexError) as exc:
-            raise Exception(f"解析 API 响应失败: {exc}, 完整响应: {result}")
-
+        except (KeyError, IndexError, TypeError) as exc:
+            raise OCRRequestError(f"解析 API 响应失败: {exc}, 完整响应: {result}") from exc
         log_debug(f"API 返回内容:\n{content!r}\n")
+        return content or ""
+
+    def _content_to_lines(self, content: str) -> list[str]:
         if not content or content.strip() == "":
             log_warn("API 返回空内容，可能是图片太小或没有文字")
             return []
@@ -143,16 +315,719 @@ class SiliconFlowOCR:
             log_debug(f"  行 {index}: {line!r}")
         return unique_lines
 
-    def recognize(self, image_path: str) -> list[str]:
-        image_base64 = self._encode_image(image_path)
-        payload = self._build_payload(image_base64)
-        result = self._request(payload)
+    def _parse_response(self, result: dict[str, Any]) -> list[str]:
+        return self._content_to_lines(self._extract_content(result))
+
+    def _parse_batch_response(self, result: dict[str, Any], image_count: int) -> list[list[str]] | None:
+        sections = split_batch_content(self._extract_content(result), image_count)
+        if sections is None:
+            return None
+        return [self._content_to_lines(section) for section in sections]
+
+
+class SiliconFlowOCR(_SiliconFlowClientBase):
+    """Lightweight SiliconFlow OCR client using the OpenAI-compatible endpoint."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.siliconflow.cn/v1",
+        model: str = "PaddlePaddle/PaddleOCR-VL",
+        transport: HTTPTransport | None = None,
+        *,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        detect_repetition: bool = True,
+        single_flight: SingleFlight | None = None,
+        usage_ledger: UsageLedger | None = None,
+        throttle: TokenThrottle | None = None,
+        budget_model: RequestBudgetModel | None = None,
+        encoder: ImageEncoder | None = None,
+        time_module: Any | None = None,
+    ):
+        super().__init__(
+            api_key,
+            base_url,
+            model,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            usage_ledger=usage_ledger,
+            throttle=throttle,
+            encoder=encoder,
+        )
+        self.transport = transport or HTTPTransport()
+        # Without a budget model every request gets the fixed limits.
+        self.budget_model = budget_model
+        # Hedging is opt-in: it trades extra requests for a shorter tail.
+        self.hedger = RequestHedger(hedge_policy) if hedge_policy is not None else None
+        self.detect_repetition = detect_repetition
+        # Pass one SingleFlight to several clients to coalesce across them.
+        self.single_flight = single_flight or SingleFlight()
+        self.time_module = time_module or time
+
+    def _post(
+        self,
+        url: str,
+        payload: dict[str, Any] | StreamingJSONBody,
+        *,
+        stream: bool = False,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+    ) -> requests.Response:
+        body = {"data": payload} if isinstance(payload, StreamingJSONBody) else {"json": payload}
+        try:
+            response = self.transport.post(
+                url,
+                **body,
+                headers=self.headers,
+                timeout=timeout,
+                **({"stream": True} if stream else {}),
+            )
+        except requests.exceptions.Timeout as exc:
+            raise OCRRequestError("API 请求超时", retryable=True, timed_out=True) from exc
+        except requests.exceptions.ConnectionError as exc:
+            raise OCRRequestError(f"API 连接失败: {exc}", retryable=True) from exc
+        except requests.exceptions.RequestException as exc:
+            raise OCRRequestError(f"API 请求失败: {exc}") from exc
+
+        log_debug(f"响应状态码: {response.status_code}")
+        if response.status_code != 200:
+            raise self._status_error(
+                response.status_code,
+                response.text,
+                response.headers.get("Retry-After"),
+            )
+        return response
+
+    def _send_once(
+        self,
+        url: str,
+        payload: dict[str, Any] | StreamingJSONBody,
+        cancelled: HedgeCancel | None = None,
+        *,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+    ) -> dict[str, Any]:
+        # Hedged sends stream the body so a losing request can be dropped
+        # mid-download: losing closes the response and its socket.
+        response = self._post(url, payload, stream=cancelled is not None, timeout=timeout)
+        if cancelled is not None:
+            cancelled.on_cancel(response.close)
+            if cancelled.is_set():
+                raise OCRRequestError("对冲请求已取消")
+        return response.json()
+
+    def _with_retries(self, send: Callable[[], T], *, deadline_at: float | None = None) -> T:
+        attempt = 0
+        while True:
+            attempt += 1
+            self._before_attempt()
+            try:
+                result = send()
+            except OCRRequestError as exc:
+                delay = self._after_failure(exc, attempt)
+                if deadline_at is not None and self.time_module.monotonic() + delay >= deadline_at:
+                    raise OCRRequestError(
+                        f"{exc}（已到识别截止时间，不再重试）",
+                        status_code=exc.status_code,
+                        timed_out=exc.timed_out,
+                    ) from exc
+                self.time_module.sleep(delay)
+                continue
+            except Exception:
+                # An unparseable answer is as much a failure as a 503.
+                self.circuit_breaker.record_failure()
+                raise
+            finally:
+                # A cancelled probe must not keep the breaker half-open forever.
+                self.circuit_breaker.release_probe()
+            self.circuit_breaker.record_success()
+            return result
+
+    def _attempt_timeout(
+        self,
+        budget: RequestBudget | None,
+        deadline_at: float | None,
+    ) -> float | tuple[float, float]:
+        """Timeouts for the next attempt, with the read timeout cut to the time left."""
+        if budget is None or deadline_at is None:
+            return DEFAULT_TIMEOUT
+        remaining = deadline_at - self.time_module.monotonic()
+        return (budget.connect_timeout, max(0.1, min(budget.read_timeout, remaining)))
+
+    def _plan(self, image: ImageInput) -> tuple[ImageFeatures | None, RequestBudget | None]:
+        if self.budget_model is None:
+            return None, None
+        features = features_for(image)
+        return features, self.budget_model.plan(features)
+
+    def _record_budget_sample(
+        self,
+        features: ImageFeatures | None,
+        usage: dict[str, Any] | None,
+        latency: float,
+    ) -> None:
+        if self.budget_model is None or features is None or not usage:
+            return
+        completion_tokens = usage.get("completion_tokens")
+        if completion_tokens is not None:
+            self.budget_model.record(features, int(completion_tokens), latency)
+
+    def _request(
+        self,
+        payload: dict[str, Any] | StreamingJSONBody,
+        budget: RequestBudget | None = None,
+    ) -> dict[str, Any]:
+        url = self.completions_url
+        log_debug(f"发送请求到: {url}")
+        log_debug(f"模型: {self.model}")
+
+        if self.throttle is not None:
+            self.throttle.acquire()
+        started_at = time.perf_counter()
+        deadline_at = self.time_module.monotonic() + budget.deadline if budget is not None else None
+        try:
+            if self.hedger is not None:
+                hedger = self.hedger
+                result = self._with_retries(
+                    lambda: hedger.run(
+                        lambda cancelled: self._send_once(
+                            url,
+                            payload,
+                            cancelled,
+                            timeout=self._attempt_timeout(budget, deadline_at),
+                        )
+                    ),
+                    deadline_at=deadline_at,
+                )
+            else:
+                result = self._with_retries(
+                    lambda: self._send_once(url, payload, timeout=self._attempt_timeout(budget, deadline_at)),
+                    deadline_at=deadline_at,
+                )
+        except OCRRequestError:
+            self._record_usage(payload, None, time.perf_counter() - started_at, ok=False)
+            raise
+        self._record_usage(payload, result.get("usage"), time.perf_counter() - started_at)
+        return result
+
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        return self.recognize_result(image, model).texts
+
+    def recognize_result(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        """Recognize one image and keep stage timings, token usage and the raw response."""
+        key = image_content_key(image, self.base_url, model or self.model)
+        return self.single_flight.do(key, lambda: self._recognize_uncoalesced(image, model))
+
+    def _recognize_uncoalesced(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        started_at = time.perf_counter()
+        features, budget = self._plan(image)
+        encoded = self.encoder.encode(image)
+        body = self._build_body(encoded, model, max_tokens=budget.max_tokens if budget else None)
+        sent_at = time.perf_counter()
+        result = self._request(body, budget)
+        if budget is not None and budget.max_tokens < DEFAULT_MAX_TOKENS and _finish_reason(result) == "length":
+            # A too-small prediction must not cost the user text.
+            log_warn(f"输出达到预测的 max_tokens={budget.max_tokens}，使用完整额度重新识别")
+            body = self._build_body(encoded, model)
+            sent_at = time.perf_counter()
+            result = self._request(body, self.budget_model.default_budget() if self.budget_model else None)
+        received_at = time.perf_counter()
+        if _finish_reason(result) != "length":
+            self._record_budget_sample(features, result.get("usage"), received_at - sent_at)
         log_debug(f"完整 API 响应 JSON:\n{result}\n")
+        lines = self._parse_response(result)
+        finished_at = time.perf_counter()
+        return OCRResult.from_texts(
+            lines,
+            timings={
+                "encode": sent_at - started_at,
+                "request": received_at - sent_at,
+                "parse": finished_at - received_at,
+                "total": finished_at - started_at,
+            },
+            usage=result.get("usage"),
+            raw=result,
+            model=body.model,
+        )
+
+    def recognize_batch(
+        self,
+        images: Iterable[ImageInput],
+        model: str | None = None,
+        *,
+        batch_size: int = 8,
+    ) -> list[list[str]]:
+        """Recognize several images with one request per ``batch_size`` images.
+
+        Each chunk is sent as a single chat completion with several image
+        parts. If the request fails or the answer cannot be split back per
+        image, that chunk is retried one image at a time.
+        """
+        images = list(images)
+        batch_size = max(1, batch_size)
+        results: list[list[str]] = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            results.extend(self._recognize_chunk(chunk, model))
+        return results
+
+    def _recognize_chunk(self, images: list[ImageInput], model: str | None) -> list[list[str]]:
+        if len(images) == 1:
+            return [self.recognize(images[0], model)]
+        try:
+            encoded = [self.encoder.encode(image) for image in images]
+            payload = self._build_batch_payload(
+                [base64.b64encode(item.data).decode("utf-8") for item in encoded],
+                model,
+                mime_types=[item.mime_type for item in encoded],
+            )
+            parsed = self._parse_batch_response(self._request(payload), len(images))
+        except OCRRequestError as exc:
+            log_warn(f"批量识别失败，改为逐张识别: {exc}")
+            parsed = None
+        else:
+            if parsed is None:
+                log_warn(f"批量识别结果无法按图片拆分，改为逐张识别 ({len(images)} 张)")
+        if parsed is not None:
+            return parsed
+        return [self.recognize(image, model) for image in images]
+
+    def recognize_stream(self, image: ImageInput, model: str | None = None) -> Iterator[str]:
+        """Yield recognised lines as soon as the streamed completion finishes each one.
+
+        Only opening the stream is retried; once lines have been yielded a
+        mid-stream failure is raised to the caller. Lines already yielded
+        cannot be taken back for a retry with a larger budget, so streams
+        always get the full ``max_tokens``; only timeouts are predicted.
+        """
+        features, budget = self._plan(image)
+        payload = self._build_body(self.encoder.encode(image), model, stream=True)
+        url = self.completions_url
+        log_debug(f"发送流式请求到: {url}")
+
+        if self.throttle is not None:
+            self.throttle.acquire()
+        started_at = time.perf_counter()
+        deadline_at = self.time_module.monotonic() + budget.deadline if budget is not None else None
+        try:
+            response = self._with_retries(
+                lambda: self._post(url, payload, stream=True, timeout=self._attempt_timeout(budget, deadline_at)),
+                deadline_at=deadline_at,
+            )
+        except OCRRequestError:
+            self._record_usage(payload, None, time.perf_counter() - started_at, ok=False)
+            raise
+        usage: dict[str, Any] = {}
+        finish: dict[str, str] = {}
+        ok = False
+        try:
+            yield from _iter_deduplicated_lines(
+                self._iter_stream_lines(
+                    response,
+                    on_usage=usage.update,
+                    on_finish=lambda reason: finish.update(reason=reason),
+                )
+            )
+            ok = True
+        except requests.exceptions.RequestException as exc:
+            raise OCRRequestError(f"API 流式响应中断: {exc}", retryable=True) from exc
+        except GeneratorExit:
+            # The caller stopped reading early; that is not a failed request.
+            ok = True
+            raise
+        finally:
+            response.close()
+            latency = time.perf_counter() - started_at
+            self._record_usage(payload, usage, latency, ok=ok)
+            if finish.get("reason") == "length":
+                log_warn(f"流式输出达到 max_tokens={DEFAULT_MAX_TOKENS} 上限，结果可能不完整")
+            elif ok and finish:
+                self._record_budget_sample(features, usage, latency)
+
+    def _iter_stream_lines(
+        self,
+        response: requests.Response,
+        on_usage: Callable[[dict[str, Any]], None] | None = None,
+        on_finish: Callable[[str], None] | None = None,
+    ) -> Iterator[str]:
+        assembler = LineAssembler()
+        guard = RepetitionGuard() if self.detect_repetition else None
+        deltas = iter_content_deltas(iter_sse_data(response.iter_lines()), on_usage, on_finish)
+        for delta in deltas:
+            for line in assembler.feed(delta):
+                if guard is None:
+                    yield line
+                    continue
+                released, looping = guard.push_line(line)
+                yield from released
+                if looping:
+                    log_warn("检测到模型重复输出，已提前终止请求")
+                    return
+            if guard is not None:
+                clean_prefix = guard.check_partial(assembler.pending)
+                if clean_prefix is not None:
+                    log_warn("检测到行内重复输出，已提前终止请求")
+                    yield from guard.flush()
+                    if clean_prefix.strip():
+                        yield clean_prefix.strip()
+                    return
+
+        for line in assembler.flush():
+            if guard is None:
+                yield line
+                continue
+            released, looping = guard.push_line(line)
+            yield from released
+            if looping:
+                return
+        if guard is not None:
+            yield from guard.flush()
+
+
+class AsyncSiliconFlowOCR(_SiliconFlowClientBase):
+    """Asyncio SiliconFlow OCR client with bounded request concurrency.
+
+    Needs the optional ``aiohttp`` package, which the tray app does not ship.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.siliconflow.cn/v1",
+        model: str = "PaddlePaddle/PaddleOCR-VL",
+        *,
+        max_concurrency: int = 8,
+        timeout: float = 60,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        single_flight: AsyncSingleFlight | None = None,
+        usage_ledger: UsageLedger | None = None,
+        throttle: TokenThrottle | None = None,
+        encoder: ImageEncoder | None = None,
+    ):
+        super().__init__(
+            api_key,
+            base_url,
+            model,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            usage_ledger=usage_ledger,
+            throttle=throttle,
+            encoder=encoder,
+        )
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.single_flight = single_flight or AsyncSingleFlight()
+        self._session: Any = None
+
+    def _get_session(self) -> Any:
+        if self._session is not None and not self._session.closed:
+            return self._session
+        try:
+            import aiohttp
+        except ImportError as exc:
+            raise ImportError("请安装 aiohttp 库: pip install aiohttp") from exc
+
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self._session
+
+    async def _send_once(self, url: str, payload: dict[str, Any]) -> dict[str, Any]:
+        import aiohttp
+
+        session = self._get_session()
+        try:
+            async with session.post(url, json=payload, headers=self.headers) as response:
+                log_debug(f"响应状态码: {response.status}")
+                if response.status != 200:
+                    text = await response.text()
+                    raise self._status_error(response.status, text, response.headers.get("Retry-After"))
+                return await response.json(content_type=None)
+        except asyncio.TimeoutError as exc:
+            raise OCRRequestError("API 请求超时", retryable=True, timed_out=True) from exc
+        except aiohttp.ClientConnectionError as exc:
+            raise OCRRequestError(f"API 连接失败: {exc}", retryable=True) from exc
+        except aiohttp.ClientError as exc:
+            raise OCRRequestError(f"API 请求失败: {exc}") from exc
+
+    async def _request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        url = self.completions_url
+        log_debug(f"发送异步请求到: {url}")
+        if self.throttle is not None:
+            await asyncio.to_thread(self.throttle.acquire)
+        started_at = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._before_attempt()
+            try:
+                result = await self._send_once(url, payload)
+            except OCRRequestError as exc:
+                try:
+                    delay = self._after_failure(exc, attempt)
+                except OCRRequestError:
+                    self._record_usage(payload, None, time.perf_counter() - started_at, ok=False)
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self.circuit_breaker.record_failure()
+                self._record_usage(payload, None, time.perf_counter() - started_at, ok=False)
+                raise
+            finally:
+                self.circuit_breaker.release_probe()
+            self.circuit_breaker.record_success()
+            self._record_usage(payload, result.get("usage"), time.perf_counter() - started_at)
+            return result
+
+    async def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        key = await asyncio.to_thread(image_content_key, image, self.base_url, model or self.model)
+        lines = await self.single_flight.do(key, lambda: self._recognize_uncoalesced(image, model))
+        return list(lines)
+
+    async def _recognize_uncoalesced(self, image: ImageInput, model: str | None = None) -> list[str]:
+        async with self._semaphore:
+            encoded = await asyncio.to_thread(self.encoder.encode, image)
+            image_base64 = base64.b64encode(encoded.data).decode("utf-8")
+            payload = self._build_payload(image_base64, model, mime_type=encoded.mime_type)
+            result = await self._request(payload)
         return self._parse_response(result)
 
+    async def recognize_many(
+        self,
+        images: Iterable[ImageInput],
+        *,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Recognize many images concurrently, at most ``max_concurrency`` at a time.
+
+        Results keep the input order. With ``return_exceptions`` a failed image
+        yields its exception instead of aborting the whole batch.
+        """
+        tasks = [self.recognize(image) for image in images]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncSiliconFlowOCR":
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        await self.aclose()
+
+
+class MultiEndpointOCR:
+    """Route each request to the best-scoring endpoint and fail over on errors.
+
+    Retryable failures and auth errors move on to the next endpoint straight
+    away; backoff only applies once every endpoint has failed for a request.
+    An endpoint with its own ``model`` is always sent that name; the others
+    get the requested model, or ``model`` when none is requested.
+    """
+
+    FAILOVER_STATUS_CODES = frozenset({401, 403, 404})
+
+    def __init__(
+        self,
+        endpoints: Iterable[Endpoint | dict[str, Any]],
+        *,
+        transport: HTTPTransport | None = None,
+        retry_policy: RetryPolicy | None = None,
+        pool: EndpointPool | None = None,
+        usage_ledger: UsageLedger | None = None,
+        throttle: TokenThrottle | None = None,
+        encoder: ImageEncoder | None = None,
+        model: str = "PaddlePaddle/PaddleOCR-VL",
+        time_module: Any | None = None,
+    ):
+        self.pool = pool or EndpointPool(endpoints)
+        self.model = model
+        self.transport = transport or HTTPTransport()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.throttle = throttle
+        self.time_module = time_module or time
+        self.clients = {
+            endpoint.name: SiliconFlowOCR(
+                api_key=endpoint.api_key,
+                base_url=endpoint.base_url,
+                model=endpoint.model or model,
+                transport=self.transport,
+                retry_policy=self.retry_policy,
+                usage_ledger=usage_ledger,
+                throttle=throttle,
+                encoder=encoder,
+            )
+            for endpoint in self.pool.endpoints
+        }
+
+    def _can_fail_over(self, exc: OCRRequestError) -> bool:
+        return self.retry_policy.is_retryable(exc) or exc.status_code in self.FAILOVER_STATUS_CODES
+
+    def _request(
+        self,
+        image_base64: str,
+        model: str | None = None,
+        mime_type: str = DEFAULT_MIME_TYPE,
+    ) -> dict[str, Any]:
+        max_attempts = self.retry_policy.max_attempts + len(self.pool.endpoints) - 1
+        if self.throttle is not None:
+            self.throttle.acquire()
+        failed: set[str] = set()
+        attempt = 0
+        while True:
+            attempt += 1
+            candidates = self.pool.ranked(exclude=failed) or self.pool.ranked()
+            endpoint = candidates[0]
+            client = self.clients[endpoint.name]
+            log_debug(f"选择 OCR 端点: {endpoint.name}")
+            payload = client._build_payload(image_base64, endpoint.model or model, mime_type=mime_type)
+            started_at = time.perf_counter()
+            try:
+                result = client._send_once(client.completions_url, payload)
+            except OCRRequestError as exc:
+                client._record_usage(payload, None, time.perf_counter() - started_at, ok=False)
+                self.pool.record_failure(endpoint)
+                if attempt >= max_attempts or not self._can_fail_over(exc):
+                    raise
+                failed.add(endpoint.name)
+                if len(failed) < len(self.pool.endpoints):
+                    log_warn(f"端点 {endpoint.name} 失败，切换到下一个端点: {exc}")
+                    continue
+                failed.clear()
+                delay = self.retry_policy.compute_delay(attempt, exc.retry_after)
+                log_warn(f"所有端点均失败，{delay:.1f} 秒后重试: {exc}")
+                self.time_module.sleep(delay)
+                continue
+            latency = time.perf_counter() - started_at
+            client._record_usage(payload, result.get("usage"), latency)
+            self.pool.record_success(endpoint, latency)
+            return result
+
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        return self.recognize_result(image, model).texts
+
+    def recognize_result(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        primary = self.clients[self.pool.endpoints[0].name]
+        started_at = time.perf_counter()
+        encoded = primary.encoder.encode(image)
+        image_base64 = base64.b64encode(encoded.data).decode("utf-8")
+        sent_at = time.perf_counter()
+        result = self._request(image_base64, model, encoded.mime_type)
+        received_at = time.perf_counter()
+        lines = primary._parse_response(result)
+        finished_at = time.perf_counter()
+        return OCRResult.from_texts(
+            lines,
+            timings={
+                "encode": sent_at - started_at,
+                "request": received_at - sent_at,
+                "parse": finished_at - received_at,
+                "total": finished_at - started_at,
+            },
+            usage=result.get("usage"),
+            raw=result,
+            model=result.get("model"),
+        )
+
+
+@register_backend("vllm-server", "siliconflow", "http")
+class RemoteOCRBackend(OCRBackend):
+    """OpenAI-compatible HTTP OCR service, optionally spread over several endpoints."""
+
+    name = "vllm-server"
+
+    def __init__(
+        self,
+        *,
+        server_url: str | None = None,
+        api_model_name: str | None = None,
+        api_key: str | None = None,
+        transport: HTTPTransport | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        endpoints: Iterable[Endpoint | dict[str, Any]] | None = None,
+        detect_repetition: bool = True,
+        usage_ledger: UsageLedger | None = None,
+        throttle: TokenThrottle | None = None,
+        budget_model: RequestBudgetModel | None = None,
+        encoder: ImageEncoder | None = None,
+        **_: Any,
+    ):
+        self.client: SiliconFlowOCR | MultiEndpointOCR = SiliconFlowOCR(
+            api_key=api_key or "",
+            base_url=server_url or "https://api.siliconflow.cn/v1",
+            model=api_model_name or "PaddlePaddle/PaddleOCR-VL",
+            transport=transport,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            hedge_policy=hedge_policy,
+            detect_repetition=detect_repetition,
+            usage_ledger=usage_ledger,
+            throttle=throttle,
+            budget_model=budget_model,
+            encoder=encoder,
+        )
+        self.base_url = self.client.base_url
+        if endpoints:
+            # The configured server stays the preferred first endpoint; extra
+            # mirrors are added behind it for failover and load balancing. It
+            # takes the routed model, falling back to the configured one.
+            primary = Endpoint(self.client.base_url, api_key=self.client.api_key, name="primary")
+            self.client = MultiEndpointOCR(
+                [primary, *endpoints],
+                transport=self.client.transport,
+                retry_policy=retry_policy,
+                usage_ledger=usage_ledger,
+                throttle=throttle,
+                encoder=self.client.encoder,
+                model=self.client.model,
+            )
+            log_debug(f"  - 多端点模式: {len(self.client.pool.endpoints)} 个端点")
+        single = isinstance(self.client, SiliconFlowOCR)
+        self.capabilities = BackendCapabilities(streaming=single, batching=single)
+
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        return self.client.recognize(image, model)
+
+    def recognize_result(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        result = self.client.recognize_result(image, model)
+        result.backend = self.name
+        return result
+
+    def recognize_stream(self, image: ImageInput, model: str | None = None) -> Iterator[str]:
+        if isinstance(self.client, SiliconFlowOCR):
+            yield from self.client.recognize_stream(image, model)
+        else:
+            yield from self.client.recognize(image, model)
+
+    def recognize_batch(self, images: Sequence[ImageInput], model: str | None = None) -> list[list[str]]:
+        if isinstance(self.client, SiliconFlowOCR):
+            return self.client.recognize_batch(list(images), model)
+        return super().recognize_batch(images, model)
+
+    def warm_up(self) -> bool:
+        try:
+            return self.client.transport.connect(self.base_url)
+        except (requests.exceptions.RequestException, OSError) as exc:
+            log_debug(f"预热连接失败（不影响识别）: {exc}")
+            return False
+
 
 class PaddleOCRVL:
-    """Compatibility wrapper used by the current UI scripts."""
+    """Compatibility wrapper used by the current UI scripts.
+
+    ``vl_rec_backend`` selects the backend from the registry in
+    :mod:`screenshot_ocr.backends`; the other ``vl_rec_*`` options are passed
+    to its factory without the prefix, together with ``vl_rec_backend_options``.
+    With ``vl_rec_tile_policy`` large captures are recognised in tiles.
+    """
 
     def __init__(
         self,
@@ -160,24 +1035,59 @@ class PaddleOCRVL:
         vl_rec_server_url: str | None = None,
         vl_rec_api_model_name: str | None = None,
         vl_rec_api_key: str | None = None,
+        vl_rec_transport: HTTPTransport | None = None,
+        vl_rec_retry_policy: RetryPolicy | None = None,
+        vl_rec_circuit_breaker: CircuitBreaker | None = None,
+        vl_rec_hedge_policy: HedgePolicy | None = None,
+        vl_rec_endpoints: Iterable[Endpoint | dict[str, Any]] | None = None,
+        vl_rec_detect_repetition: bool = True,
+        vl_rec_usage_ledger: UsageLedger | None = None,
+        vl_rec_throttle: TokenThrottle | None = None,
+        vl_rec_budget_model: RequestBudgetModel | None = None,
+        vl_rec_encoder: ImageEncoder | None = None,
+        vl_rec_tile_policy: TilePolicy | None = None,
+        vl_rec_backend_options: dict[str, Any] | None = None,
         **_: Any,
     ):
-        self.ocr = SiliconFlowOCR(
-            api_key=vl_rec_api_key or "",
-            base_url=vl_rec_server_url or "https://api.siliconflow.cn/v1",
-            model=vl_rec_api_model_name or "PaddlePaddle/PaddleOCR-VL",
+        self.backend = create_backend(
+            vl_rec_backend,
+            server_url=vl_rec_server_url,
+            api_model_name=vl_rec_api_model_name,
+            api_key=vl_rec_api_key,
+            transport=vl_rec_transport,
+            retry_policy=vl_rec_retry_policy,
+            circuit_breaker=vl_rec_circuit_breaker,
+            hedge_policy=vl_rec_hedge_policy,
+            endpoints=vl_rec_endpoints,
+            detect_repetition=vl_rec_detect_repetition,
+            usage_ledger=vl_rec_usage_ledger,
+            throttle=vl_rec_throttle,
+            budget_model=vl_rec_budget_model,
+            encoder=vl_rec_encoder,
+            **(vl_rec_backend_options or {}),
         )
-        log_debug("[SiliconFlow OCR] 已初始化")
+        if vl_rec_tile_policy is not None:
+            self.backend = TiledOCRBackend(self.backend, vl_rec_tile_policy)
+        log_debug(f"[OCR] 已初始化后端: {self.backend.name}")
         log_debug(f"  - 服务器: {vl_rec_server_url}")
         log_debug(f"  - 模型: {vl_rec_api_model_name}")
 
-    def predict(self, image_path: str) -> list[dict[str, Any]]:
-        text_list = self.ocr.recognize(image_path)
-        return [
-            {
-                "parsing_res_list": [
-                    type("PredictionItem", (object,), {"content": text})()
-                    for text in text_list
-                ]
-            }
-        ]
+    @property
+    def ocr(self) -> Any:
+        """The HTTP client behind a remote backend, ``None`` for other backends."""
+        return getattr(self.backend, "client", None)
+
+    @property
+    def capabilities(self) -> BackendCapabilities:
+        return self.backend.capabilities
+
+    def warm_up(self) -> bool:
+        return self.backend.warm_up()
+
+    def predict_stream(self, image: ImageInput, model: str | None = None) -> Iterator[str]:
+        """Yield text lines progressively; falls back to one-shot recognition."""
+        yield from self.backend.recognize_stream(image, model)
+
+    def predict(self, image: ImageInput, model: str | None = None) -> list[OCRResult]:
+        """Recognize one image; each result also reads as a ``parsing_res_list`` dict."""
+        return [self.backend.recognize_result(image, model)]
@@ -24,5 +24,9 @@ def get_config_dir() -> str:
     return os.path.join(get_project_root(), "config")
 
 
+def get_data_dir() -> str:
+    return os.path.join(get_project_root(), "data")
+
+
 def get_resource_path(relative_path: str) -> str:
     return os.path.join(get_resource_root(), relative_path)
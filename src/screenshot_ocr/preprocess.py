@@ -0,0 +1,114 @@
+"""Shrink captures before upload: downscale, grayscale and fewer tones.
+
+Screenshots of UI text are mostly two tones at a resolution well above
+what the model needs. :func:`preprocess_image` scales a capture so its
+text has a target x-height, and can drop colour and quantise the gray
+levels to a small palette (two levels binarise it), all of which shrink
+the encoded image several times. ``benchmarks/bench_preprocess.py``
+measures what each setting costs in recognised characters.
+"""
+
+from __future__ import annotations
+
+import statistics
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from .image_features import find_runs, ink_mask
+from .logging_utils import log_debug
+
+# A row belongs to a line's x-height band when it holds at least this
+# fraction of the line's densest row; ascenders and descenders hold less.
+X_HEIGHT_ROW_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class PreprocessOptions:
+    """What :func:`preprocess_image` may do to a capture.
+
+    ``target_x_height`` is in pixels; captures whose text is smaller are
+    never upscaled and none is scaled below ``min_scale``. ``levels``
+    quantises to that many gray tones and implies ``grayscale``; ``2``
+    binarises.
+    """
+
+    target_x_height: float | None = None
+    min_scale: float = 0.25
+    grayscale: bool = False
+    levels: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.target_x_height or self.grayscale or self.levels)
+
+
+def estimate_x_height(gray: np.ndarray) -> float | None:
+    """Median x-height of the text lines in a luminance array, ``None`` if none are found.
+
+    For CJK text, whose glyphs fill the line, this is the full glyph height.
+    """
+    mask = ink_mask(gray)
+    row_ink = mask.sum(axis=1)
+    heights = []
+    for start, end in find_runs(row_ink > 0.002 * mask.shape[1]):
+        if end - start < 3:
+            continue
+        line = row_ink[start:end]
+        heights.append(int(np.count_nonzero(line >= X_HEIGHT_ROW_RATIO * line.max())))
+    return float(statistics.median(heights)) if heights else None
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """The gray level that best separates ink from background (Otsu's method)."""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(histogram)
+    total = weight[-1]
+    mean = np.cumsum(histogram * levels)
+    background_weight = weight[:-1]
+    foreground_weight = total - background_weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean[-1] * background_weight - mean[:-1] * total) ** 2 / (background_weight * foreground_weight)
+    between = np.nan_to_num(between, nan=0.0, posinf=0.0)
+    return int(np.argmax(between))
+
+
+def quantize_levels(gray: np.ndarray, levels: int) -> tuple[np.ndarray, list[int]]:
+    """Map gray values onto ``levels`` evenly spaced tones between the darkest and lightest.
+
+    Returns the palette index of every pixel and the palette's gray values.
+    """
+    low, high = int(gray.min()), int(gray.max())
+    span = max(high - low, 1)
+    indices = ((gray.astype(np.int32) - low) * levels // (span + 1)).astype(np.uint8)
+    palette = [low + round((index + 0.5) * span / levels) for index in range(levels)]
+    return indices, palette
+
+
+def preprocess_image(image: Image.Image, options: PreprocessOptions) -> Image.Image:
+    """Return a smaller copy of ``image``, or ``image`` itself when nothing applies."""
+    if not options.enabled:
+        return image
+    result = image
+    if (options.grayscale or options.levels) and result.mode != "L":
+        result = result.convert("L")
+
+    if options.target_x_height:
+        x_height = estimate_x_height(np.asarray(result if result.mode == "L" else result.convert("L")))
+        if x_height and x_height > options.target_x_height:
+            scale = max(options.min_scale, options.target_x_height / x_height)
+            size = (max(1, round(result.width * scale)), max(1, round(result.height * scale)))
+            result = result.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            log_debug(f"预处理: x-height {x_height:.0f}px -> 缩放 {scale:.2f} ({size[0]}x{size[1]})")
+
+    if options.levels and options.levels >= 2:
+        gray = np.asarray(result)
+        if options.levels == 2:
+            result = Image.fromarray(gray > otsu_threshold(gray))
+        else:
+            indices, palette = quantize_levels(gray, options.levels)
+            result = Image.fromarray(indices)
+            result.putpalette([value for tone in palette for value in (tone, tone, tone)])
+    return result
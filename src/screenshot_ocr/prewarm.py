@@ -0,0 +1,136 @@
+"""Warm up the OCR connection while the user is still selecting a region."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+
+from .logging_utils import log_debug
+from .transport import HTTPTransport
+
+
+def probe_server(
+    transport: HTTPTransport,
+    base_url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float = 5.0,
+) -> bool:
+    """Return whether ``GET {base_url}/models`` answers without a server-side error."""
+    try:
+        response = transport.get(f"{base_url.rstrip('/')}/models", headers=headers, timeout=timeout)
+    except (requests.exceptions.RequestException, OSError) as exc:
+        log_debug(f"服务健康检查失败: {exc}")
+        return False
+    response.close()
+    return response.status_code < 500 and response.status_code != 429
+
+
+@dataclass
+class HeartbeatPolicy:
+    """When to ping an idle pooled connection so it is not closed under us.
+
+    A ping is sent after ``interval`` seconds without traffic, but only while
+    the last OCR request is less than ``max_idle`` seconds old, so an unused
+    tray app does not keep talking to the API forever.
+    """
+
+    interval: float = 25.0
+    max_idle: float = 600.0
+
+
+class ConnectionWarmer:
+    """Open the connection to the OCR server in the background on demand.
+
+    :meth:`trigger` is cheap and safe to call from UI callbacks: it returns
+    at once, skips the work when the pool carried traffic within
+    ``fresh_for`` seconds and never runs two warm-ups at the same time.
+    With ``probe`` a ``GET {base_url}/models`` keep-alive request is sent
+    instead of only connecting, which also refreshes the server's idle timer.
+    """
+
+    def __init__(
+        self,
+        transport: HTTPTransport,
+        base_url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        probe: bool = False,
+        fresh_for: float = 20.0,
+        heartbeat: HeartbeatPolicy | None = None,
+    ):
+        self.transport = transport
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.probe = probe
+        self.fresh_for = fresh_for
+        self.heartbeat = heartbeat
+        self.warm_count = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._heartbeat_thread: threading.Thread | None = None
+
+    def warm(self) -> bool:
+        """Warm the connection now; return whether any network work was done."""
+        if self.transport.idle_seconds() < self.fresh_for:
+            return False
+        return self._warm_now(self.probe)
+
+    def _warm_now(self, probe: bool) -> bool:
+        try:
+            if probe:
+                response = self.transport.get(f"{self.base_url}/models", headers=self.headers, timeout=10)
+                response.close()
+            else:
+                self.transport.connect(self.base_url)
+        except (requests.exceptions.RequestException, OSError) as exc:
+            log_debug(f"预热连接失败（不影响识别）: {exc}")
+            return False
+        self.warm_count += 1
+        return True
+
+    def trigger(self) -> bool:
+        """Start a background warm-up unless one is already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            if self.transport.idle_seconds() < self.fresh_for:
+                return False
+            self._thread = threading.Thread(target=self.warm, name="ocr-prewarm", daemon=True)
+            self._thread.start()
+            return True
+
+    def wait(self, timeout: float | None = None) -> None:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def start_heartbeat(self) -> None:
+        if self.heartbeat is None or self._heartbeat_thread is not None:
+            return
+        self._stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="ocr-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self) -> None:
+        assert self.heartbeat is not None
+        policy = self.heartbeat
+        transport = self.transport
+        while not self._stop.wait(policy.interval / 2):
+            if not transport.last_used or time.monotonic() - transport.last_used > policy.max_idle:
+                continue
+            if transport.idle_seconds() < policy.interval:
+                continue
+            # Only a real request resets the server's keep-alive timer.
+            if self._warm_now(probe=True):
+                log_debug("连接保活心跳已发送")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join(timeout=1)
+            self._heartbeat_thread = None
@@ -0,0 +1,131 @@
+"""Detect runaway repetition in model output while it is still streaming."""
+
+from __future__ import annotations
+
+import unicodedata
+
+
+def _is_filler(unit: str) -> bool:
+    """Dot leaders, rules and spacing (``....``, ``----``, ``· · ·``) repeat legitimately."""
+    return all(unicodedata.category(char)[0] in "PSZ" for char in unit)
+
+
+def find_periodic_tail(
+    text: str,
+    *,
+    max_period: int = 32,
+    min_repeats: int = 12,
+    min_length: int = 96,
+) -> int | None:
+    """Return where to cut ``text`` if it ends in a loop, keeping one unit.
+
+    A loop is a unit of at most ``max_period`` characters repeated at least
+    ``min_repeats`` times back to back, covering at least ``min_length``
+    characters. Units made only of punctuation, symbols and spaces are not
+    loops. Only the tail is compared, so the check stays cheap to run after
+    every streamed delta.
+    """
+    for period in range(1, max_period + 1):
+        span = period * min_repeats
+        if span > len(text):
+            break
+        if max(span, min_length) > len(text):
+            continue
+        unit = text[-period:]
+        if _is_filler(unit) or text[-span:] != unit * min_repeats:
+            continue
+        start = len(text) - span
+        while start >= period and text[start - period:start] == unit:
+            start -= period
+        if len(text) - start < min_length:
+            continue
+        return start + period
+    return None
+
+
+class RepetitionGuard:
+    """Hold back lines that may be repeating and flag a confirmed loop.
+
+    Lines are compared by hash. A line that continues a cycle of at most
+    ``max_period`` lines is buffered instead of emitted. If the cycle
+    reaches ``min_repeats`` copies and the repeated lines hold at least
+    ``min_repeated_chars`` characters, the buffer is dropped, so callers
+    only ever see one copy of the looping block. If it breaks off, the
+    buffered lines are released in order. The limits are generous because
+    real tables repeat cells; a runaway model goes on until ``max_tokens``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_period: int = 8,
+        min_repeats: int = 10,
+        min_repeated_chars: int = 200,
+        max_char_period: int = 32,
+        min_char_repeats: int = 12,
+        min_loop_chars: int = 96,
+    ):
+        self.max_period = max(1, max_period)
+        self.min_repeats = max(2, min_repeats)
+        self.min_repeated_chars = min_repeated_chars
+        self.max_char_period = max_char_period
+        self.min_char_repeats = min_char_repeats
+        self.min_loop_chars = min_loop_chars
+        self.triggered = False
+        self._history: list[int] = []
+        self._pending: list[str] = []
+        self._pending_hashes: list[int] = []
+        self._pending_chars = 0
+
+    def _continues_cycle(self, candidate: list[int]) -> int | None:
+        sequence = self._history[-self.max_period:] + candidate
+        offset = len(sequence) - len(candidate)
+        for period in range(1, self.max_period + 1):
+            if period > offset:
+                break
+            if all(sequence[offset + index] == sequence[offset + index - period] for index in range(len(candidate))):
+                return period
+        return None
+
+    def push_line(self, line: str) -> tuple[list[str], bool]:
+        """Return the lines that are safe to emit and whether a loop was found."""
+        candidate = self._pending_hashes + [hash(line)]
+        period = self._continues_cycle(candidate)
+        if period is None:
+            released = self._pending + [line]
+            self._history.extend(candidate)
+            self._pending = []
+            self._pending_hashes = []
+            self._pending_chars = 0
+            return released, False
+
+        repeated_chars = self._pending_chars + len(line)
+        if len(candidate) >= period * (self.min_repeats - 1) and repeated_chars >= self.min_repeated_chars:
+            self.triggered = True
+            self._pending = []
+            self._pending_hashes = []
+            self._pending_chars = 0
+            return [], True
+
+        self._pending.append(line)
+        self._pending_hashes = candidate
+        self._pending_chars = repeated_chars
+        return [], False
+
+    def check_partial(self, text: str) -> str | None:
+        """Return the clean prefix of an unfinished line if it is looping."""
+        cut = find_periodic_tail(
+            text,
+            max_period=self.max_char_period,
+            min_repeats=self.min_char_repeats,
+            min_length=self.min_loop_chars,
+        )
+        if cut is None:
+            return None
+        self.triggered = True
+        return text[:cut]
+
+    def flush(self) -> list[str]:
+        released, self._pending, self._pending_hashes = self._pending, [], []
+        self._pending_chars = 0
+        return released
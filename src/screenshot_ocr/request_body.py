@@ -0,0 +1,73 @@
+"""Stream chat completion request bodies without building the JSON string."""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Iterator, Sequence
+
+# Input bytes per base64 chunk; a multiple of 3 so chunks need no padding.
+BASE64_CHUNK_INPUT_SIZE = 3 * 16 * 1024
+
+
+def image_placeholder(index: int) -> str:
+    """Stand-in for the base64 data of image ``index`` inside a payload."""
+    return f"__ocr_image_data_{index}__"
+
+
+def base64_length(size: int) -> int:
+    return 4 * ((size + 2) // 3)
+
+
+class StreamingJSONBody:
+    """Iterable JSON request body with image data encoded on the fly.
+
+    ``payload`` is serialised once with :func:`image_placeholder` markers
+    where the base64 data goes. Iterating yields the JSON text between the
+    markers and the images base64-encoded in small chunks, so the full data
+    URL string and the serialised JSON never exist in memory. ``len()``
+    gives the exact body size, which lets ``requests`` send a
+    ``Content-Length`` header instead of chunked encoding. The body can be
+    iterated more than once, so retries and hedged requests can resend it.
+    """
+
+    def __init__(
+        self,
+        payload: dict[str, Any],
+        images: Sequence[bytes | bytearray | memoryview],
+        *,
+        chunk_size: int = BASE64_CHUNK_INPUT_SIZE,
+    ):
+        self.payload = payload
+        self.images = [memoryview(image).cast("B") for image in images]
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        self._segments: list[bytes] = []
+        for index in range(len(self.images)):
+            before, marker, text = text.partition(image_placeholder(index))
+            if not marker:
+                raise ValueError(f"请求体中缺少第 {index + 1} 张图片的占位符")
+            self._segments.append(before.encode("utf-8"))
+        self._segments.append(text.encode("utf-8"))
+
+    @property
+    def model(self) -> str | None:
+        return self.payload.get("model")
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments) + sum(
+            base64_length(image.nbytes) for image in self.images
+        )
+
+    def _iter_base64(self, image: memoryview) -> Iterator[bytes]:
+        for start in range(0, image.nbytes, self.chunk_size):
+            yield base64.b64encode(image[start:start + self.chunk_size])
+
+    def __iter__(self) -> Iterator[bytes]:
+        for segment, image in zip(self._segments, self.images):
+            yield segment
+            yield from self._iter_base64(image)
+        yield self._segments[-1]
+
+    def to_bytes(self) -> bytes:
+        return b"".join(self)
@@ -0,0 +1,56 @@
+"""Typed OCR results with a dict-shaped view for the legacy prediction API."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+PARSING_RESULTS_KEY = "parsing_res_list"
+
+
+@dataclass(slots=True)
+class TextLine:
+    """One recognised line; ``box`` is ``(left, top, right, bottom)`` when known."""
+
+    content: str
+    box: tuple[float, float, float, float] | None = None
+    score: float | None = None
+
+
+@dataclass(slots=True, eq=False)
+class OCRResult(Mapping):
+    """Recognised lines of one image plus how they were produced.
+
+    ``timings`` holds seconds per stage (e.g. ``encode``, ``request``,
+    ``parse``, ``total``), ``usage`` the token counts reported by the server
+    and ``raw`` the decoded response, kept by reference. As a mapping the
+    result reads like the old ``{"parsing_res_list": [...]}`` prediction
+    dict, whose items expose ``content``.
+    """
+
+    lines: list[TextLine]
+    timings: dict[str, float] = field(default_factory=dict)
+    usage: dict[str, Any] | None = None
+    raw: Any = None
+    model: str | None = None
+    backend: str | None = None
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], **details: Any) -> OCRResult:
+        return cls([TextLine(text) for text in texts], **details)
+
+    @property
+    def texts(self) -> list[str]:
+        return [line.content for line in self.lines if line.content]
+
+    def __getitem__(self, key: str) -> list[TextLine]:
+        if key != PARSING_RESULTS_KEY:
+            raise KeyError(key)
+        return self.lines
+
+    def __iter__(self) -> Iterator[str]:
+        return iter((PARSING_RESULTS_KEY,))
+
+    def __len__(self) -> int:
+        return 1
@@ -0,0 +1,143 @@
+"""Retry policy with backoff, Retry-After support and a circuit breaker."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable
+
+from .errors import OCRRequestError
+from .logging_utils import log_warn
+
+# Statuses where resending the same OCR request is safe and may succeed.
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: str | None, *, now: float | None = None) -> float | None:
+    """Parse a ``Retry-After`` header given as seconds or an HTTP date."""
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    current = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - current)
+
+
+@dataclass
+class RetryPolicy:
+    """Decide whether and when a failed request is retried."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    jitter: float = 1.0
+    max_retry_after: float = 30.0
+    retry_statuses: frozenset[int] = field(default=RETRYABLE_STATUS_CODES)
+    random_func: Callable[[], float] = field(default=random.random, repr=False, compare=False)
+
+    def is_retryable(self, error: OCRRequestError) -> bool:
+        if error.status_code is not None:
+            return error.status_code in self.retry_statuses
+        return error.retryable
+
+    def should_retry(self, error: OCRRequestError, attempt: int) -> bool:
+        """``attempt`` is the 1-based number of the attempt that just failed."""
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return False
+        if error.retry_after is not None and error.retry_after > self.max_retry_after:
+            log_warn(f"服务端要求 {error.retry_after:.0f} 秒后重试，超过上限，放弃重试")
+            return False
+        return True
+
+    def compute_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Exponential backoff with jitter; a server ``Retry-After`` wins if longer."""
+        backoff = min(self.max_delay, self.base_delay * (2 ** max(0, attempt - 1)))
+        jitter = min(1.0, max(0.0, self.jitter))
+        delay = backoff * (1.0 - jitter + jitter * self.random_func())
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+
+class CircuitBreaker:
+    """Fail fast after repeated endpoint failures, then probe after a cool-down.
+
+    States follow the usual pattern: ``closed`` lets requests through,
+    ``open`` rejects them until ``reset_timeout`` has passed, and
+    ``half_open`` lets a single probe decide whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        time_module: Any | None = None,
+    ):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.time_module = time_module or time
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def remaining_open_time(self) -> float:
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout - self.time_module.monotonic())
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self.time_module.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self) -> None:
+        """Let another request probe if the current one ended without a verdict."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failure_count += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    log_warn(f"API 连续失败 {self.failure_count} 次，熔断 {self.reset_timeout:.0f} 秒")
+                self.state = self.OPEN
+                self.opened_at = self.time_module.monotonic()
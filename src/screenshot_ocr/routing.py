@@ -0,0 +1,97 @@
+"""Pick an OCR model per capture from cheap image features."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .image_features import ImageFeatures
+from .latency import OnlineLinearFit
+from .logging_utils import log_debug
+
+
+@dataclass
+class ModelRoute:
+    """A model and the largest capture it should handle (``None`` = no limit)."""
+
+    model: str
+    max_area: int | None = None
+    max_lines: int | None = None
+    max_ink_density: float | None = None
+
+    @classmethod
+    def from_value(cls, value: "ModelRoute | dict[str, Any]") -> "ModelRoute":
+        if isinstance(value, ModelRoute):
+            return value
+        return cls(
+            model=str(value["model"]),
+            max_area=value.get("max_area"),
+            max_lines=value.get("max_lines"),
+            max_ink_density=value.get("max_ink_density"),
+        )
+
+    def accepts(self, features: ImageFeatures) -> bool:
+        if self.max_area is not None and features.area > self.max_area:
+            return False
+        if self.max_lines is not None and features.line_count > self.max_lines:
+            return False
+        if self.max_ink_density is not None and features.ink_density > self.max_ink_density:
+            return False
+        return True
+
+
+class ModelRouter:
+    """Choose the fastest eligible model, learning latencies online.
+
+    Each model gets a decayed linear fit of latency against line count, so a
+    model that only ever sees full pages is still compared fairly on a
+    one-line snippet. Until every eligible model has ``min_samples``
+    measurements, the first under-sampled one in route order is used, so
+    routes are explored in the order they are configured.
+    """
+
+    def __init__(
+        self,
+        routes: Iterable[ModelRoute | dict[str, Any]],
+        *,
+        default_model: str,
+        decay: float = 0.95,
+        min_samples: int = 3,
+    ):
+        self.routes = [ModelRoute.from_value(route) for route in routes]
+        self.default_model = default_model
+        self.decay = decay
+        self.min_samples = max(1, min_samples)
+        self.latency_models: dict[str, OnlineLinearFit] = {}
+        self._lock = threading.Lock()
+
+    def predict_latency(self, model: str, features: ImageFeatures) -> float | None:
+        fit = self.latency_models.get(model)
+        return fit.predict(features.line_count) if fit is not None else None
+
+    def sample_count(self, model: str) -> int:
+        fit = self.latency_models.get(model)
+        return fit.samples if fit is not None else 0
+
+    def choose(self, features: ImageFeatures) -> str:
+        eligible = [route.model for route in self.routes if route.accepts(features)]
+        if not eligible:
+            model = self.default_model
+        else:
+            with self._lock:
+                exploring = [name for name in eligible if self.sample_count(name) < self.min_samples]
+                if exploring:
+                    model = exploring[0]
+                else:
+                    model = min(eligible, key=lambda name: self.predict_latency(name, features) or 0.0)
+        log_debug(
+            f"模型路由: {features.width}x{features.height}, 墨迹 {features.ink_density:.3f}, "
+            f"约 {features.line_count} 行 -> {model}"
+        )
+        return model
+
+    def record(self, model: str, latency: float, features: ImageFeatures) -> None:
+        with self._lock:
+            fit = self.latency_models.setdefault(model, OnlineLinearFit(self.decay))
+        fit.update(features.line_count, latency)
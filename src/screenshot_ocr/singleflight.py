@@ -0,0 +1,115 @@
+"""Coalesce identical in-flight OCR calls so only one reaches the network."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from PIL import Image
+
+from .logging_utils import log_debug
+
+T = TypeVar("T")
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _update_with_pixels(digest: Any, image: Image.Image) -> None:
+    """Hash the pixels a band of rows at a time instead of copying the whole raster."""
+    width, height = image.size
+    if not width or not height:
+        return
+    first_row = image.crop((0, 0, width, 1)).tobytes()
+    rows = max(1, _HASH_CHUNK_SIZE // max(1, len(first_row)))
+    for top in range(0, height, rows):
+        digest.update(image.crop((0, top, width, min(height, top + rows))).tobytes())
+
+
+def image_content_key(image: Any, *extra: str) -> str:
+    """Hash the image content (plus e.g. the model name) into a coalescing key.
+
+    Files and encoded bytes are hashed as stored, PIL images and pixel
+    arrays by their decoded pixels, without copying them whole.
+    """
+    digest = hashlib.sha256()
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, "rb") as file:
+            for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        digest.update(image)
+    elif isinstance(image, Image.Image):
+        digest.update(f"{image.mode}:{image.width}x{image.height}\0".encode("ascii"))
+        _update_with_pixels(digest, image)
+    else:
+        digest.update(f"{getattr(image, 'shape', '')}\0".encode("ascii"))
+        view = memoryview(image)
+        digest.update(view if view.c_contiguous else view.tobytes())
+    for value in extra:
+        digest.update(b"\0" + value.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Let concurrent threads with the same key share one call's outcome.
+
+    The first caller runs the function; callers arriving while it is still
+    running wait on its future and get the same result or exception.
+    Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.shared_count = 0
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared_count += 1
+        assert future is not None
+
+        if not leader:
+            log_debug("相同图片正在识别中，等待已有请求结果")
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of :class:`SingleFlight` for one event loop."""
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.shared_count = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _task: self._tasks.pop(key, None))
+        else:
+            self.shared_count += 1
+            log_debug("相同图片正在识别中，等待已有请求结果")
+        # Shield so one cancelled waiter does not cancel the shared request.
+        return await asyncio.shield(task)
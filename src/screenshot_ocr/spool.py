@@ -0,0 +1,458 @@
+"""Durable on-disk spool for captures that could not be recognised yet.
+
+Failed captures are copied into the spool directory and announced in an
+append-only journal of compact JSON arrays (``add``, ``done``, ``fail`` and
+``drop`` rows). A new job is fsynced before :meth:`JobSpool.enqueue`
+returns, because it holds user work that exists nowhere else. Completion
+rows are only flushed and fsynced in batches: a crash before the batch
+syncs re-runs those jobs, and their images are deleted only after their
+completion is durable, so nothing is lost either way.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from .errors import CircuitOpenError, OCRRequestError
+from .image_io import ImageInput, is_image_path, open_image
+from .logging_utils import log_debug, log_info, log_warn
+from .paths import get_data_dir
+
+JOURNAL_NAME = "journal.jsonl"
+RESULTS_NAME = "results.txt"
+
+
+def get_spool_dir() -> str:
+    return os.path.join(get_data_dir(), "spool")
+
+
+def is_spoolable(exc: BaseException) -> bool:
+    """Whether a failure looks like an outage worth retrying later."""
+    if isinstance(exc, CircuitOpenError):
+        return True
+    if not isinstance(exc, OCRRequestError):
+        return False
+    if exc.retryable or exc.timed_out:
+        return True
+    return exc.status_code is not None and (exc.status_code == 429 or exc.status_code >= 500)
+
+
+@dataclass
+class Job:
+    job_id: str
+    image_path: str
+    created_at: float
+    metadata: dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    last_error: str | None = None
+
+
+@dataclass
+class CompletedJob:
+    job_id: str
+    finished_at: float
+    lines: list[str]
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+class JobSpool:
+    """Append-only job journal plus image files in one directory.
+
+    ``sync_batch`` completion rows or ``sync_interval`` seconds, whichever
+    comes first, trigger an fsync. The journal is rewritten once it holds
+    ``compact_after`` finished jobs, keeping the ``keep_history`` newest.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        *,
+        sync_batch: int = 16,
+        sync_interval: float = 1.0,
+        compact_after: int = 200,
+        keep_history: int = 50,
+        time_module: Any | None = None,
+    ):
+        self.directory = directory or get_spool_dir()
+        self.journal_path = os.path.join(self.directory, JOURNAL_NAME)
+        self.results_path = os.path.join(self.directory, RESULTS_NAME)
+        self.sync_batch = max(1, sync_batch)
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        self.keep_history = keep_history
+        self.time_module = time_module or time
+        self.fsync_count = 0
+        self._jobs: dict[str, Job] = {}
+        self._history: list[CompletedJob] = []
+        self._finished_rows = 0
+        self._file: Any = None
+        self._unsynced = 0
+        self._first_unsynced_at: float | None = None
+        self._images_to_delete: list[str] = []
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def _load(self) -> None:
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, TypeError, IndexError, KeyError):
+                # A torn last line from a crash mid-write is expected here.
+                log_warn(f"跳过损坏的离线任务记录: {line.strip()[:80]!r}")
+        for job in list(self._jobs.values()):
+            if not os.path.exists(job.image_path):
+                log_warn(f"离线任务的截图已丢失，跳过: {job.job_id}")
+                del self._jobs[job.job_id]
+        if self._jobs:
+            log_info(f"发现 {len(self._jobs)} 个待识别的离线截图")
+        if self._needs_compaction_locked():
+            self.compact()
+
+    def _needs_compaction_locked(self) -> bool:
+        # Rows of the kept history survive a rewrite, so they alone never trigger one.
+        return self._finished_rows >= max(self.compact_after, len(self._history) + 1)
+
+    def _apply(self, row: list[Any]) -> None:
+        op, job_id = row[0], row[1]
+        if op == "add":
+            _, _, created_at, image_name, metadata, error = row
+            self._jobs[job_id] = Job(
+                job_id,
+                os.path.join(self.directory, image_name),
+                created_at,
+                metadata=metadata or {},
+                last_error=error,
+            )
+        elif op == "fail":
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.attempts += 1
+                job.last_error = row[3]
+        elif op == "done":
+            job = self._jobs.pop(job_id, None)
+            self._history.append(CompletedJob(job_id, row[2], list(row[3]), job.metadata if job else {}))
+            self._history = self._history[-self.keep_history:]
+            self._finished_rows += 1
+        elif op == "drop":
+            self._jobs.pop(job_id, None)
+            self._finished_rows += 1
+        else:
+            raise ValueError(op)
+
+    def _append(self, row: list[Any], *, sync: bool = False) -> None:
+        """Write one journal row; the caller holds the lock."""
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        self._file.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        now = self.time_module.monotonic()
+        if self._first_unsynced_at is None:
+            self._first_unsynced_at = now
+        if sync or self._unsynced >= self.sync_batch or now - self._first_unsynced_at >= self.sync_interval:
+            self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+        self._unsynced = 0
+        self._first_unsynced_at = None
+        for image_path in self._images_to_delete:
+            try:
+                os.remove(image_path)
+            except FileNotFoundError:
+                pass
+        self._images_to_delete.clear()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def enqueue(
+        self,
+        image: ImageInput,
+        *,
+        metadata: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> Job:
+        """Store the capture in the spool and durably record the job.
+
+        Files and encoded bytes are stored as they are, named after their
+        real format; other in-memory images are saved as PNG.
+        """
+        created_at = time.time()
+        job_id = f"{int(created_at * 1000):x}-{uuid.uuid4().hex[:8]}"
+        suffix = ""
+        if is_image_path(image):
+            suffix = os.path.splitext(os.fspath(image))[1]
+        elif isinstance(image, (bytes, bytearray, memoryview)):
+            with open_image(image) as opened:
+                suffix = f".{opened.format.lower()}" if opened.format else ""
+        image_name = f"{job_id}{suffix or '.png'}"
+        target = os.path.join(self.directory, image_name)
+        temp_path = f"{target}.tmp"
+        with open(temp_path, "wb") as file:
+            if is_image_path(image):
+                with open(image, "rb") as source:
+                    shutil.copyfileobj(source, file)
+            elif isinstance(image, (bytes, bytearray, memoryview)):
+                file.write(image)
+            else:
+                with open_image(image) as opened:
+                    opened.save(file, format="PNG")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, target)
+        job = Job(job_id, target, created_at, metadata=dict(metadata or {}), last_error=error)
+        with self._lock:
+            self._append(["add", job_id, created_at, image_name, job.metadata, error], sync=True)
+            self._jobs[job_id] = job
+        log_info(f"截图已存入离线队列，网络恢复后自动识别 (共 {len(self)} 个)")
+        return job
+
+    def pending(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def completed(self) -> list[CompletedJob]:
+        """Recently finished jobs, oldest first."""
+        with self._lock:
+            return list(self._history)
+
+    def mark_done(self, job_id: str, lines: Iterable[str]) -> CompletedJob | None:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return None
+            completed = CompletedJob(job_id, time.time(), list(lines), job.metadata)
+            self._images_to_delete.append(job.image_path)
+            self._append(["done", job_id, completed.finished_at, completed.lines])
+            self._history.append(completed)
+            self._history = self._history[-self.keep_history:]
+            self._finished_rows += 1
+            needs_compaction = self._needs_compaction_locked()
+        if needs_compaction:
+            self.compact()
+        return completed
+
+    def export_results(self, jobs: Iterable[CompletedJob]) -> int:
+        """Append the text of finished jobs to ``results_path``; return how many had text."""
+        entries = []
+        for job in jobs:
+            if not job.lines:
+                continue
+            captured_at = job.metadata.get("captured_at", job.finished_at)
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(captured_at))
+            entries.append(f"# 截图时间 {stamp}\n" + "\n".join(job.lines) + "\n\n")
+        if entries:
+            with self._lock, open(self.results_path, "a", encoding="utf-8") as file:
+                file.write("".join(entries))
+        return len(entries)
+
+    def mark_failed(self, job_id: str, error: str) -> int:
+        """Record a failed attempt and return the job's attempt count."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return 0
+            job.attempts += 1
+            job.last_error = error
+            self._append(["fail", job_id, time.time(), error])
+            return job.attempts
+
+    def drop(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return
+            self._images_to_delete.append(job.image_path)
+            self._append(["drop", job_id], sync=True)
+            self._finished_rows += 1
+            needs_compaction = self._needs_compaction_locked()
+        if needs_compaction:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the journal with only pending jobs and recent history."""
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            rows: list[list[Any]] = []
+            for job in self._jobs.values():
+                rows.append(
+                    ["add", job.job_id, job.created_at, os.path.basename(job.image_path), job.metadata, job.last_error]
+                )
+                rows.extend(["fail", job.job_id, job.created_at, job.last_error] for _ in range(job.attempts))
+            for completed in self._history:
+                # History rows outlive their "add" row, which is gone after compaction.
+                rows.append(["done", completed.job_id, completed.finished_at, completed.lines])
+            temp_path = f"{self.journal_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                for row in rows:
+                    file.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.journal_path)
+            self._finished_rows = len(self._history)
+        log_debug(f"离线任务日志已压缩: 保留 {len(rows)} 条记录")
+
+
+@dataclass
+class DrainReport:
+    done: list[CompletedJob] = field(default_factory=list)
+    failed: int = 0
+    dropped: int = 0
+    skipped: int = 0
+
+
+class SpoolDrainer:
+    """Replay spooled jobs with bounded concurrency once the service is healthy.
+
+    :meth:`drain` returns at once when ``health_check`` fails. The first
+    outage-like failure during a drain stops new jobs from starting; other
+    failures count against the job, which is dropped after ``max_attempts``.
+    :meth:`start` drains every ``interval`` seconds in the background and
+    :meth:`trigger` requests a drain right away, e.g. after a live request
+    succeeded.
+    """
+
+    def __init__(
+        self,
+        spool: JobSpool,
+        recognize: Callable[[str], list[str]],
+        *,
+        health_check: Callable[[], bool] | None = None,
+        concurrency: int = 2,
+        interval: float = 30.0,
+        max_attempts: int = 5,
+        on_drained: Callable[[DrainReport], None] | None = None,
+    ):
+        self.spool = spool
+        self.recognize = recognize
+        self.health_check = health_check
+        self.concurrency = max(1, concurrency)
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.on_drained = on_drained
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run_job(self, job: Job, outage: threading.Event, report: DrainReport, lock: threading.Lock) -> None:
+        if outage.is_set():
+            with lock:
+                report.skipped += 1
+            return
+        try:
+            lines = self.recognize(job.image_path)
+        except Exception as exc:
+            if is_spoolable(exc):
+                outage.set()
+                self.spool.mark_failed(job.job_id, str(exc))
+                with lock:
+                    report.failed += 1
+                return
+            attempts = self.spool.mark_failed(job.job_id, str(exc))
+            log_warn(f"离线截图识别失败 ({attempts}/{self.max_attempts}): {exc}")
+            if attempts >= self.max_attempts:
+                self.spool.drop(job.job_id)
+                with lock:
+                    report.dropped += 1
+            else:
+                with lock:
+                    report.failed += 1
+            return
+        completed = self.spool.mark_done(job.job_id, lines)
+        if completed is not None:
+            with lock:
+                report.done.append(completed)
+
+    def drain(self) -> DrainReport:
+        report = DrainReport()
+        jobs = self.spool.pending()
+        if not jobs or not self._drain_lock.acquire(blocking=False):
+            return report
+        try:
+            if self.health_check is not None and not self.health_check():
+                log_debug(f"OCR 服务仍不可用，{len(jobs)} 个离线截图继续等待")
+                report.skipped = len(jobs)
+                return report
+            log_info(f"开始补识别 {len(jobs)} 个离线截图...")
+            outage = threading.Event()
+            lock = threading.Lock()
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(jobs))) as executor:
+                futures = [executor.submit(self._run_job, job, outage, report, lock) for job in jobs]
+            for future in futures:
+                error = future.exception()
+                if error is not None:
+                    log_warn(f"离线截图补识别出错: {error}")
+            self.spool.sync()
+        finally:
+            self._drain_lock.release()
+        log_info(
+            f"离线截图补识别结束: 成功 {len(report.done)}，失败 {report.failed}，"
+            f"放弃 {report.dropped}，待下次 {report.skipped}"
+        )
+        if report.done and self.on_drained is not None:
+            self.on_drained(report)
+        return report
+
+    def trigger(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ocr-spool-drain", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.drain()
+            except Exception as exc:
+                log_warn(f"离线截图补识别出错: {exc}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.spool.close()
@@ -0,0 +1,90 @@
+"""Incremental parsing of streamed (SSE) chat completion responses."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Iterable, Iterator
+
+from .errors import OCRRequestError
+
+SSE_DONE = "[DONE]"
+
+
+def iter_sse_data(lines: Iterable[bytes | str]) -> Iterator[str]:
+    """Yield the ``data:`` payload of each server-sent event until ``[DONE]``.
+
+    Multi-line ``data`` fields are joined with newlines as the SSE spec asks.
+    Lines are decoded as UTF-8 here because ``text/event-stream`` responses
+    often omit a charset.
+    """
+    buffer: list[str] = []
+    for raw_line in lines:
+        line = raw_line.decode("utf-8") if isinstance(raw_line, bytes) else raw_line
+        line = line.rstrip("\r")
+        if not line:
+            if buffer:
+                data = "\n".join(buffer)
+                buffer = []
+                if data == SSE_DONE:
+                    return
+                yield data
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            buffer.append(value[1:] if value.startswith(" ") else value)
+    if buffer:
+        data = "\n".join(buffer)
+        if data != SSE_DONE:
+            yield data
+
+
+def iter_content_deltas(
+    events: Iterable[str],
+    on_usage: Callable[[dict[str, Any]], None] | None = None,
+    on_finish: Callable[[str], None] | None = None,
+) -> Iterator[str]:
+    """Yield the text delta carried by each streamed completion chunk.
+
+    Chunks carrying a ``usage`` block (usually the last one) are passed to
+    ``on_usage``, and the ``finish_reason`` of the choice to ``on_finish``.
+    """
+    for data in events:
+        try:
+            chunk: dict[str, Any] = json.loads(data)
+        except json.JSONDecodeError as exc:
+            raise OCRRequestError(f"解析流式响应失败: {exc}, 数据: {data!r}") from exc
+        if "error" in chunk:
+            raise OCRRequestError(f"API 流式响应错误: {chunk['error']}")
+        if on_usage is not None and chunk.get("usage"):
+            on_usage(chunk["usage"])
+        for choice in chunk.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                yield content
+            if on_finish is not None and choice.get("finish_reason"):
+                on_finish(choice["finish_reason"])
+
+
+class LineAssembler:
+    """Buffer text deltas and release complete, non-empty, stripped lines."""
+
+    def __init__(self):
+        self._pending = ""
+
+    @property
+    def pending(self) -> str:
+        """Text of the line currently being received."""
+        return self._pending
+
+    def feed(self, text: str) -> list[str]:
+        self._pending += text
+        if "\n" not in self._pending:
+            return []
+        *complete, self._pending = self._pending.split("\n")
+        return [line.strip() for line in complete if line.strip()]
+
+    def flush(self) -> list[str]:
+        line, self._pending = self._pending.strip(), ""
+        return [line] if line else []
@@ -0,0 +1,409 @@
+"""Local OpenAI-compatible stand-in for the SiliconFlow chat endpoint.
+
+Used by tests and benchmarks to exercise the real HTTP stack without network
+access. ``POST /v1/chat/completions`` is implemented, with ``stream``
+answered as server-sent events, plus ``GET /v1/models`` for keep-alive probes.
+Latency can follow a distribution, and 429/5xx answers can be injected at a
+given rate. Run ``python -m screenshot_ocr.stub_server --help`` to serve it
+standalone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable, Sequence
+
+DEFAULT_STUB_CONTENT = "第一行\n第二行"
+
+CANNED_OUTPUTS = {
+    "default": DEFAULT_STUB_CONTENT,
+    "receipt": "\n".join(
+        [
+            "便利店 NO.0231",
+            "2026-03-02 12:41",
+            "矿泉水 550ml x2   ¥4.00",
+            "三明治 x1   ¥12.50",
+            "合计 ¥16.50",
+            "微信支付 ¥16.50",
+        ]
+    ),
+    "code": "def add(a, b):\n    return a + b\n\nprint(add(1, 2))",
+    # The model gets stuck repeating a block of lines.
+    "loop": "标题\n" + "重复的一行\n第二行内容\n" * 60,
+    # The model gets stuck repeating characters within one line.
+    "char_loop": "开始" + "的" * 600,
+}
+
+
+@dataclass
+class LatencyDistribution:
+    """Sampled response latency in seconds.
+
+    ``fixed`` uses ``a``; ``uniform`` draws from ``[a, b]``; ``lognormal``
+    has median ``a`` and shape ``b``; ``exponential`` has mean ``a``.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """Parse ``kind:a[:b]``, e.g. ``lognormal:0.8:0.5``, or plain seconds."""
+        kind, *values = spec.split(":")
+        try:
+            if not values:
+                return cls("fixed", float(kind))
+            numbers = [float(value) for value in values] + [0.0]
+        except ValueError as exc:
+            raise ValueError(f"无效的延迟分布: {spec!r}") from exc
+        if kind not in {"fixed", "uniform", "lognormal", "exponential"}:
+            raise ValueError(f"未知的延迟分布类型: {kind!r}")
+        return cls(kind, numbers[0], numbers[1])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return self.a * math.exp(rng.gauss(0.0, self.b)) if self.a > 0 else 0.0
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        return self.a
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_StubHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # Simulates DNS/TCP/TLS cost that only fresh connections pay.
+        self.server.stub.record_connection()
+        if self.server.stub.handshake_delay > 0:
+            time.sleep(self.server.stub.handshake_delay)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def do_GET(self) -> None:
+        if not self.path.rstrip("/").endswith("/models"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        self.server.stub.record_probe()
+        self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+
+    def do_HEAD(self) -> None:
+        # Connection warm-ups; answered on a kept-alive connection like real gateways do.
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid json"}})
+            return
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        stub = self.server.stub
+        stub.record_request(payload)
+        try:
+            fault = stub.choose_fault()
+            if fault == 429:
+                # Rate limiting is answered straight away, before any work.
+                self._send_fault(fault)
+                return
+            latency = stub.sample_latency()
+            if latency > 0:
+                time.sleep(latency)
+            if fault is not None:
+                self._send_fault(fault)
+            elif payload.get("stream"):
+                self._send_event_stream(stub.build_stream_chunks(payload, stub.choose_content()))
+            else:
+                self._send_json(200, stub.build_completion(payload, stub.choose_content()))
+        finally:
+            stub.finish_request()
+
+    def _send_fault(self, status: int) -> None:
+        headers = {}
+        if self.server.stub.retry_after is not None and status in (429, 503):
+            headers["Retry-After"] = f"{self.server.stub.retry_after:g}"
+        self._send_json(status, {"error": {"message": f"injected fault {status}", "code": status}}, headers)
+
+    def _send_json(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event_stream(self, chunks: Iterable[dict[str, Any]]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [json.dumps(chunk, ensure_ascii=False) for chunk in chunks] + ["[DONE]"]
+        for data in events:
+            self._write_chunk(f"data: {data}\n\n".encode("utf-8"))
+            if self.server.stub.chunk_delay > 0:
+                time.sleep(self.server.stub.chunk_delay)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], stub: "StubOCRServer"):
+        super().__init__(address, _StubHandler)
+        self.stub = stub
+
+
+class StubOCRServer:
+    """Serve canned chat completions on a background thread.
+
+    ``content`` may be a list of outputs to pick from at random. ``faults``
+    maps a status code to the fraction of requests answered with it, e.g.
+    ``{429: 0.05, 503: 0.01}``. ``seed`` makes latencies, faults and
+    outputs reproducible.
+    """
+
+    def __init__(
+        self,
+        *,
+        content: str | Sequence[str] = DEFAULT_STUB_CONTENT,
+        latency: float | LatencyDistribution = 0.0,
+        handshake_delay: float = 0.0,
+        chunk_size: int = 8,
+        chunk_delay: float = 0.0,
+        faults: dict[int, float] | None = None,
+        retry_after: float | None = None,
+        seed: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.content = content if isinstance(content, str) else list(content)
+        self.latency = latency if isinstance(latency, LatencyDistribution) else LatencyDistribution("fixed", latency)
+        self.faults = dict(faults or {})
+        self.retry_after = retry_after
+        self.fault_counts: dict[int, int] = {}
+        self.rng = random.Random(seed)
+        self.handshake_delay = handshake_delay
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_delay = chunk_delay
+        self.host = host
+        self.port = port
+        self.request_count = 0
+        self.probe_count = 0
+        self.connection_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.last_payload: dict[str, Any] | None = None
+        self._lock = threading.Lock()
+        self._server: _StubHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connection_count += 1
+
+    def record_probe(self) -> None:
+        with self._lock:
+            self.probe_count += 1
+
+    def record_request(self, payload: dict[str, Any]) -> None:
+        with self._lock:
+            self.request_count += 1
+            self.last_payload = payload
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finish_request(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def sample_latency(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency.sample(self.rng))
+
+    def choose_fault(self) -> int | None:
+        with self._lock:
+            roll = self.rng.random()
+            for status, rate in self.faults.items():
+                if roll < rate:
+                    self.fault_counts[status] = self.fault_counts.get(status, 0) + 1
+                    return status
+                roll -= rate
+        return None
+
+    def choose_content(self) -> str:
+        if isinstance(self.content, str):
+            return self.content
+        with self._lock:
+            return self.rng.choice(self.content)
+
+    def _limit_output(self, payload: dict[str, Any], content: str) -> tuple[str, str]:
+        """Cut ``content`` to ``max_tokens`` characters, one stub token each."""
+        max_tokens = payload.get("max_tokens")
+        if isinstance(max_tokens, int) and len(content) > max_tokens:
+            return content[:max_tokens], "length"
+        return content, "stop"
+
+    def build_completion(self, payload: dict[str, Any], content: str | None = None) -> dict[str, Any]:
+        content, finish_reason = self._limit_output(payload, self.choose_content() if content is None else content)
+        return {
+            "id": f"stub-{self.request_count}",
+            "object": "chat.completion",
+            "model": payload.get("model", ""),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 0,
+                "completion_tokens": len(content),
+                "total_tokens": len(content),
+            },
+        }
+
+    def build_stream_chunks(self, payload: dict[str, Any], content: str | None = None) -> list[dict[str, Any]]:
+        content, finish_reason = self._limit_output(payload, self.choose_content() if content is None else content)
+        pieces = [
+            content[index:index + self.chunk_size]
+            for index in range(0, len(content), self.chunk_size)
+        ]
+        chunks = [
+            {
+                "id": f"stub-{self.request_count}",
+                "object": "chat.completion.chunk",
+                "model": payload.get("model", ""),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            for piece in pieces
+        ]
+        chunks.append(
+            {
+                "id": f"stub-{self.request_count}",
+                "object": "chat.completion.chunk",
+                "model": payload.get("model", ""),
+                "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+            }
+        )
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            # Like OpenAI, usage comes in an extra chunk only when asked for.
+            chunks.append(
+                {
+                    "id": f"stub-{self.request_count}",
+                    "object": "chat.completion.chunk",
+                    "model": payload.get("model", ""),
+                    "choices": [],
+                    "usage": self.build_completion(payload, content)["usage"],
+                }
+            )
+        return chunks
+
+    def start(self) -> "StubOCRServer":
+        self._server = _StubHTTPServer((self.host, self.port), self)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "StubOCRServer":
+        return self.start()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.stop()
+
+
+def parse_fault_spec(spec: str) -> tuple[int, float]:
+    """Parse ``status:rate``, e.g. ``429:0.05``."""
+    status, _, rate = spec.partition(":")
+    return int(status), float(rate)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容 OCR 模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="0", help="秒数或分布，如 lognormal:0.8:0.5、uniform:0.2:1.5")
+    parser.add_argument("--fault", action="append", default=[], help="注入错误，如 429:0.05（可重复）")
+    parser.add_argument("--retry-after", type=float, help="429/503 响应携带的 Retry-After 秒数")
+    parser.add_argument(
+        "--content",
+        action="append",
+        help=f"返回内容：预置名称 ({', '.join(CANNED_OUTPUTS)}) 或任意文本（可重复，随机选择）",
+    )
+    parser.add_argument("--chunk-size", type=int, default=8)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    contents = [CANNED_OUTPUTS.get(item, item) for item in args.content or ["default"]]
+    server = StubOCRServer(
+        content=contents,
+        latency=LatencyDistribution.parse(args.latency),
+        faults=dict(parse_fault_spec(spec) for spec in args.fault),
+        retry_after=args.retry_after,
+        chunk_size=args.chunk_size,
+        chunk_delay=args.chunk_delay,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    ).start()
+    print(f"模拟服务已启动: {server.base_url}  (Ctrl+C 退出)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"共处理 {server.request_count} 个请求，注入错误: {server.fault_counts}")
+
+
+if __name__ == "__main__":
+    main()
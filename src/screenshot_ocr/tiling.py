@@ -0,0 +1,316 @@
+"""Recognise very large captures as overlapping tiles, concurrently.
+
+:func:`plan_tiles` splits a capture taller than ``max_height`` into
+horizontal bands, cutting in the middle of blank rows where it can and
+through text only when no gap is near. Bands meeting at such a forced cut
+overlap by ``overlap`` pixels, so the line crossing it is whole in at least
+one of them; bands split in a gap do not overlap, so neither carries a
+sliver of its neighbour's text. Captures wider than ``max_width`` are first split into columns,
+but only at blank columns; lines are never cut sideways.
+
+:class:`TiledOCRBackend` recognises the tiles in parallel and stitches
+their lines in reading order (column by column, top to bottom).
+:func:`merge_overlap` aligns the last lines of one band with the first
+lines of the next to drop what the overlap recognised twice.
+"""
+
+from __future__ import annotations
+
+import difflib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+from PIL import Image
+
+from .backends import OCRBackend
+from .content import ANALYSIS_MAX_WIDTH, edge_mask
+from .image_features import find_runs, to_grayscale_array
+from .image_io import ImageInput, open_image
+from .logging_utils import log_debug
+from .results import OCRResult, TextLine
+
+# Alignment scores: a pair at the similarity threshold scores 0 and an exact
+# pair 1; anything else scores these.
+MISMATCH_SCORE = -1.0
+GAP_SCORE = -0.5
+# A line this long found inside another is a fragment of it, cut at a tile edge.
+MIN_FRAGMENT_CHARS = 4
+
+
+@dataclass(frozen=True)
+class TilePolicy:
+    """When and how to tile; sizes are in pixels of the capture.
+
+    ``search`` is how far back from the size limit a cut may move to land
+    in a gap, as a fraction of that limit.
+    """
+
+    max_height: int = 2048
+    max_width: int = 2560
+    overlap: int = 96
+    max_workers: int = 4
+    search: float = 0.25
+    window: int = 8
+    similarity: float = 0.8
+
+
+@dataclass(frozen=True)
+class Tile:
+    """``box`` is ``(left, top, right, bottom)``; tiles in one ``column`` are stacked vertically."""
+
+    box: tuple[int, int, int, int]
+    column: int = 0
+
+
+def find_cuts(blank: np.ndarray, limit: int, search: int, *, forced: bool) -> list[tuple[int, bool]]:
+    """Positions that split ``blank`` into parts of at most ``limit``.
+
+    Each cut goes in the middle of the last blank run within ``search`` of
+    the limit. Without such a run the part is cut at the limit when
+    ``forced``, otherwise splitting stops. Each cut comes with whether it
+    was forced through content.
+    """
+    cuts: list[tuple[int, bool]] = []
+    start = 0
+    limit = max(1, limit)
+    while len(blank) - start > limit:
+        target = start + limit
+        low = max(start + 1, target - search)
+        runs = find_runs(blank[low:target])
+        if runs:
+            run_start, run_end = runs[-1]
+            cut = low + (run_start + run_end) // 2
+        elif forced:
+            cut = target
+        else:
+            break
+        cuts.append((cut, not runs))
+        start = cut
+    return cuts
+
+
+def plan_tiles(image: Image.Image, policy: TilePolicy) -> list[Tile]:
+    """Split ``image`` into tiles in reading order; one tile if it is small enough."""
+    width, height = image.size
+    if width <= policy.max_width and height <= policy.max_height:
+        return [Tile((0, 0, width, height))]
+
+    mask = edge_mask(to_grayscale_array(image, ANALYSIS_MAX_WIDTH))
+    scale = width / mask.shape[1]
+    max_width = int(policy.max_width / scale)
+    column_cuts = find_cuts(~mask.any(axis=0), max_width, int(max_width * policy.search), forced=False)
+    column_edges = [0, *(round(cut * scale) for cut, _ in column_cuts), width]
+
+    overlap = int(policy.overlap / scale)
+    tiles: list[Tile] = []
+    for column, (left, right) in enumerate(zip(column_edges, column_edges[1:])):
+        band = mask[:, int(left / scale):max(int(left / scale) + 1, int(right / scale))]
+        max_height = int(policy.max_height / scale) - overlap
+        row_cuts = find_cuts(~band.any(axis=1), max_height, int(max_height * policy.search), forced=True)
+        row_edges = [0, *(round(cut * scale) for cut, _ in row_cuts), height]
+        through_text = [False, *(forced for _, forced in row_cuts), False]
+        for index, (top, bottom) in enumerate(zip(row_edges, row_edges[1:])):
+            if through_text[index]:
+                top = max(0, top - policy.overlap // 2)
+            if through_text[index + 1]:
+                bottom = min(height, bottom + policy.overlap // 2)
+            tiles.append(Tile((left, top, right, bottom), column))
+    return tiles
+
+
+def line_similarity(first: str, second: str) -> float:
+    """How alike two recognised lines are, ``1.0`` when one is a fragment of the other."""
+    first, second = "".join(first.split()), "".join(second.split())
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    shorter, longer = sorted((first, second), key=len)
+    if len(shorter) >= MIN_FRAGMENT_CHARS and shorter in longer:
+        return 1.0
+    return difflib.SequenceMatcher(None, first, second, autojunk=False).ratio()
+
+
+def _align_overlap(
+    tail: Sequence[TextLine],
+    head: Sequence[TextLine],
+    threshold: float,
+) -> tuple[float, int, np.ndarray]:
+    """Overlap-align ``tail`` with ``head``: best score, lines of ``head`` used, moves."""
+    scores = np.zeros((len(tail) + 1, len(head) + 1))
+    moves = np.zeros(scores.shape, dtype=np.int8)  # 1 match, 2 tail only, 3 head only
+    scores[0, 1:] = GAP_SCORE * np.arange(1, len(head) + 1)
+    moves[0, 1:] = 3
+    for i in range(1, len(tail) + 1):
+        for j in range(1, len(head) + 1):
+            similarity = line_similarity(tail[i - 1].content, head[j - 1].content)
+            if similarity >= threshold:
+                match = (similarity - threshold) / (1.0 - threshold) if threshold < 1.0 else 1.0
+            else:
+                match = MISMATCH_SCORE
+            options = (
+                scores[i - 1, j - 1] + match,
+                scores[i - 1, j] + GAP_SCORE,
+                scores[i, j - 1] + GAP_SCORE,
+            )
+            best = int(np.argmax(options))
+            scores[i, j] = options[best]
+            moves[i, j] = best + 1
+    end = int(np.argmax(scores[len(tail)]))
+    return float(scores[len(tail), end]), end, moves
+
+
+def merge_overlap(
+    previous: Sequence[TextLine],
+    following: Sequence[TextLine],
+    *,
+    window: int = 8,
+    threshold: float = 0.8,
+) -> list[TextLine]:
+    """Join two vertically overlapping tiles' lines, keeping overlap lines once.
+
+    The last ``window`` lines of ``previous`` are aligned with the first
+    ``window`` of ``following`` (an overlap alignment: it must reach the end
+    of ``previous`` and start at the top of ``following``). Both tiles see
+    the same pixels there, so exact and fragment matches are tried first;
+    only without any does a pair need ``threshold`` similarity. The longer
+    line of each pair is kept, since the other may be cut by the tile edge;
+    unpaired lines are all kept.
+    """
+    if not previous or not following:
+        return [*previous, *following]
+    offset = max(0, len(previous) - window)
+    tail, head = previous[offset:], following[:window]
+
+    score, end, moves = _align_overlap(tail, head, 1.0)
+    if score <= 0 and threshold < 1.0:
+        score, end, moves = _align_overlap(tail, head, threshold)
+    if score <= 0:
+        return [*previous, *following]
+
+    merged: list[TextLine] = []
+    i, j = len(tail), end
+    while j > 0:
+        move = moves[i, j]
+        if move == 1:
+            merged.append(max(tail[i - 1], head[j - 1], key=lambda line: len(line.content)))
+            i, j = i - 1, j - 1
+        elif move == 2:
+            merged.append(tail[i - 1])
+            i -= 1
+        else:
+            merged.append(head[j - 1])
+            j -= 1
+    merged.reverse()
+    log_debug(f"拼接重叠区域: 合并 {len(tail) - i + end - len(merged)} 行重复内容")
+    return [*previous[:offset + i], *merged, *following[end:]]
+
+
+def _shift(line: TextLine, left: int, top: int) -> TextLine:
+    if line.box is None:
+        return line
+    x0, y0, x1, y1 = line.box
+    return replace(line, box=(x0 + left, y0 + top, x1 + left, y1 + top))
+
+
+def _sum_usage(results: Sequence[OCRResult]) -> dict[str, Any] | None:
+    usages = [result.usage for result in results if result.usage]
+    if not usages:
+        return None
+    total: dict[str, Any] = {}
+    for usage in usages:
+        for key, value in usage.items():
+            if isinstance(value, (int, float)):
+                total[key] = total.get(key, 0) + value
+    return total
+
+
+class TiledOCRBackend(OCRBackend):
+    """Wrap a backend so captures larger than the policy's limits are tiled.
+
+    Tiles are recognised by ``inner`` with up to ``max_workers`` in flight,
+    so a capture takes about as long as its slowest round of tiles rather
+    than the sum of them. Smaller captures go to ``inner`` unchanged.
+    """
+
+    name = "tiled"
+
+    def __init__(self, inner: OCRBackend, policy: TilePolicy | None = None):
+        self.inner = inner
+        self.policy = policy or TilePolicy()
+        self.capabilities = inner.capabilities
+
+    def _plan(self, image: ImageInput) -> tuple[list[Tile], list[Image.Image]]:
+        with open_image(image) as opened:
+            tiles = plan_tiles(opened, self.policy)
+            if len(tiles) == 1:
+                return tiles, []
+            log_debug(f"大截图分块识别: {opened.width}x{opened.height} -> {len(tiles)} 块")
+            return tiles, [opened.crop(tile.box) for tile in tiles]
+
+    def recognize(self, image: ImageInput, model: str | None = None) -> list[str]:
+        return self.recognize_result(image, model).texts
+
+    def recognize_result(self, image: ImageInput, model: str | None = None) -> OCRResult:
+        started_at = time.perf_counter()
+        tiles, crops = self._plan(image)
+        if not crops:
+            return self.inner.recognize_result(image, model)
+        return self._recognize_tiles(tiles, crops, model, started_at)
+
+    def _recognize_tiles(
+        self,
+        tiles: list[Tile],
+        crops: list[Image.Image],
+        model: str | None,
+        started_at: float,
+    ) -> OCRResult:
+        planned_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.policy.max_workers, len(crops)))) as executor:
+            results = list(executor.map(lambda crop: self.inner.recognize_result(crop, model), crops))
+        recognised_at = time.perf_counter()
+
+        lines: list[TextLine] = []
+        previous: Tile | None = None
+        for tile, result in zip(tiles, results):
+            tile_lines = [_shift(line, tile.box[0], tile.box[1]) for line in result.lines if line.content]
+            # Only bands sharing rows can have read a line twice.
+            if previous is not None and tile.column == previous.column and tile.box[1] < previous.box[3]:
+                lines = merge_overlap(
+                    lines,
+                    tile_lines,
+                    window=self.policy.window,
+                    threshold=self.policy.similarity,
+                )
+            else:
+                lines.extend(tile_lines)
+            previous = tile
+        finished_at = time.perf_counter()
+        return OCRResult(
+            lines,
+            timings={
+                "plan": planned_at - started_at,
+                "recognize": recognised_at - planned_at,
+                "stitch": finished_at - recognised_at,
+                "total": finished_at - started_at,
+            },
+            usage=_sum_usage(results),
+            raw=results,
+            model=results[0].model,
+            backend=self.inner.name,
+        )
+
+    def recognize_stream(self, image: ImageInput, model: str | None = None) -> Iterator[str]:
+        """Stream small captures; tiled ones yield their lines once stitched."""
+        started_at = time.perf_counter()
+        tiles, crops = self._plan(image)
+        if not crops:
+            yield from self.inner.recognize_stream(image, model)
+        else:
+            yield from self._recognize_tiles(tiles, crops, model, started_at).texts
+
+    def warm_up(self) -> bool:
+        return self.inner.warm_up()
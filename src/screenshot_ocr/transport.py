@@ -0,0 +1,99 @@
+"""HTTP transport with pooled keep-alive connections."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logging_utils import log_debug
+
+DEFAULT_POOL_CONNECTIONS = 2
+DEFAULT_POOL_MAXSIZE = 8
+
+
+class HTTPTransport:
+    """Own a pooled ``requests.Session`` that OCR clients reuse across calls.
+
+    The session keeps TCP/TLS connections alive between hotkey presses, so
+    only the first request to a host pays for DNS, connect and handshake.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        session: requests.Session | None = None,
+    ):
+        self.pool_connections = max(1, int(pool_connections))
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.keep_alive = keep_alive
+        self.session = session or self._create_session()
+        # Monotonic timestamps: last OCR request, and last traffic of any kind.
+        self.last_used = 0.0
+        self.last_activity = 0.0
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        log_debug(f"HTTP 连接池已创建: hosts={self.pool_connections}, maxsize={self.pool_maxsize}")
+        return session
+
+    def post(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] | None = 60,
+        **kwargs: Any,
+    ) -> requests.Response:
+        self.last_used = self.last_activity = time.monotonic()
+        return self.session.post(url, headers=headers, timeout=timeout, **kwargs)
+
+    def get(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] | None = 10,
+        **kwargs: Any,
+    ) -> requests.Response:
+        self.last_activity = time.monotonic()
+        return self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+
+    def idle_seconds(self) -> float:
+        """Seconds since the pool last carried any traffic."""
+        return time.monotonic() - self.last_activity
+
+    def connect(self, url: str, *, timeout: float = 10) -> bool:
+        """Open a pooled connection to ``url``'s host with a cheap ``HEAD``.
+
+        Goes through the session like any request, so DNS, the TCP (and TLS)
+        handshake and any proxy tunnel are set up exactly as a later ``post``
+        to that host needs them. The answer's status is ignored and the call
+        does not count as OCR use.
+        """
+        self.session.head(url, timeout=timeout, allow_redirects=False)
+        self.last_activity = time.monotonic()
+        log_debug(f"已预先建立连接: {url}")
+        return True
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "HTTPTransport":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import queue
 import sys
 import threading
@@ -13,19 +14,32 @@ import pyperclip
 
 from config.ocr_config import OCRConfig
 from .app import OCRService
-from .capture import capture_region_to_temp_file, delete_file_quietly
+from .budget import RequestBudgetModel
+from .capture import capture_region, delete_file_quietly
 from .config import load_app_config, save_app_config
+from .content import CaptureFilter
+from .encoder import ImageEncoder
+from .hedging import HedgePolicy
 from .hotkeys import HotkeyListener
 from .logging_utils import log_debug, log_error, log_info, log_ok, log_warn
 from .notifier import (
     build_busy_message,
     build_empty_result_message,
+    build_notification_preview,
     build_success_message,
     show_notification,
 )
+from .ocr_client import PaddleOCRVL
+from .preprocess import PreprocessOptions
+from .prewarm import ConnectionWarmer, HeartbeatPolicy, probe_server
+from .routing import ModelRouter
+from .spool import DrainReport, JobSpool, SpoolDrainer, is_spoolable
+from .tiling import TilePolicy
+from .transport import HTTPTransport
 from .ui_dialogs import show_api_key_dialog, show_settings_window
 from .ui_selection import RegionSelector
 from .ui_tray import create_tray_icon
+from .usage import TokenThrottle, UsageLedger, get_usage_ledger_path
 
 # Set DPI awareness before creating Tk windows on Windows.
 try:
@@ -36,6 +50,87 @@ except (ImportError, AttributeError, OSError):
     pass
 
 
+def build_preprocess_options() -> PreprocessOptions | None:
+    if not OCRConfig.IMAGE_PREPROCESS:
+        return None
+    return PreprocessOptions(
+        target_x_height=OCRConfig.PREPROCESS_X_HEIGHT or None,
+        grayscale=OCRConfig.PREPROCESS_GRAYSCALE,
+        levels=OCRConfig.PREPROCESS_LEVELS or None,
+    )
+
+
+def build_pipeline_options() -> dict[str, object]:
+    """Translate optional OCRConfig features into PaddleOCRVL keyword arguments."""
+    options: dict[str, object] = {
+        "vl_rec_backend_options": {"local_max_area": OCRConfig.LOCAL_MAX_AREA},
+        "vl_rec_encoder": ImageEncoder(
+            OCRConfig.IMAGE_ENCODING,
+            upload_bytes_per_second=OCRConfig.UPLOAD_BANDWIDTH_MBPS * 1_000_000 / 8,
+            preprocess=build_preprocess_options(),
+        ),
+    }
+    if OCRConfig.ENDPOINTS:
+        options["vl_rec_endpoints"] = list(OCRConfig.ENDPOINTS)
+    if OCRConfig.TILE_LARGE_CAPTURES:
+        options["vl_rec_tile_policy"] = TilePolicy(
+            max_height=OCRConfig.TILE_MAX_HEIGHT,
+            max_width=OCRConfig.TILE_MAX_WIDTH,
+            overlap=OCRConfig.TILE_OVERLAP,
+            max_workers=OCRConfig.TILE_CONCURRENCY,
+        )
+    if OCRConfig.HEDGE_REQUESTS:
+        options["vl_rec_hedge_policy"] = HedgePolicy(
+            percentile=OCRConfig.HEDGE_PERCENTILE,
+            budget_ratio=OCRConfig.HEDGE_BUDGET_RATIO,
+        )
+    if OCRConfig.ADAPTIVE_REQUEST_BUDGET:
+        options["vl_rec_budget_model"] = RequestBudgetModel(
+            connect_timeout=OCRConfig.REQUEST_CONNECT_TIMEOUT,
+            read_timeout=OCRConfig.REQUEST_DEADLINE,
+            deadline=OCRConfig.REQUEST_DEADLINE,
+        )
+    ledger = UsageLedger(get_usage_ledger_path()) if OCRConfig.USAGE_LEDGER else None
+    if ledger is not None:
+        options["vl_rec_usage_ledger"] = ledger
+    if OCRConfig.TOKENS_PER_MINUTE or OCRConfig.TOKENS_PER_DAY:
+        options["vl_rec_throttle"] = TokenThrottle(
+            tokens_per_minute=OCRConfig.TOKENS_PER_MINUTE,
+            tokens_per_day=OCRConfig.TOKENS_PER_DAY,
+            ledger=ledger,
+        )
+    return options
+
+
+def build_connection_warmer(transport: HTTPTransport) -> ConnectionWarmer | None:
+    if not OCRConfig.PREWARM_CONNECTION:
+        return None
+    heartbeat = None
+    if OCRConfig.HEARTBEAT_INTERVAL:
+        heartbeat = HeartbeatPolicy(
+            interval=OCRConfig.HEARTBEAT_INTERVAL,
+            max_idle=OCRConfig.HEARTBEAT_MAX_IDLE,
+        )
+    return ConnectionWarmer(
+        transport,
+        OCRConfig.SERVER_URL,
+        probe=OCRConfig.PREWARM_PROBE,
+        heartbeat=heartbeat,
+    )
+
+
+def build_capture_filter() -> CaptureFilter | None:
+    if not (OCRConfig.SKIP_BLANK_CAPTURES or OCRConfig.TRIM_CAPTURE_MARGINS):
+        return None
+    return CaptureFilter(skip_blank=OCRConfig.SKIP_BLANK_CAPTURES, trim=OCRConfig.TRIM_CAPTURE_MARGINS)
+
+
+def build_model_router() -> ModelRouter | None:
+    if not OCRConfig.MODEL_ROUTES:
+        return None
+    return ModelRouter(OCRConfig.MODEL_ROUTES, default_model=OCRConfig.MODEL_NAME)
+
+
 class HotkeyOCR:
     """Hotkey-driven tray OCR application."""
 
@@ -45,12 +140,23 @@ class HotkeyOCR:
         self.root: tk.Tk | None = None
         self.tray_icon = None
         self.hotkey_listener = None
+        transport = HTTPTransport(
+            pool_connections=OCRConfig.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=OCRConfig.HTTP_POOL_MAXSIZE,
+            keep_alive=OCRConfig.HTTP_KEEP_ALIVE,
+        )
         self.ocr_service = OCRService(
             self.config,
             server_url=OCRConfig.SERVER_URL,
             model_name=OCRConfig.MODEL_NAME,
             backend=OCRConfig.BACKEND,
+            pipeline_factory=functools.partial(PaddleOCRVL, **build_pipeline_options()),
+            transport=transport,
+            model_router=build_model_router(),
+            warmer=build_connection_warmer(transport),
+            capture_filter=build_capture_filter(),
         )
+        self.spool_drainer = self._build_spool_drainer()
 
         self.ui_queue: queue.Queue[tuple[str, object | None]] = queue.Queue()
         self.state_lock = threading.Lock()
@@ -66,6 +172,7 @@ class HotkeyOCR:
         self.region_selector = RegionSelector(
             on_region_selected=self._handle_selected_region,
             on_cancel=self._handle_selection_cancel,
+            on_open=self.ocr_service.prewarm,
         )
 
         if not self.check_api_key():
@@ -134,6 +241,76 @@ class HotkeyOCR:
     def init_ocr(self):
         """Initialize OCR service."""
         self.ocr_service.initialize()
+        pipeline = self.ocr_service.pipeline
+        if pipeline is not None and OCRConfig.PREWARM_CONNECTION:
+            # Local engines load their models here instead of on the first capture.
+            threading.Thread(target=self._warm_up_pipeline, args=(pipeline,), name="ocr-warm-up", daemon=True).start()
+        if self.ocr_service.warmer is not None:
+            self.ocr_service.warmer.start_heartbeat()
+        if self.spool_drainer is not None:
+            self.spool_drainer.start()
+            if len(self.spool_drainer.spool):
+                self.spool_drainer.trigger()
+
+    def _build_spool_drainer(self) -> SpoolDrainer | None:
+        if not OCRConfig.JOB_SPOOL:
+            return None
+        try:
+            spool = JobSpool()
+        except OSError as exc:
+            log_warn(f"离线队列不可用: {exc}")
+            return None
+        return SpoolDrainer(
+            spool,
+            self.ocr_service.recognize_file,
+            health_check=self._ocr_service_healthy,
+            concurrency=OCRConfig.SPOOL_CONCURRENCY,
+            interval=OCRConfig.SPOOL_DRAIN_INTERVAL,
+            on_drained=self._deliver_spooled_results,
+        )
+
+    def _ocr_service_healthy(self) -> bool:
+        pipeline = self.ocr_service.pipeline
+        if pipeline is not None and pipeline.capabilities.local:
+            return True
+        return probe_server(
+            self.ocr_service.transport,
+            self.ocr_service.server_url,
+            headers={"Authorization": f"Bearer {self.config.api_key}"},
+        )
+
+    def _spool_failed_capture(self, image, exc: Exception) -> bool:
+        """Keep a capture that failed because of an outage; return whether it was kept."""
+        if self.spool_drainer is None or not is_spoolable(exc):
+            return False
+        try:
+            self.spool_drainer.spool.enqueue(image, metadata={"captured_at": time.time()}, error=str(exc))
+        except OSError as spool_exc:
+            log_error(f"保存离线截图失败: {spool_exc}", spool_exc)
+            return False
+        return True
+
+    def _deliver_spooled_results(self, report: DrainReport):
+        # The clipboard belongs to the live capture; a late drain must not overwrite it.
+        spool = self.spool_drainer.spool
+        try:
+            count = spool.export_results(report.done)
+        except OSError as exc:
+            log_error(f"保存离线截图识别结果失败: {exc}", exc)
+            return
+        if not count:
+            return
+        log_ok(f"离线截图识别完成，{count} 张的结果已保存到 {spool.results_path}")
+        if self.config.get("show_notification", True):
+            text = "\n\n".join("\n".join(job.lines) for job in report.done if job.lines)
+            message = f"已补识别 {count} 张离线截图，结果已保存到 {spool.results_path}\n{build_notification_preview(text, limit=36)}"
+            self.ui_queue.put(("notification", ("离线截图已识别", message)))
+
+    def _warm_up_pipeline(self, pipeline: PaddleOCRVL):
+        try:
+            pipeline.warm_up()
+        except Exception as exc:
+            log_warn(f"OCR 后端预热失败（不影响识别）: {exc}")
 
     def start_hotkey_listener(self):
         """Start hotkey listener."""
@@ -143,6 +320,7 @@ class HotkeyOCR:
                 mode=self.config.mode,
                 long_press_time=self.config.long_press_time,
                 on_trigger=self.trigger_screenshot,
+                on_press=self.ocr_service.prewarm,
             )
             self.hotkey_listener.start()
         except ImportError:
@@ -202,7 +380,7 @@ class HotkeyOCR:
                     self._show_status_message(message, duration_ms=duration_ms, level=level)
                 elif task == "status_show":
                     title, detail = data
-                    self._show_status_overlay(title, detail, show_progress=True)
+                    self._show_status_overlay(title, detail)
                 elif task == "status_hide":
                     self._hide_status_overlay()
         except queue.Empty:
@@ -308,25 +486,24 @@ class HotkeyOCR:
             return
 
         try:
-            temp_path, screenshot_size = capture_region_to_temp_file(x1, y1, x2, y2)
-            log_debug(f"截图尺寸: {screenshot_size}")
+            screenshot = capture_region(x1, y1, x2, y2)
+            log_debug(f"截图尺寸: {screenshot.size}")
 
             if not self._begin_ocr_job():
-                delete_file_quietly(temp_path)
                 message = build_busy_message()
                 log_warn(message)
                 if self.config.get("show_notification", True):
                     self.ui_queue.put(("notification", ("OCR 状态", message)))
                 return
 
-            width, height = screenshot_size
+            width, height = screenshot.size
             self.ui_queue.put(
                 (
                     "status_show",
                     ("正在识别", f"已截取 {width} x {height} 区域，正在上传并识别文字..."),
                 )
             )
-            threading.Thread(target=self.perform_ocr, args=(temp_path,), daemon=True).start()
+            threading.Thread(target=self.perform_ocr, args=(screenshot,), daemon=True).start()
         except (OSError, RuntimeError, ValueError) as exc:
             log_error(f"截图失败: {exc}", exc)
 
@@ -334,11 +511,65 @@ class HotkeyOCR:
         """Handle selection cancellation."""
         log_debug("已取消区域选择")
 
-    def perform_ocr(self, image_path):
-        """Run OCR on a captured image file."""
+    def _recognize_progressively(self, image) -> list[str]:
+        """Stream lines into the clipboard and status overlay as they arrive.
+
+        The clipboard is rewritten at most every ``STREAM_CLIPBOARD_INTERVAL``
+        seconds; if recognition fails midway, its previous contents are put back.
+        """
+        text_list: list[str] = []
+        previous_clipboard: str | None = None
+        copied_at: float | None = None
+        try:
+            for line in self.ocr_service.recognize_file_stream(image):
+                text_list.append(line)
+                now = time.monotonic()
+                if copied_at is None or now - copied_at >= OCRConfig.STREAM_CLIPBOARD_INTERVAL:
+                    if copied_at is None:
+                        previous_clipboard = self._read_clipboard()
+                    pyperclip.copy("\n".join(text_list))
+                    copied_at = now
+                preview = build_notification_preview(line, limit=36)
+                self.ui_queue.put(
+                    (
+                        "status_show",
+                        ("正在识别", f"已识别 {len(text_list)} 行并复制到剪贴板...\n{preview}"),
+                    )
+                )
+        except Exception:
+            if copied_at is not None:
+                self._restore_clipboard(previous_clipboard)
+            raise
+        return text_list
+
+    @staticmethod
+    def _read_clipboard() -> str | None:
+        try:
+            return pyperclip.paste()
+        except pyperclip.PyperclipException as exc:
+            log_debug(f"读取剪贴板失败: {exc}")
+            return None
+
+    @staticmethod
+    def _restore_clipboard(previous: str | None) -> None:
+        if previous is None:
+            log_warn("识别中途失败，剪贴板中是部分识别结果")
+            return
+        try:
+            pyperclip.copy(previous)
+            log_info("识别中途失败，已恢复剪贴板原有内容")
+        except pyperclip.PyperclipException as exc:
+            log_warn(f"识别中途失败，剪贴板中是部分识别结果（恢复失败: {exc}）")
+
+    def perform_ocr(self, image):
+        """Run OCR on a captured image, in memory or as a temp file."""
         log_ok("正在识别文字...")
         try:
-            text_list = self.ocr_service.recognize_file(image_path)
+            pipeline = self.ocr_service.pipeline
+            if OCRConfig.STREAM_RESULTS and (pipeline is None or pipeline.capabilities.streaming):
+                text_list = self._recognize_progressively(image)
+            else:
+                text_list = self.ocr_service.recognize_file(image)
             elapsed_seconds = self._current_ocr_elapsed()
 
             if text_list:
@@ -360,14 +591,23 @@ class HotkeyOCR:
                 if self.config.get("show_notification", True):
                     message = build_empty_result_message(elapsed_seconds=elapsed_seconds)
                     self.ui_queue.put(("notification", ("OCR 识别结果", message)))
+
+            if self.spool_drainer is not None and len(self.spool_drainer.spool):
+                # The service answers again, so earlier captures can go now.
+                self.spool_drainer.trigger()
         except Exception as exc:
             log_error(f"OCR 识别失败: {exc}", exc)
-            if self.config.get("show_notification", True):
+            if self._spool_failed_capture(image, exc):
+                if self.config.get("show_notification", True):
+                    message = f"{exc}\n截图已保存，服务恢复后将自动识别并保存结果"
+                    self.ui_queue.put(("notification", ("OCR 暂时不可用", message)))
+            elif self.config.get("show_notification", True):
                 self.ui_queue.put(("notification", ("OCR 识别失败", str(exc))))
         finally:
             self._end_ocr_job()
             self.ui_queue.put(("status_hide", None))
-            delete_file_quietly(image_path)
+            if isinstance(image, str):
+                delete_file_quietly(image)
 
     def _show_notification(self, title, message):
         """Display system notification."""
@@ -401,6 +641,10 @@ class HotkeyOCR:
         """Tray menu callback for exit."""
         self.running = False
         self.stop_hotkey_listener()
+        if self.ocr_service.warmer is not None:
+            self.ocr_service.warmer.stop()
+        if self.spool_drainer is not None:
+            self.spool_drainer.stop()
         if self.tray_icon:
             self.tray_icon.stop()
         if self.root:
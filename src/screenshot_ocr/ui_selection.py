@@ -25,9 +25,11 @@ class RegionSelector:
         *,
         on_region_selected: Callable[[tuple[int, int, int, int]], None],
         on_cancel: Callable[[], None] | None = None,
+        on_open: Callable[[], None] | None = None,
     ):
         self.on_region_selected = on_region_selected
         self.on_cancel = on_cancel
+        self.on_open = on_open
         self.selecting = False
         self.select_window: tk.Toplevel | None = None
         self.canvas: tk.Canvas | None = None
@@ -43,6 +45,8 @@ class RegionSelector:
             return False
 
         self.selecting = True
+        if self.on_open is not None:
+            self.on_open()
         screen_width = root.winfo_screenwidth()
         screen_height = root.winfo_screenheight()
         log_debug(f"屏幕尺寸: {screen_width}x{screen_height}")
@@ -0,0 +1,337 @@
+"""Token usage ledger and quota-aware request throttling."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import Any, Iterator
+
+from .errors import OCRRequestError
+from .latency import EWMA
+from .logging_utils import log_debug, log_warn
+from .paths import get_data_dir
+
+
+def get_usage_ledger_path() -> str:
+    return os.path.join(get_data_dir(), "usage.jsonl")
+
+
+def estimate_request_bytes(payload: dict[str, Any]) -> int:
+    """Approximate the JSON body size without serialising the payload again."""
+    size = 256
+    for message in payload.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, str):
+            size += len(content.encode("utf-8"))
+            continue
+        for part in content or []:
+            if part.get("type") == "image_url":
+                size += len(part["image_url"]["url"])
+            else:
+                size += len(str(part.get("text", "")).encode("utf-8"))
+    return size
+
+
+def _day_of(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).date().isoformat()
+
+
+@dataclass
+class UsageRecord:
+    timestamp: float
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    bytes_uploaded: int = 0
+    latency: float = 0.0
+    ok: bool = True
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def day(self) -> str:
+        return _day_of(self.timestamp)
+
+    def to_row(self) -> list[Any]:
+        return [
+            round(self.timestamp, 3),
+            self.model,
+            self.prompt_tokens,
+            self.completion_tokens,
+            self.bytes_uploaded,
+            round(self.latency * 1000),
+            int(self.ok),
+        ]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> "UsageRecord":
+        timestamp, model, prompt_tokens, completion_tokens, bytes_uploaded, latency_ms, ok = row
+        return cls(
+            timestamp=float(timestamp),
+            model=str(model),
+            prompt_tokens=int(prompt_tokens),
+            completion_tokens=int(completion_tokens),
+            bytes_uploaded=int(bytes_uploaded),
+            latency=int(latency_ms) / 1000,
+            ok=bool(ok),
+        )
+
+    @classmethod
+    def from_usage(
+        cls,
+        usage: dict[str, Any] | None,
+        *,
+        model: str,
+        bytes_uploaded: int,
+        latency: float,
+        ok: bool = True,
+        timestamp: float | None = None,
+    ) -> "UsageRecord":
+        usage = usage or {}
+        return cls(
+            timestamp=time.time() if timestamp is None else timestamp,
+            model=model,
+            prompt_tokens=int(usage.get("prompt_tokens") or 0),
+            completion_tokens=int(usage.get("completion_tokens") or 0),
+            bytes_uploaded=bytes_uploaded,
+            latency=latency,
+            ok=ok,
+        )
+
+
+@dataclass
+class UsageSummary:
+    requests: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    bytes_uploaded: int = 0
+    total_latency: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    def add(self, record: UsageRecord) -> None:
+        self.requests += 1
+        self.errors += 0 if record.ok else 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.bytes_uploaded += record.bytes_uploaded
+        self.total_latency += record.latency
+
+    def merge(self, other: "UsageSummary") -> None:
+        self.requests += other.requests
+        self.errors += other.errors
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.bytes_uploaded += other.bytes_uploaded
+        self.total_latency += other.total_latency
+
+
+class UsageLedger:
+    """Append-only usage log, one compact JSON array per request.
+
+    Only per-day, per-model totals and the ``keep_recent`` newest records are
+    held in memory, so memory stays flat however long the log grows. With
+    ``path=None`` records are kept in memory only.
+    """
+
+    def __init__(self, path: str | None = None, *, keep_recent: int = 1000):
+        self.path = path
+        self._recent: deque[UsageRecord] = deque(maxlen=max(1, keep_recent))
+        self._summaries: dict[tuple[str, str], UsageSummary] = {}
+        self._loaded = path is None
+        self._lock = threading.Lock()
+
+    def _add(self, record: UsageRecord) -> None:
+        self._recent.append(record)
+        self._summaries.setdefault((record.day, record.model), UsageSummary()).add(record)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        assert self.path is not None
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    try:
+                        self._add(UsageRecord.from_row(json.loads(line)))
+                    except (ValueError, TypeError):
+                        log_warn(f"跳过损坏的用量记录: {line.strip()!r}")
+        except FileNotFoundError:
+            pass
+
+    def record(self, record: UsageRecord) -> None:
+        with self._lock:
+            self._load()
+            self._add(record)
+            if self.path is None:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record.to_row(), ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def records(self, *, day: str | date | None = None, model: str | None = None) -> Iterator[UsageRecord]:
+        """The most recent records, oldest first; older ones live on only in the totals."""
+        day_text = day.isoformat() if isinstance(day, date) else day
+        with self._lock:
+            self._load()
+            snapshot = list(self._recent)
+        for record in snapshot:
+            if day_text is not None and record.day != day_text:
+                continue
+            if model is not None and record.model != model:
+                continue
+            yield record
+
+    def summarize(self, *, day: str | date | None = None, model: str | None = None) -> UsageSummary:
+        day_text = day.isoformat() if isinstance(day, date) else day
+        summary = UsageSummary()
+        for (summary_day, summary_model), part in self.summarize_by_day_and_model().items():
+            if (day_text is None or summary_day == day_text) and (model is None or summary_model == model):
+                summary.merge(part)
+        return summary
+
+    def summarize_by_day_and_model(self) -> dict[tuple[str, str], UsageSummary]:
+        with self._lock:
+            self._load()
+            return {key: replace(summary) for key, summary in self._summaries.items()}
+
+
+class QuotaExceededError(OCRRequestError):
+    """The configured daily token budget is used up."""
+
+
+class TokenThrottle:
+    """Pace requests to stay inside per-minute and per-day token budgets.
+
+    Requests are delayed once the last minute's usage passes
+    ``soft_limit_ratio`` of the per-minute budget, and blocked until the
+    window frees up when the next request would exceed it. A spent daily
+    budget raises :class:`QuotaExceededError` instead of waiting for midnight.
+    A limit of ``0`` disables that budget.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(
+        self,
+        *,
+        tokens_per_minute: int = 0,
+        tokens_per_day: int = 0,
+        soft_limit_ratio: float = 0.8,
+        ledger: UsageLedger | None = None,
+        time_module: Any | None = None,
+    ):
+        self.tokens_per_minute = max(0, int(tokens_per_minute))
+        self.tokens_per_day = max(0, int(tokens_per_day))
+        self.soft_limit_ratio = soft_limit_ratio
+        self.time_module = time_module or time
+        self.estimate = EWMA(alpha=0.2)
+        self._window: deque[tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+        self._day = _day_of(self.time_module.time())
+        self._day_tokens = ledger.summarize(day=self._day).total_tokens if ledger is not None else 0
+
+    def _expire(self, now: float) -> int:
+        while self._window and self._window[0][0] <= now - self.WINDOW_SECONDS:
+            self._window.popleft()
+        day = _day_of(now)
+        if day != self._day:
+            self._day = day
+            self._day_tokens = 0
+        return sum(tokens for _, tokens in self._window)
+
+    def _check_daily_budget(self, needed: int) -> None:
+        if self.tokens_per_day and self._day_tokens + needed > self.tokens_per_day:
+            raise QuotaExceededError(
+                f"今日 token 配额已用完 ({self._day_tokens}/{self.tokens_per_day})，请明天再试"
+            )
+
+    def _wait_until_fits(self, now: float, used: int, needed: int) -> float:
+        freed = 0
+        for timestamp, tokens in self._window:
+            freed += tokens
+            if used - freed + needed <= self.tokens_per_minute:
+                return max(0.0, timestamp + self.WINDOW_SECONDS - now)
+        return self.WINDOW_SECONDS
+
+    def acquire(self, estimated_tokens: int | None = None) -> float:
+        """Block until a request of ``estimated_tokens`` fits; return the wait.
+
+        Without an explicit estimate the running average of recent requests
+        is used.
+        """
+        needed = int(estimated_tokens if estimated_tokens is not None else (self.estimate.value or 0))
+        waited = 0.0
+        paced = False
+        while True:
+            with self._lock:
+                now = self.time_module.time()
+                used = self._expire(now)
+                self._check_daily_budget(needed)
+                if not self.tokens_per_minute:
+                    return waited
+                # A single request larger than the whole budget only has to
+                # wait for an empty window.
+                minute_needed = min(needed, self.tokens_per_minute)
+                if used + minute_needed > self.tokens_per_minute:
+                    delay = self._wait_until_fits(now, used, minute_needed)
+                elif not paced and used > self.soft_limit_ratio * self.tokens_per_minute:
+                    # Spread what is left of the budget evenly over the window.
+                    delay = self.WINDOW_SECONDS * minute_needed / self.tokens_per_minute
+                    paced = True
+                else:
+                    return waited
+            if delay <= 0:
+                return waited
+            log_debug(f"接近 token 配额，等待 {delay:.1f} 秒")
+            self.time_module.sleep(delay)
+            waited += delay
+
+    def record(self, tokens: int) -> None:
+        with self._lock:
+            now = self.time_module.time()
+            self._expire(now)
+            self._window.append((now, tokens))
+            self._day_tokens += tokens
+            if tokens:
+                self.estimate.update(tokens)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="汇总 OCR token 用量")
+    parser.add_argument("--ledger", default=get_usage_ledger_path())
+    parser.add_argument("--day", help="只统计某天 (YYYY-MM-DD)")
+    parser.add_argument("--model", help="只统计某个模型")
+    args = parser.parse_args(argv)
+
+    ledger = UsageLedger(args.ledger)
+    for (day, model), summary in sorted(ledger.summarize_by_day_and_model().items()):
+        if (args.day and day != args.day) or (args.model and model != args.model):
+            continue
+        print(
+            f"{day}  {model}  请求 {summary.requests} (失败 {summary.errors})  "
+            f"tokens {summary.prompt_tokens}+{summary.completion_tokens}={summary.total_tokens}  "
+            f"上传 {summary.bytes_uploaded / 1024:.0f}KB  平均延迟 {summary.mean_latency:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -43,3 +43,116 @@ def test_ocr_service_recognize_file_extracts_text():
     )
 
     assert service.recognize_file("demo.png") == ["line-1", "line-2"]
+
+
+def test_ocr_service_keeps_transport_across_api_key_updates():
+    service = OCRService(
+        AppConfig(api_key="sk-old"),
+        server_url="https://example.com",
+        model_name="demo-model",
+        backend="demo-backend",
+        pipeline_factory=FakePipeline,
+    )
+    service.initialize()
+    first_transport = service.pipeline.kwargs["vl_rec_transport"]
+
+    service.update_api_key("sk-new")
+
+    assert service.pipeline.kwargs["vl_rec_api_key"] == "sk-new"
+    assert service.pipeline.kwargs["vl_rec_transport"] is first_transport
+
+
+def test_ocr_service_routes_model_from_image_features(tmp_path, monkeypatch):
+    from PIL import Image
+
+    from screenshot_ocr import image_features
+    from screenshot_ocr.image_features import compute_image_features, features_for
+    from screenshot_ocr.routing import ModelRouter
+
+    computed = []
+
+    def counting_features(image):
+        computed.append(image)
+        return compute_image_features(image)
+
+    monkeypatch.setattr(image_features, "compute_image_features", counting_features)
+
+    class RecordingPipeline(FakePipeline):
+        def predict(self, image_path, model=None):
+            self.model = model
+            # The client plans its budget from the features the router used.
+            self.features = features_for(image_path)
+            return super().predict(image_path)
+
+    image_path = tmp_path / "snippet.png"
+    Image.new("RGB", (120, 30), "white").save(image_path)
+    router = ModelRouter(
+        [{"model": "lite", "max_area": 10_000}, {"model": "full"}],
+        default_model="full",
+    )
+    service = OCRService(
+        AppConfig(api_key="sk-test"),
+        server_url="https://example.com",
+        model_name="full",
+        backend="demo-backend",
+        pipeline_factory=RecordingPipeline,
+        model_router=router,
+    )
+
+    assert service.recognize_file(str(image_path)) == ["line-1", "line-2"]
+    assert service.pipeline.model == "lite"
+    assert len(computed) == 1
+    assert router.predict_latency("lite", compute_image_features(Image.open(image_path))) is not None
+
+
+def test_ocr_service_streams_lines_from_pipeline():
+    class StreamingPipeline(FakePipeline):
+        def predict_stream(self, image_path):
+            yield "line-1"
+            yield "line-2"
+
+    service = OCRService(
+        AppConfig(api_key="sk-test"),
+        server_url="https://example.com",
+        model_name="demo-model",
+        backend="demo-backend",
+        pipeline_factory=StreamingPipeline,
+    )
+
+    assert list(service.recognize_file_stream("demo.png")) == ["line-1", "line-2"]
+
+
+def test_ocr_service_recognizes_regions_from_one_grab_in_one_request(monkeypatch):
+    from PIL import Image, ImageDraw, ImageGrab
+
+    screen = Image.new("RGB", (400, 200), "white")
+    ImageDraw.Draw(screen).text((20, 20), "OK", fill="black")
+    ImageDraw.Draw(screen).text((220, 120), "Cancel", fill="black")
+    grabs = []
+
+    def fake_grab(bbox=None, all_screens=False):
+        grabs.append(bbox)
+        return screen.crop(bbox)
+
+    monkeypatch.setattr(ImageGrab, "grab", fake_grab)
+
+    class AtlasPipeline(FakePipeline):
+        calls = 0
+
+        def predict(self, image):
+            AtlasPipeline.calls += 1
+            items = [type("Item", (object,), {"content": text})() for text in ("[#1] OK", "[#2] Cancel")]
+            return [{"parsing_res_list": items}]
+
+    service = OCRService(
+        AppConfig(api_key="sk-test"),
+        server_url="https://example.com",
+        model_name="demo-model",
+        backend="demo-backend",
+        pipeline_factory=AtlasPipeline,
+    )
+
+    regions = [(10, 10, 100, 50), (200, 100, 300, 160), (200, 10, 300, 50)]
+    assert service.recognize_regions(regions) == [["OK"], ["Cancel"], []]
+    assert grabs == [(10, 10, 300, 160)]
+    assert AtlasPipeline.calls == 1
@@ -0,0 +1,79 @@
+from PIL import Image, ImageDraw
+
+from screenshot_ocr.atlas import AtlasOCR, map_lines_to_crops, pack_atlases
+
+
+def make_crops(sizes):
+    crops = []
+    for size in sizes:
+        crop = Image.new("RGB", size, "white")
+        ImageDraw.Draw(crop).text((4, 4), "Ab", fill="black")
+        crops.append(crop)
+    return crops
+
+
+def test_pack_atlases_fits_rows_into_height_limited_canvases():
+    crops = make_crops([(120, 30), (80, 20), (200, 40), (60, 30)])
+
+    atlases = pack_atlases(crops, max_height=150, padding=10)
+
+    packed = sorted(index for atlas in atlases for index in atlas.indices)
+    assert packed == [0, 1, 2, 3]
+    assert len(atlases) == 2
+    for atlas in atlases:
+        assert atlas.image.height <= 150
+        boxes = [placement.box for placement in atlas.placements]
+        tops = [box[1] for box in boxes]
+        assert tops == sorted(tops)
+
+
+def test_map_lines_to_crops_follows_markers():
+    lines = ["noise", "[#1] OK", "# 2024 Report", "[#3]", "Cancel", "#1 priority", "【#2】Apply", "[#9] bogus"]
+
+    assert map_lines_to_crops(lines, [0, 1, 2]) == {
+        0: ["OK", "# 2024 Report"],
+        1: ["Apply", "[#9] bogus"],
+        2: ["Cancel", "#1 priority"],
+    }
+
+
+def test_atlas_ocr_makes_one_request_per_canvas():
+    calls = []
+
+    def fake_recognize(path):
+        calls.append(path)
+        return ["[#1] first", "[#2] second"]
+
+    results = AtlasOCR(fake_recognize).recognize_images(make_crops([(50, 20), (40, 20)]))
+
+    assert len(calls) == 1
+    assert results == [["first"], ["second"]]
+
+
+def test_crops_without_marked_lines_fall_back_to_their_own_request():
+    crops = make_crops([(50, 20), (40, 20), (30, 20)])
+
+    def fake_recognize(image):
+        for number, crop in enumerate(crops, start=1):
+            if image is crop:
+                return [f"alone {number}"]
+        return ["first", "[#3] third"]
+
+    assert AtlasOCR(fake_recognize).recognize_images(crops) == [["alone 1"], ["alone 2"], ["third"]]
+
+
+def test_blank_crops_cost_no_request():
+    crops = make_crops([(50, 20), (40, 20)])
+    crops.insert(1, Image.new("RGB", (60, 20), "white"))
+    calls = []
+
+    def fake_recognize(image):
+        calls.append(image)
+        if image is crops[2]:
+            return ["alone"]
+        # Skips the second marker, so that crop falls back to its own request.
+        return ["[#1] first"]
+
+    assert AtlasOCR(fake_recognize).recognize_images(crops) == [["first"], [], ["alone"]]
+    assert len(calls) == 2
+    assert calls[1] is crops[2]
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from PIL import Image
+
+from screenshot_ocr.app import OCRService
+from screenshot_ocr.backends import (
+    FakeOCRBackend,
+    HybridOCRBackend,
+    LocalOCRBackend,
+    OCRBackend,
+    create_backend,
+    group_boxes_into_lines,
+)
+from screenshot_ocr.config import AppConfig
+from screenshot_ocr.ocr_client import PaddleOCRVL, RemoteOCRBackend
+from screenshot_ocr.stub_server import StubOCRServer
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+def test_paddle_wrapper_selects_backend_by_name():
+    assert isinstance(PaddleOCRVL(vl_rec_backend="vllm-server").backend, RemoteOCRBackend)
+    assert isinstance(PaddleOCRVL().backend, RemoteOCRBackend)
+
+    wrapper = PaddleOCRVL(vl_rec_backend="fake", vl_rec_backend_options={"lines": ["a", "b"]})
+
+    assert wrapper.ocr is None
+    assert list(wrapper.predict_stream(IMAGE_PATH)) == ["a", "b"]
+    assert wrapper.warm_up() is True
+    with pytest.raises(ValueError, match="未知的 OCR 后端"):
+        PaddleOCRVL(vl_rec_backend="nope")
+
+    class Incomplete(OCRBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_ocr_service_runs_against_fake_backend_unchanged():
+    service = OCRService(
+        AppConfig(api_key="sk-test"),
+        server_url="https://example.com",
+        model_name="demo-model",
+        backend="fake",
+    )
+
+    assert service.recognize_file(IMAGE_PATH) == ["fake text"]
+    assert service.pipeline.backend.calls == [(IMAGE_PATH, None)]
+
+
+def test_remote_backend_reports_capabilities_and_warms_connection():
+    with StubOCRServer(content="远程结果") as server:
+        backend = create_backend("siliconflow", server_url=server.base_url, api_key="sk-test")
+
+        assert backend.capabilities.streaming and backend.capabilities.batching
+        assert backend.warm_up() is True
+        assert backend.recognize(IMAGE_PATH) == ["远程结果"]
+
+    mirrored = create_backend("http", endpoints=[{"name": "m", "base_url": "http://m/v1", "model": "x"}])
+    assert not mirrored.capabilities.streaming
+
+
+def test_hybrid_keeps_small_captures_local_and_falls_back(tmp_path):
+    small = tmp_path / "small.png"
+    large = tmp_path / "large.png"
+    blank = tmp_path / "blank.png"
+    Image.new("RGB", (100, 40), "white").save(small)
+    Image.new("RGB", (1000, 800), "white").save(large)
+    Image.new("RGB", (100, 40), "white").save(blank)
+    local = FakeOCRBackend(lines=["local"], responses={str(blank): []})
+    remote = FakeOCRBackend(lines=["remote"])
+    backend = HybridOCRBackend(local, remote, max_local_area=10_000)
+
+    assert backend.recognize(str(small)) == ["local"]
+    assert backend.recognize(str(large)) == ["remote"]
+    assert list(backend.recognize_stream(str(blank))) == ["remote"]
+    assert [path for path, _ in remote.calls] == [str(large), str(blank)]
+
+
+def test_local_backend_groups_engine_boxes_into_lines():
+    def box(left, top, right, bottom):
+        return [[left, top], [right, top], [right, bottom], [left, bottom]]
+
+    def engine(image):
+        result = [
+            [box(120, 12, 200, 30), "world", 0.9],
+            [box(10, 10, 100, 30), "hello", 0.95],
+            [box(10, 50, 90, 70), "second", 0.8],
+            [box(10, 90, 90, 110), "noise", 0.1],
+        ]
+        return result, 0.01
+
+    backend = LocalOCRBackend(engine=engine)
+
+    assert backend.recognize(IMAGE_PATH) == ["hello world", "second"]
+    assert backend.warm_up() is False
+    assert group_boxes_into_lines([]) == []
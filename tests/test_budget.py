@@ -0,0 +1,99 @@
+import os
+
+import pytest
+import requests
+
+from screenshot_ocr.budget import RequestBudgetModel
+from screenshot_ocr.errors import OCRRequestError
+from screenshot_ocr.image_features import ImageFeatures
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.retry import RetryPolicy
+from screenshot_ocr.stub_server import StubOCRServer
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_budget_model_uses_maximums_until_fitted_then_scales_with_ink():
+    model = RequestBudgetModel(max_tokens=15000, read_timeout=60, deadline=60, min_samples=3)
+    small = ImageFeatures(width=200, height=40, ink_density=0.1, line_count=1)
+    page = ImageFeatures(width=2000, height=1500, ink_density=0.1, line_count=60)
+
+    assert model.plan(small) == model.default_budget()
+
+    for features, tokens, latency in [(small, 10, 0.4), (page, 3000, 6.0), (small, 12, 0.5), (page, 2800, 5.5)]:
+        model.record(features, tokens, latency)
+    small_budget = model.plan(small)
+    page_budget = model.plan(page)
+
+    assert model.min_tokens <= small_budget.max_tokens < page_budget.max_tokens <= 15000
+    assert small_budget.read_timeout == model.min_read_timeout
+    assert small_budget.deadline < page_budget.deadline <= 60
+    assert small_budget.timeout == (5.0, small_budget.read_timeout)
+
+
+def test_client_sends_predicted_max_tokens_and_retries_truncated_output():
+    model = RequestBudgetModel(min_samples=0, min_tokens=8, token_headroom=1.0)
+    with StubOCRServer(content="短\n结果") as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, budget_model=model)
+
+        assert client.recognize(IMAGE_PATH) == ["短", "结果"]
+        assert server.last_payload["max_tokens"] == 8
+        assert model.samples == 1
+
+        server.content = "很长的一行识别结果超过了预测"
+        assert client.recognize(IMAGE_PATH) == ["很长的一行识别结果超过了预测"]
+        assert server.last_payload["max_tokens"] == 15000
+
+
+def test_deadline_stops_retries_and_caps_read_timeout(monkeypatch):
+    clock = FakeClock()
+    model = RequestBudgetModel(min_samples=0, connect_timeout=1.0, read_timeout=4.0, deadline=5.0)
+    client = SiliconFlowOCR(
+        api_key="sk-test",
+        retry_policy=RetryPolicy(max_attempts=5, jitter=0.0),
+        budget_model=model,
+        time_module=clock,
+    )
+    timeouts = []
+
+    def stuck_post(*args, timeout, **kwargs):
+        timeouts.append(timeout)
+        clock.now += timeout[1]
+        raise requests.exceptions.Timeout()
+
+    monkeypatch.setattr(client.transport, "post", stuck_post)
+
+    with pytest.raises(OCRRequestError, match="截止时间") as excinfo:
+        client.recognize(IMAGE_PATH)
+
+    assert excinfo.value.timed_out
+    assert timeouts == [(1.0, 4.0), (1.0, 0.5)]
+    assert clock.now < 6.0
+
+
+def test_streams_get_the_full_budget_and_only_complete_answers_are_sampled(monkeypatch):
+    model = RequestBudgetModel(min_samples=0, min_tokens=8, token_headroom=1.0)
+    content = "\n".join(f"第 {index} 行" for index in range(30))
+    with StubOCRServer(content=content, chunk_size=4) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, budget_model=model)
+
+        assert len(list(client.recognize_stream(IMAGE_PATH))) == 30
+        assert server.last_payload["max_tokens"] == 15000
+        assert model.samples == 1
+
+        monkeypatch.setattr("screenshot_ocr.ocr_client.DEFAULT_MAX_TOKENS", 20)
+        assert len(list(client.recognize_stream(IMAGE_PATH))) < 30
+        assert model.samples == 1
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from screenshot_ocr.cassette import (
+    Cassette,
+    CassetteMissError,
+    Interaction,
+    RecordingTransport,
+    ReplayTransport,
+    request_fingerprint,
+)
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.retry import RetryPolicy
+from screenshot_ocr.stub_server import StubOCRServer
+
+BASE_DIR = os.path.dirname(__file__)
+IMAGE_PATHS = [os.path.join(BASE_DIR, name) for name in ("test2.png", "test3.jpg", "tset.png")]
+
+
+class FakeTime:
+    def __init__(self):
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+def test_recorded_requests_replay_offline_without_api_key(tmp_path):
+    path = str(tmp_path / "ocr.json")
+    with StubOCRServer(content="line-1\nline-2") as server:
+        base_url = server.base_url
+        client = SiliconFlowOCR(api_key="sk-secret", base_url=base_url, transport=RecordingTransport(path))
+        recorded = [client.recognize(image_path) for image_path in IMAGE_PATHS]
+        assert list(client.recognize_stream(IMAGE_PATHS[0])) == ["line-1", "line-2"]
+
+    with open(path, encoding="utf-8") as file:
+        assert "sk-secret" not in file.read()
+
+    client = SiliconFlowOCR(api_key="other-key", base_url=base_url, transport=ReplayTransport(path))
+    assert [client.recognize(image_path) for image_path in IMAGE_PATHS] == recorded
+    assert list(client.recognize_stream(IMAGE_PATHS[0])) == ["line-1", "line-2"]
+
+
+def test_replay_serves_recordings_in_order_with_scaled_latency(tmp_path):
+    client = SiliconFlowOCR(api_key="sk-test", base_url="http://recorded.invalid/v1")
+    body = client._build_payload("QUJD")
+    fingerprint = request_fingerprint(client.completions_url, json_payload=body)
+    cassette = Cassette(str(tmp_path / "c.json"))
+    cassette.add(fingerprint, Interaction(client.completions_url, 503, "busy", 0.2))
+    cassette.add(fingerprint, Interaction(client.completions_url, 200, '{"choices": [{"message": {"content": "ok"}}]}', 0.4))
+    cassette.save()
+
+    fake_time = FakeTime()
+    transport = ReplayTransport(Cassette(cassette.path), latency_scale=0.5, time_module=fake_time)
+    client = SiliconFlowOCR(
+        api_key="sk-test",
+        base_url="http://recorded.invalid/v1",
+        transport=transport,
+        retry_policy=RetryPolicy(jitter=0),
+        time_module=fake_time,
+    )
+
+    assert client._parse_response(client._request(body)) == ["ok"]
+    # Replayed latencies surround the retry backoff.
+    assert fake_time.sleeps[0] == pytest.approx(0.1)
+    assert fake_time.sleeps[-1] == pytest.approx(0.2)
+
+    with pytest.raises(CassetteMissError):
+        client._request(client._build_payload("other"))
+
+
+def test_committed_sample_cassette_replays_the_sample_images():
+    path = os.path.join(os.path.dirname(BASE_DIR), "benchmarks", "cassettes", "sample_images.json")
+    client = SiliconFlowOCR(api_key="", base_url="http://replay.invalid/v1", transport=ReplayTransport(path))
+
+    assert [client.recognize(image_path) for image_path in IMAGE_PATHS] == [["第一行", "第二行", "第三行"]] * 3
@@ -0,0 +1,48 @@
+import base64
+import io
+
+from PIL import Image, ImageDraw
+
+from screenshot_ocr.app import OCRService
+from screenshot_ocr.config import AppConfig
+from screenshot_ocr.content import CaptureFilter, analyze_content
+from screenshot_ocr.ocr_client import PaddleOCRVL
+from screenshot_ocr.stub_server import StubOCRServer
+
+
+def padded_capture():
+    image = Image.new("RGB", (800, 600), "white")
+    ImageDraw.Draw(image).text((300, 280), "hello margin", fill="black")
+    return image
+
+
+def test_blank_captures_have_no_box_and_text_is_boxed_tightly():
+    ruled = Image.new("RGB", (400, 300), (240, 240, 240))
+    ImageDraw.Draw(ruled).line((0, 150, 399, 150), fill="black")
+    for blank in (Image.new("RGB", (400, 300), "white"), Image.linear_gradient("L").resize((400, 300)), ruled):
+        assert analyze_content(blank).blank
+
+    analysis = analyze_content(padded_capture(), padding=4)
+    left, top, right, bottom = analysis.box
+    assert 290 <= left < 300 and 270 <= top < 282 and 360 < right < 400 and 288 < bottom < 300
+    assert analysis.trimmed_fraction > 0.9 and analysis.edge_density > 0 and analysis.std > 0
+
+
+def test_service_skips_blank_captures_and_uploads_trimmed_ones():
+    with StubOCRServer(content="hello margin") as server:
+        service = OCRService(
+            AppConfig(api_key="sk-test"),
+            server_url=server.base_url,
+            model_name="demo",
+            backend="vllm-server",
+            pipeline_factory=PaddleOCRVL,
+            capture_filter=CaptureFilter(),
+        )
+        assert service.recognize_file(Image.new("RGB", (640, 480), "white")) == []
+        assert list(service.recognize_file_stream(Image.new("RGB", (640, 480), "white"))) == []
+        assert server.request_count == 0
+
+        assert service.recognize_file(padded_capture()) == ["hello margin"]
+        url = server.last_payload["messages"][0]["content"][0]["image_url"]["url"]
+        with Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1]))) as uploaded:
+            assert uploaded.width < 120 and uploaded.height < 40
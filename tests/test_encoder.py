@@ -0,0 +1,65 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from screenshot_ocr.encoder import ImageEncoder
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.stub_server import StubOCRServer
+
+JPEG_PATH = os.path.join(os.path.dirname(__file__), "test3.jpg")
+
+
+def encode_file(image, format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+def test_compatible_files_pass_through_and_others_are_encoded():
+    encoder = ImageEncoder()
+    rgb_png = encode_file(Image.new("RGB", (64, 32), "white"), "PNG")
+    translucent = encode_file(Image.new("RGBA", (64, 32), (0, 0, 0, 128)), "PNG")
+
+    encoded = encoder.encode(rgb_png)
+    assert encoded.passthrough and encoded.data == rgb_png and encoded.mime_type == "image/png"
+
+    encoded = encoder.encode(JPEG_PATH)
+    with open(JPEG_PATH, "rb") as file:
+        assert encoded.data == file.read()
+    assert encoded.mime_type == "image/jpeg"
+
+    encoded = encoder.encode(translucent)
+    assert not encoded.passthrough and encoded.size == (64, 32)
+    with Image.open(io.BytesIO(encoded.data)) as decoded:
+        assert decoded.mode == "RGB"
+
+
+def test_auto_policy_trades_encode_time_for_bytes_by_bandwidth():
+    size = (1920, 1080)
+    assert ImageEncoder(upload_bytes_per_second=10_000_000).choose(size).name == "png-fast"
+    assert ImageEncoder(upload_bytes_per_second=500_000).choose(size).name == "png"
+    assert ImageEncoder(upload_bytes_per_second=50_000).choose(size).name == "webp-lossless"
+    assert ImageEncoder(upload_bytes_per_second=50_000, candidates=["png-fast", "png"]).choose(size).name == "png"
+    assert ImageEncoder("png").choose(size).name == "png"
+
+    encoded = ImageEncoder("webp-lossless").encode(Image.new("RGB", (64, 32), "white"))
+    assert encoded.mime_type == "image/webp" and encoded.method == "webp-lossless"
+
+    with pytest.raises(ValueError):
+        ImageEncoder("gif")
+
+
+def test_data_url_uses_the_encoded_mime_type():
+    with StubOCRServer(content="jpeg") as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, encoder=ImageEncoder("webp-lossless"))
+        assert client.recognize(JPEG_PATH) == ["jpeg"]
+        url = server.last_payload["messages"][0]["content"][0]["image_url"]["url"]
+        with open(JPEG_PATH, "rb") as file:
+            assert url == "data:image/jpeg;base64," + base64.b64encode(file.read()).decode("ascii")
+
+        client.recognize(Image.new("RGB", (64, 32), "white"))
+        url = server.last_payload["messages"][0]["content"][0]["image_url"]["url"]
+        assert url.startswith("data:image/webp;base64,")
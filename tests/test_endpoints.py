@@ -0,0 +1,107 @@
+import os
+
+from screenshot_ocr.endpoints import Endpoint, EndpointPool
+from screenshot_ocr.ocr_client import MultiEndpointOCR, PaddleOCRVL
+from screenshot_ocr.stub_server import StubOCRServer
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_pool_prefers_lower_latency_and_penalises_errors():
+    pool = EndpointPool([
+        {"name": "a", "base_url": "http://a/v1", "model": "m"},
+        {"name": "b", "base_url": "http://b/v1", "model": "m"},
+    ])
+    pool.record_success(pool.endpoints[0], 1.0)
+    pool.record_success(pool.endpoints[1], 0.5)
+
+    assert [endpoint.name for endpoint in pool.ranked()] == ["b", "a"]
+
+    pool.record_failure(pool.endpoints[1])
+    assert [endpoint.name for endpoint in pool.ranked()] == ["a", "b"]
+
+
+def test_pool_ranks_always_failing_mirror_below_measured_ones():
+    pool = EndpointPool(
+        [
+            {"name": "broken", "base_url": "http://broken/v1"},
+            {"name": "slow", "base_url": "http://slow/v1"},
+            {"name": "fast", "base_url": "http://fast/v1"},
+        ],
+        failures_to_eject=100,
+    )
+    pool.record_success(pool.endpoints[1], 2.0)
+    pool.record_success(pool.endpoints[2], 0.5)
+    pool.record_failure(pool.endpoints[0])
+
+    assert [endpoint.name for endpoint in pool.ranked()] == ["fast", "slow", "broken"]
+    assert pool.score(pool.endpoints[0]) > pool.score(pool.endpoints[1])
+
+
+def test_pool_ejects_failing_endpoint_until_cooldown_passes():
+    clock = FakeClock()
+    pool = EndpointPool(
+        [Endpoint("http://a/v1", "m", name="a"), Endpoint("http://b/v1", "m", name="b")],
+        failures_to_eject=2,
+        eject_seconds=10,
+        time_module=clock,
+    )
+    pool.record_failure(pool.endpoints[0])
+    pool.record_failure(pool.endpoints[0])
+
+    assert not pool.is_healthy(pool.endpoints[0])
+    assert pool.ranked()[0].name == "b"
+
+    clock.now = 10.0
+    assert pool.is_healthy(pool.endpoints[0])
+
+
+def test_multi_endpoint_client_fails_over_to_working_mirror():
+    with StubOCRServer(content="from mirror") as server:
+        client = MultiEndpointOCR(
+            [
+                {"name": "down", "base_url": "http://127.0.0.1:1/v1", "model": "m-down"},
+                {"name": "mirror", "base_url": server.base_url, "model": "m-mirror", "api_key": "sk-m"},
+            ],
+            time_module=FakeClock(),
+        )
+
+        assert client.recognize(IMAGE_PATH) == ["from mirror"]
+        assert server.last_payload["model"] == "m-mirror"
+        assert client.pool.stats["down"].consecutive_failures == 1
+
+
+def test_paddle_wrapper_builds_multi_endpoint_client_with_primary_first():
+    wrapper = PaddleOCRVL(
+        vl_rec_server_url="https://primary/v1",
+        vl_rec_api_model_name="primary-model",
+        vl_rec_api_key="sk-primary",
+        vl_rec_endpoints=[{"name": "mirror", "base_url": "http://mirror/v1", "model": "m"}],
+    )
+
+    assert isinstance(wrapper.ocr, MultiEndpointOCR)
+    assert [endpoint.name for endpoint in wrapper.ocr.pool.endpoints] == ["primary", "mirror"]
+
+
+def test_routed_model_only_replaces_endpoints_without_their_own_model():
+    with StubOCRServer(content="ok") as server:
+        shared = MultiEndpointOCR([{"base_url": server.base_url}], model="default-model")
+        shared.recognize(IMAGE_PATH)
+        assert server.last_payload["model"] == "default-model"
+        shared.recognize(IMAGE_PATH, model="routed")
+        assert server.last_payload["model"] == "routed"
+
+        own = MultiEndpointOCR([{"base_url": server.base_url, "model": "m-own"}], model="default-model")
+        own.recognize(IMAGE_PATH, model="routed")
+        assert server.last_payload["model"] == "m-own"
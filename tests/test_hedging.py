@@ -0,0 +1,102 @@
+import threading
+import time
+
+from screenshot_ocr.hedging import HedgeBudget, HedgePolicy, RequestHedger
+from screenshot_ocr.latency import LatencyTracker
+
+
+def make_hedger(max_workers=4, **policy_kwargs):
+    policy = HedgePolicy(min_samples=3, min_delay=0.05, **policy_kwargs)
+    hedger = RequestHedger(policy, max_workers=max_workers)
+    for _ in range(3):
+        hedger.tracker.record(0.05)
+    return hedger
+
+
+def test_latency_tracker_reports_nearest_rank_percentile():
+    tracker = LatencyTracker(window=10)
+    for value in range(1, 11):
+        tracker.record(value)
+
+    assert tracker.percentile(0.5) == 5
+    assert tracker.percentile(0.95) == 10
+    assert LatencyTracker().percentile(0.9) is None
+
+
+def test_hedger_does_not_hedge_without_enough_samples():
+    hedger = RequestHedger(HedgePolicy(min_samples=5))
+
+    assert hedger.hedge_delay() is None
+    assert hedger.run(lambda cancelled: "ok") == "ok"
+    assert hedger.hedge_count == 0
+
+
+def test_hedge_wins_when_primary_is_slow_and_loser_is_cancelled():
+    hedger = make_hedger()
+    calls = []
+    primary_cancelled = threading.Event()
+
+    def send(cancelled):
+        calls.append(cancelled)
+        if len(calls) == 1:
+            cancelled.wait(1.0)
+            primary_cancelled.set()
+            return "slow"
+        return "fast"
+
+    started_at = time.perf_counter()
+    assert hedger.run(send) == "fast"
+
+    assert time.perf_counter() - started_at < 0.5
+    assert primary_cancelled.wait(1.0)
+    assert hedger.hedge_count == 1
+    assert hedger.hedge_wins == 1
+    hedger.close()
+
+
+def test_losing_racer_closes_its_connection_mid_download():
+    hedger = make_hedger(max_workers=1)
+    closed = threading.Event()
+    calls = []
+
+    def send(cancelled):
+        calls.append(cancelled)
+        if len(calls) == 1:
+            # Stands in for a body download that only ends when the socket closes.
+            cancelled.on_cancel(closed.set)
+            if not closed.wait(1.0):
+                return "slow"
+            raise ConnectionError("connection closed")
+        return "fast"
+
+    assert hedger.run(send) == "fast"
+
+    assert closed.wait(1.0)
+    assert hedger.hedge_wins == 1
+    hedger.close()
+
+
+def test_hedge_budget_caps_extra_requests():
+    budget = HedgeBudget(ratio=0.5, burst=1.0)
+
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+
+
+def test_hedger_falls_back_to_other_racer_when_one_fails():
+    hedger = make_hedger()
+    calls = []
+
+    def send(cancelled):
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.1)
+            raise RuntimeError("primary failed")
+        time.sleep(0.2)
+        return "hedge"
+
+    assert hedger.run(send) == "hedge"
+    hedger.close()
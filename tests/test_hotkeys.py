@@ -66,3 +66,21 @@ def test_hotkey_listener_triggers_after_long_press():
     listener.on_key_release(None)
 
     assert triggered == [True]
+
+
+def test_hotkey_listener_calls_on_press_before_long_press_completes():
+    events = []
+    listener = HotkeyListener(
+        hotkey="f9",
+        mode="long_press",
+        long_press_time=1.0,
+        on_trigger=lambda: events.append("trigger"),
+        on_press=lambda: events.append("press"),
+        keyboard_module=FakeKeyboard(),
+        time_module=FakeTime([10.0, 11.5]),
+    )
+
+    listener.on_key_press(None)
+    assert events == ["press"]
+    listener.on_key_release(None)
+    assert events == ["press", "trigger"]
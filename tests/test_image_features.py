@@ -0,0 +1,36 @@
+from PIL import Image, ImageDraw
+
+from screenshot_ocr.image_features import compute_image_features, find_runs
+
+import numpy as np
+
+
+def draw_lines(line_count, size=(400, 200)):
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for index in range(line_count):
+        top = 20 + index * 30
+        draw.rectangle((20, top, 300, top + 10), fill="black")
+    return image
+
+
+def test_find_runs_bridges_small_gaps():
+    profile = np.array([0, 1, 1, 0, 1, 0, 0, 0, 1], dtype=bool)
+
+    assert find_runs(profile, min_gap=1) == [(1, 3), (4, 5), (8, 9)]
+    assert find_runs(profile, min_gap=2) == [(1, 5), (8, 9)]
+
+
+def test_compute_image_features_counts_lines_and_ink():
+    features = compute_image_features(draw_lines(3))
+
+    assert features.area == 400 * 200
+    assert features.line_count == 3
+    assert 0.05 < features.ink_density < 0.2
+
+
+def test_blank_image_has_no_ink_or_lines():
+    features = compute_image_features(Image.new("RGB", (100, 50), "white"))
+
+    assert features.ink_density == 0.0
+    assert features.line_count == 0
@@ -0,0 +1,69 @@
+import base64
+import io
+import json
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from screenshot_ocr.app import OCRService
+from screenshot_ocr.config import AppConfig
+from screenshot_ocr.image_io import image_size
+from screenshot_ocr.ocr_client import PaddleOCRVL, SiliconFlowOCR
+from screenshot_ocr.singleflight import image_content_key
+from screenshot_ocr.spool import JobSpool
+from screenshot_ocr.stub_server import StubOCRServer
+
+
+def make_capture():
+    image = Image.new("RGB", (120, 40), "white")
+    ImageDraw.Draw(image).text((4, 12), "in memory", fill="black")
+    return image
+
+
+def uploaded_image(payload):
+    url = payload["messages"][0]["content"][0]["image_url"]["url"]
+    return Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1])))
+
+
+def test_client_accepts_pil_images_arrays_and_encoded_bytes():
+    image = make_capture()
+    encoded = io.BytesIO()
+    image.save(encoded, format="PNG")
+    sources = [image, np.asarray(image), encoded.getvalue()]
+
+    with StubOCRServer(content="in memory") as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+        for source in sources:
+            assert client.recognize(source) == ["in memory"]
+            assert uploaded_image(server.last_payload).tobytes() == image.tobytes()
+            assert image_size(source) == (120, 40)
+
+    assert image_content_key(image, "m") == image_content_key(make_capture(), "m")
+    assert image_content_key(image, "m") != image_content_key(image, "other")
+
+
+def test_service_and_spool_take_captures_without_temp_files(tmp_path):
+    image = make_capture()
+    with StubOCRServer(content="第一行\n第二行") as server:
+        service = OCRService(
+            AppConfig(api_key="sk-test"),
+            server_url=server.base_url,
+            model_name="demo",
+            backend="vllm-server",
+            pipeline_factory=PaddleOCRVL,
+        )
+        assert service.recognize_file(image) == ["第一行", "第二行"]
+        assert list(service.recognize_file_stream(image)) == ["第一行", "第二行"]
+
+    spool = JobSpool(str(tmp_path / "spool"))
+    job = spool.enqueue(image)
+    with Image.open(job.image_path) as stored:
+        assert stored.format == "PNG" and stored.tobytes() == image.tobytes()
+    assert json.loads(open(spool.journal_path, encoding="utf-8").readline())[0] == "add"
+
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="JPEG")
+    jpeg_job = spool.enqueue(buffer.getvalue())
+    assert jpeg_job.image_path.endswith(".jpeg")
+    with Image.open(jpeg_job.image_path) as stored:
+        assert stored.format == "JPEG"
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from screenshot_ocr.loadgen import classify_error, make_image_variants, run_load
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.retry import RetryPolicy
+from screenshot_ocr.stub_server import CANNED_OUTPUTS, LatencyDistribution, StubOCRServer
+
+
+def test_latency_distribution_parsing_and_sampling():
+    assert LatencyDistribution.parse("0.25") == LatencyDistribution("fixed", 0.25)
+    lognormal = LatencyDistribution.parse("lognormal:0.8:0.5")
+    samples = sorted(lognormal.sample(random.Random(3)) for _ in range(2001))
+    assert samples[1000] == pytest.approx(0.8, rel=0.1)
+    assert all(0.2 <= LatencyDistribution.parse("uniform:0.2:0.4").sample(random.Random(seed)) <= 0.4 for seed in range(20))
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("gamma:1")
+
+
+def test_stub_injects_faults_with_retry_after(tmp_path):
+    [image_path] = make_image_variants([], 1, str(tmp_path))
+    with StubOCRServer(faults={429: 1.0}, retry_after=2) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, retry_policy=RetryPolicy(max_attempts=1))
+        with pytest.raises(Exception) as excinfo:
+            client.recognize(image_path)
+
+    assert classify_error(excinfo.value) == "http_429"
+    assert excinfo.value.retry_after == 2
+    assert server.fault_counts == {429: 1}
+
+
+def test_run_load_reports_throughput_latency_and_errors(tmp_path):
+    images = make_image_variants([], 4, str(tmp_path))
+    assert len(set(images)) == 4
+    with StubOCRServer(content=CANNED_OUTPUTS["receipt"], faults={503: 0.25}, seed=7) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, retry_policy=RetryPolicy(max_attempts=1))
+        report = run_load(client.recognize, images, rps=40, duration=0.5, concurrency=4)
+
+    assert report.sent == 20
+    assert report.succeeded + report.failed == 20
+    assert set(report.errors) <= {"http_503"}
+    assert report.failed == server.fault_counts.get(503, 0)
+    assert report.latencies.percentile(0.99) is not None
+    assert "p95=" in report.format()
+
+
+def test_canned_loop_output_is_cut_short_when_streaming(tmp_path):
+    [image_path] = make_image_variants([], 1, str(tmp_path))
+    with StubOCRServer(content=CANNED_OUTPUTS["loop"]) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+        lines = list(client.recognize_stream(image_path))
+
+    assert lines == ["标题", "重复的一行", "第二行内容"]
@@ -0,0 +1,57 @@
+import asyncio
+import os
+
+from PIL import Image
+
+from screenshot_ocr.ocr_client import AsyncSiliconFlowOCR
+from screenshot_ocr.stub_server import StubOCRServer
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+def test_async_recognize_parses_stub_response():
+    async def run():
+        async with AsyncSiliconFlowOCR(api_key="sk-test", base_url=server.base_url) as client:
+            return await client.recognize(IMAGE_PATH)
+
+    with StubOCRServer(content="A\nA\nB") as server:
+        assert asyncio.run(run()) == ["A", "B"]
+        assert server.last_payload["model"] == "PaddlePaddle/PaddleOCR-VL"
+
+
+def test_async_recognize_many_bounds_concurrency_and_keeps_order(tmp_path):
+    image_paths = []
+    for index in range(6):
+        image_path = tmp_path / f"image-{index}.png"
+        Image.new("RGB", (8, 8), (index, index, index)).save(image_path)
+        image_paths.append(str(image_path))
+
+    async def run():
+        async with AsyncSiliconFlowOCR(
+            api_key="sk-test",
+            base_url=server.base_url,
+            max_concurrency=2,
+        ) as client:
+            return await client.recognize_many(image_paths)
+
+    with StubOCRServer(content="line", latency=0.05) as server:
+        results = asyncio.run(run())
+
+        assert results == [["line"]] * 6
+        assert server.request_count == 6
+        assert server.max_in_flight <= 2
+
+
+def test_async_recognize_many_can_return_exceptions():
+    async def run():
+        async with AsyncSiliconFlowOCR(api_key="sk-test", base_url=server.base_url) as client:
+            return await client.recognize_many(
+                [IMAGE_PATH, "missing.png"],
+                return_exceptions=True,
+            )
+
+    with StubOCRServer(content="ok") as server:
+        results = asyncio.run(run())
+
+    assert results[0] == ["ok"]
+    assert isinstance(results[1], Exception)
@@ -0,0 +1,53 @@
+import os
+
+from screenshot_ocr.ocr_client import SiliconFlowOCR, split_batch_content
+from screenshot_ocr.stub_server import StubOCRServer
+
+BASE_DIR = os.path.dirname(__file__)
+IMAGES = [os.path.join(BASE_DIR, name) for name in ("test2.png", "test3.jpg", "tset.png")]
+
+
+def test_split_batch_content_requires_every_marker():
+    content = "=== IMAGE 1 ===\nfoo\n=== image 2 ===\n\n=== IMAGE 3 ===\nbar\nbaz"
+
+    assert split_batch_content(content, 3) == ["foo", "", "bar\nbaz"]
+    assert split_batch_content("=== IMAGE 1 ===\nfoo", 2) is None
+    assert split_batch_content("no markers at all", 1) is None
+
+
+def test_recognize_batch_sends_one_request_with_all_images():
+    content = "=== IMAGE 1 ===\nfirst\n=== IMAGE 2 ===\nsecond\n=== IMAGE 3 ===\nthird"
+    with StubOCRServer(content=content) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+
+        results = client.recognize_batch(IMAGES)
+
+        assert results == [["first"], ["second"], ["third"]]
+        assert server.request_count == 1
+        parts = server.last_payload["messages"][0]["content"]
+        assert sum(part["type"] == "image_url" for part in parts) == 3
+
+
+def test_recognize_batch_falls_back_to_single_requests():
+    with StubOCRServer(content="plain text") as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+
+        results = client.recognize_batch(IMAGES[:2])
+
+        assert results == [["plain text"], ["plain text"]]
+        assert server.request_count == 3
+
+
+def test_malformed_batch_response_falls_back_to_single_requests(monkeypatch):
+    client = SiliconFlowOCR(api_key="sk-test")
+    payloads = iter([{"choices": []}, *({"choices": [{"message": {"content": f"image {n}"}}]} for n in (1, 2))])
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return next(payloads)
+
+    monkeypatch.setattr(client.transport, "post", lambda *args, **kwargs: Response())
+
+    assert client.recognize_batch(IMAGES[:2]) == [["image 1"], ["image 2"]]
@@ -6,17 +6,29 @@ from screenshot_ocr.ocr_client import SiliconFlowOCR
 
 
 class FakeResponse:
-    def __init__(self, status_code=200, payload=None, text=""):
+    def __init__(self, status_code=200, payload=None, text="", headers=None):
         self.status_code = status_code
         self._payload = payload or {}
         self.text = text
+        self.headers = headers or {}
 
     def json(self):
         return self._payload
 
 
+class FakeTime:
+    def __init__(self):
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+    def monotonic(self):
+        return 0.0
+
+
 def test_request_retries_after_timeout(monkeypatch):
-    client = SiliconFlowOCR(api_key="sk-test")
+    client = SiliconFlowOCR(api_key="sk-test", time_module=FakeTime())
     calls = {"count": 0}
 
     def fake_post(*args, **kwargs):
@@ -25,7 +37,7 @@ def test_request_retries_after_timeout(monkeypatch):
             raise requests.exceptions.Timeout()
         return FakeResponse(payload={"choices": [{"message": {"content": "line-1"}}]})
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(client.transport, "post", fake_post)
 
     result = client._request({"demo": True})
 
@@ -49,9 +61,9 @@ def test_parse_response_deduplicates_lines():
 
 
 def test_request_raises_on_non_200(monkeypatch):
-    client = SiliconFlowOCR(api_key="sk-test")
+    client = SiliconFlowOCR(api_key="sk-test", time_module=FakeTime())
     monkeypatch.setattr(
-        requests,
+        client.transport,
         "post",
         lambda *args, **kwargs: FakeResponse(status_code=500, text="server error"),
     )
@@ -0,0 +1,47 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from screenshot_ocr.encoder import ImageEncoder
+from screenshot_ocr.preprocess import PreprocessOptions, estimate_x_height, otsu_threshold, preprocess_image
+
+
+def make_text_capture(x_height):
+    """Dark bands shaped like text lines: a full x-height band under a thin ascender."""
+    image = Image.new("RGB", (400, 12 * x_height), (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    for top in range(x_height, 10 * x_height, 3 * x_height):
+        draw.rectangle((20, top - x_height // 2, 30, top - 1), fill=(20, 20, 20))
+        draw.rectangle((20, top, 380, top + x_height - 1), fill=(20, 20, 20))
+    return image
+
+
+def test_x_height_is_measured_and_captures_scale_down_to_target():
+    image = make_text_capture(24)
+    assert estimate_x_height(np.asarray(image.convert("L"))) == 24
+
+    small = preprocess_image(image, PreprocessOptions(target_x_height=12, grayscale=True))
+    assert small.mode == "L" and small.size == (200, 144)
+    assert preprocess_image(make_text_capture(8), PreprocessOptions(target_x_height=12)).size == (400, 96)
+    assert preprocess_image(image, PreprocessOptions(target_x_height=1, min_scale=0.5)).size == (200, 144)
+    assert preprocess_image(image, PreprocessOptions()) is image
+
+
+def test_binarise_and_quantise_cut_encoded_bytes():
+    pixels = np.full((60, 200), 235, dtype=np.uint8)
+    pixels[20:40, 10:190] = np.linspace(30, 60, 180, dtype=np.uint8)
+    assert 60 <= otsu_threshold(pixels) < 235
+
+    image = Image.fromarray(np.dstack([pixels] * 3))
+    ImageDraw.Draw(image).text((12, 45), "noise", fill=(200, 30, 30), font=ImageFont.load_default())
+    binary = preprocess_image(image, PreprocessOptions(levels=2))
+    assert binary.mode == "1"
+    palette = preprocess_image(image, PreprocessOptions(levels=4))
+    assert palette.mode == "P" and len(np.unique(np.asarray(palette))) <= 4
+
+    full = ImageEncoder("png", passthrough=False).encode(image)
+    reduced = ImageEncoder("png", preprocess=PreprocessOptions(levels=2)).encode(image)
+    assert len(reduced.data) * 3 < len(full.data)
+    with Image.open(io.BytesIO(reduced.data)) as decoded:
+        assert decoded.mode == "1" and decoded.size == image.size
@@ -0,0 +1,52 @@
+import os
+import time
+
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.prewarm import ConnectionWarmer, HeartbeatPolicy
+from screenshot_ocr.stub_server import StubOCRServer
+from screenshot_ocr.transport import HTTPTransport
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+def test_prewarmed_connection_is_reused_by_the_first_request():
+    with StubOCRServer(content="hello", handshake_delay=0.05) as server, HTTPTransport() as transport:
+        warmer = ConnectionWarmer(transport, server.base_url)
+        assert warmer.trigger()
+        warmer.wait(5)
+        assert server.connection_count == 1
+        assert server.request_count == 0
+
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, transport=transport)
+        assert client.recognize(IMAGE_PATH) == ["hello"]
+        assert server.connection_count == 1
+        # The pool is fresh now, so another trigger does nothing.
+        assert not warmer.trigger()
+
+
+def test_probe_sends_keep_alive_request_without_counting_as_ocr():
+    with StubOCRServer() as server, HTTPTransport() as transport:
+        warmer = ConnectionWarmer(transport, server.base_url, probe=True, headers={"Authorization": "Bearer x"})
+        assert warmer.warm()
+        assert (server.probe_count, server.request_count) == (1, 0)
+        assert transport.last_used == 0.0
+
+
+def test_heartbeat_pings_only_after_recent_use():
+    with StubOCRServer() as server, HTTPTransport() as transport:
+        warmer = ConnectionWarmer(transport, server.base_url, heartbeat=HeartbeatPolicy(interval=0.05, max_idle=5))
+        warmer.start_heartbeat()
+        try:
+            time.sleep(0.2)
+            assert server.probe_count == 0
+
+            client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, transport=transport)
+            client._request(client._build_payload(""))
+            deadline = time.monotonic() + 2
+            while server.probe_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            warmer.stop()
+
+        assert server.probe_count >= 2
+        assert server.connection_count == 1
@@ -0,0 +1,64 @@
+import os
+
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.repetition import RepetitionGuard, find_periodic_tail
+from screenshot_ocr.stub_server import StubOCRServer
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+def push_all(guard, lines):
+    emitted = []
+    for line in lines:
+        released, looping = guard.push_line(line)
+        emitted.extend(released)
+        if looping:
+            return emitted, True
+    return emitted + guard.flush(), False
+
+
+def test_guard_stops_multi_line_loop_after_one_clean_copy():
+    lines = ["title"] + ["| 名称 | 数量 |", "| 苹果 | 3 |"] * 40
+
+    emitted, looping = push_all(RepetitionGuard(), lines)
+
+    assert looping
+    assert emitted == ["title", "| 名称 | 数量 |", "| 苹果 | 3 |"]
+
+
+def test_guard_releases_held_lines_when_cycle_breaks():
+    lines = ["x", "y", "x", "z"]
+
+    assert push_all(RepetitionGuard(), lines) == (lines, False)
+
+
+def test_find_periodic_tail_keeps_one_unit():
+    text = "结果: " + "重复" * 60
+
+    assert text[:find_periodic_tail(text)] == "结果: 重复"
+    assert find_periodic_tail("正常的一行文字，没有重复") is None
+
+
+def test_repeated_cells_and_dot_leaders_are_not_loops():
+    table = ["Status", "N/A", "N/A", "N/A", "N/A", "Total 5"]
+    assert push_all(RepetitionGuard(), table) == (table, False)
+
+    contents = "Chapter 1 Introduction " + "." * 50 + " 1"
+    assert find_periodic_tail(contents) is None
+    assert find_periodic_tail("-" * 120) is None and find_periodic_tail("· " * 80) is None
+    assert RepetitionGuard().check_partial("Chapter 2 " + "=" * 200) is None
+
+
+def test_recognize_stream_aborts_runaway_generation():
+    looping = "header\n" + "row 1\nrow 2\n" * 200
+    with StubOCRServer(content=looping, chunk_size=6) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+
+        assert list(client.recognize_stream(IMAGE_PATH)) == ["header", "row 1", "row 2"]
+
+
+def test_recognize_stream_trims_inline_character_loop():
+    with StubOCRServer(content="第一行\n尾部" + "的" * 500, chunk_size=10) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+
+        assert list(client.recognize_stream(IMAGE_PATH)) == ["第一行", "尾部的"]
@@ -0,0 +1,47 @@
+import base64
+import json
+import os
+
+import pytest
+
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.request_body import StreamingJSONBody, image_placeholder
+from screenshot_ocr.stub_server import StubOCRServer
+
+BASE_DIR = os.path.dirname(__file__)
+IMAGE_PATH = os.path.join(BASE_DIR, "test2.png")
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 10, 1000])
+def test_streamed_body_matches_json_serialisation(size):
+    data = bytes(range(256)) * 4
+    data = data[:size]
+    payload = {"model": "m", "text": "识别", "url": f"data:image/png;base64,{image_placeholder(0)}"}
+    body = StreamingJSONBody(payload, [data], chunk_size=7)
+
+    raw = body.to_bytes()
+    assert len(body) == len(raw)
+    assert json.loads(raw) == {
+        "model": "m",
+        "text": "识别",
+        "url": "data:image/png;base64," + base64.b64encode(data).decode("ascii"),
+    }
+    assert body.to_bytes() == raw
+
+
+def test_streamed_body_supports_several_images_and_rejects_missing_marker():
+    payload = {"images": [image_placeholder(0), image_placeholder(1)]}
+    body = StreamingJSONBody(payload, [b"ab", b"xyz"])
+    assert json.loads(body.to_bytes()) == {"images": ["YWI=", "eHl6"]}
+
+    with pytest.raises(ValueError):
+        StreamingJSONBody({"images": []}, [b"ab"])
+
+
+def test_client_sends_streamed_body_with_content_length():
+    with StubOCRServer(content="hello") as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+        assert client.recognize(IMAGE_PATH) == ["hello"]
+        url = server.last_payload["messages"][0]["content"][0]["image_url"]["url"]
+
+    assert url == "data:image/png;base64," + client._encode_image(IMAGE_PATH)
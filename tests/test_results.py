@@ -0,0 +1,48 @@
+import os
+
+from screenshot_ocr.backends import LocalOCRBackend
+from screenshot_ocr.ocr_client import PaddleOCRVL, extract_text_from_prediction
+from screenshot_ocr.results import OCRResult, TextLine
+from screenshot_ocr.stub_server import StubOCRServer
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+def test_result_reads_like_legacy_prediction_dict():
+    result = OCRResult.from_texts(["第一行", "", "第二行"])
+
+    assert list(result) == ["parsing_res_list"]
+    assert [item.content for item in result.get("parsing_res_list", [])] == ["第一行", "", "第二行"]
+    assert result.get("missing") is None
+    assert extract_text_from_prediction([result, {"parsing_res_list": [TextLine("旧格式")]}]) == [
+        "第一行",
+        "第二行",
+        "旧格式",
+    ]
+    assert not hasattr(result.lines[0], "__dict__")
+
+
+def test_predict_keeps_timings_usage_and_raw_response():
+    with StubOCRServer(content="你好\n世界") as server:
+        wrapper = PaddleOCRVL(vl_rec_server_url=server.base_url, vl_rec_api_key="sk-test")
+        (result,) = wrapper.predict(IMAGE_PATH)
+
+    assert result.texts == ["你好", "世界"]
+    assert result.backend == "vllm-server"
+    assert result.usage is not None and result.usage["total_tokens"] > 0
+    assert result.raw["choices"][0]["message"]["content"] == "你好\n世界"
+    assert set(result.timings) == {"encode", "request", "parse", "total"}
+    assert result.timings["total"] >= result.timings["request"] > 0
+
+
+def test_local_backend_result_carries_line_geometry():
+    def engine(image):
+        return [
+            [[[10, 10], [100, 10], [100, 30], [10, 30]], "hello", 0.95],
+            [[[120, 12], [200, 12], [200, 32], [120, 32]], "world", 0.9],
+        ], 0.01
+
+    result = LocalOCRBackend(engine=engine).recognize_result(IMAGE_PATH)
+
+    assert result.lines == [TextLine("hello world", box=(10, 10, 200, 32), score=0.9)]
+    assert result.raw[0][1] == "hello"
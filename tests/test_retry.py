@@ -0,0 +1,147 @@
+import pytest
+
+from screenshot_ocr.errors import CircuitOpenError, OCRRequestError
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, text="", headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+
+OK_PAYLOAD = {"choices": [{"message": {"content": "ok"}}]}
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:10 GMT", now=4.0) == 6.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_compute_delay_backs_off_exponentially_and_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0.0)
+
+    assert [policy.compute_delay(attempt) for attempt in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+    assert policy.compute_delay(1, retry_after=3.0) == 3.0
+
+
+def test_policy_only_retries_transient_statuses():
+    policy = RetryPolicy()
+
+    assert policy.should_retry(OCRRequestError("busy", status_code=429), attempt=1)
+    assert policy.should_retry(OCRRequestError("reset", retryable=True), attempt=1)
+    assert not policy.should_retry(OCRRequestError("bad key", status_code=401), attempt=1)
+    assert not policy.should_retry(OCRRequestError("busy", status_code=503), attempt=3)
+
+
+def test_circuit_breaker_opens_then_half_opens_after_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, time_module=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10.0
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_waits_for_retry_after_on_429(monkeypatch):
+    clock = FakeClock()
+    client = SiliconFlowOCR(api_key="sk-test", time_module=clock)
+    responses = iter([
+        FakeResponse(status_code=429, text="rate limited", headers={"Retry-After": "2"}),
+        FakeResponse(payload=OK_PAYLOAD),
+    ])
+    monkeypatch.setattr(client.transport, "post", lambda *args, **kwargs: next(responses))
+
+    assert client._request({}) == OK_PAYLOAD
+    assert clock.sleeps[0] >= 2.0
+
+
+def test_client_does_not_retry_client_errors(monkeypatch):
+    client = SiliconFlowOCR(api_key="sk-test", time_module=FakeClock())
+    calls = []
+
+    def fake_post(*args, **kwargs):
+        calls.append(1)
+        return FakeResponse(status_code=400, text="bad request")
+
+    monkeypatch.setattr(client.transport, "post", fake_post)
+
+    with pytest.raises(OCRRequestError, match="状态码 400"):
+        client._request({})
+    assert len(calls) == 1
+    assert client.circuit_breaker.failure_count == 0
+
+
+def test_open_circuit_fails_fast_without_network(monkeypatch):
+    clock = FakeClock()
+    client = SiliconFlowOCR(
+        api_key="sk-test",
+        retry_policy=RetryPolicy(max_attempts=2),
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60, time_module=clock),
+        time_module=clock,
+    )
+    calls = []
+
+    def fake_post(*args, **kwargs):
+        calls.append(1)
+        return FakeResponse(status_code=503, text="down")
+
+    monkeypatch.setattr(client.transport, "post", fake_post)
+
+    with pytest.raises(OCRRequestError):
+        client._request({})
+    with pytest.raises(CircuitOpenError):
+        client._request({})
+    assert len(calls) == 2
+
+
+def test_half_open_probe_answered_with_400_closes_the_breaker(monkeypatch):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, time_module=clock)
+    client = SiliconFlowOCR(api_key="sk-test", circuit_breaker=breaker, time_module=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    responses = iter([FakeResponse(status_code=400, text="bad request"), FakeResponse(payload=OK_PAYLOAD)])
+    monkeypatch.setattr(client.transport, "post", lambda *args, **kwargs: next(responses))
+
+    with pytest.raises(OCRRequestError, match="状态码 400"):
+        client._request({})
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert client._request({}) == OK_PAYLOAD
+
+    breaker.record_failure()
+    clock.now = 20.0
+    broken = FakeResponse()
+    broken.json = lambda: (_ for _ in ()).throw(ValueError("not json"))
+    monkeypatch.setattr(client.transport, "post", lambda *args, **kwargs: broken)
+    with pytest.raises(ValueError):
+        client._request({})
+    assert breaker.state == CircuitBreaker.OPEN and not breaker._probe_in_flight
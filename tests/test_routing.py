@@ -0,0 +1,51 @@
+from screenshot_ocr.image_features import ImageFeatures
+from screenshot_ocr.routing import ModelRouter
+
+SNIPPET = ImageFeatures(width=200, height=30, ink_density=0.1, line_count=1)
+PAGE = ImageFeatures(width=1600, height=1200, ink_density=0.1, line_count=40)
+
+
+def make_router(min_samples=3):
+    return ModelRouter(
+        [
+            {"model": "lite", "max_area": 100_000, "max_lines": 3},
+            {"model": "full"},
+        ],
+        default_model="full",
+        min_samples=min_samples,
+    )
+
+
+def test_router_sends_large_pages_to_full_model():
+    assert make_router().choose(PAGE) == "full"
+
+
+def test_router_learns_faster_model_for_small_captures():
+    router = make_router(min_samples=1)
+    router.record("full", 12.0, PAGE)
+    router.record("lite", 0.4, SNIPPET)
+
+    assert router.choose(SNIPPET) == "lite"
+
+
+def test_router_explores_routes_in_order_before_comparing_latency():
+    router = make_router()
+    assert router.choose(SNIPPET) == "lite"
+
+    for _ in range(3):
+        router.record("lite", 2.0, SNIPPET)
+    assert router.choose(SNIPPET) == "full"
+
+    for _ in range(3):
+        router.record("full", 0.5, SNIPPET)
+    assert router.choose(SNIPPET) == "full"
+
+
+def test_online_linear_fit_recovers_line_cost():
+    from screenshot_ocr.latency import OnlineLinearFit
+
+    fit = OnlineLinearFit(decay=1.0)
+    for lines in (1, 5, 10):
+        fit.update(lines, 0.5 + 0.1 * lines)
+
+    assert abs(fit.predict(20) - 2.5) < 1e-6
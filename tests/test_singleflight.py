@@ -0,0 +1,86 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+
+from PIL import Image
+
+from screenshot_ocr.ocr_client import AsyncSiliconFlowOCR, SiliconFlowOCR
+from screenshot_ocr.singleflight import SingleFlight, image_content_key
+from screenshot_ocr.stub_server import StubOCRServer
+
+BASE_DIR = os.path.dirname(__file__)
+IMAGE_PATH = os.path.join(BASE_DIR, "test2.png")
+
+
+def test_image_content_key_depends_on_bytes_and_extra_values(tmp_path):
+    copy_path = tmp_path / "copy.png"
+    with open(IMAGE_PATH, "rb") as file:
+        copy_path.write_bytes(file.read())
+
+    assert image_content_key(IMAGE_PATH, "m") == image_content_key(str(copy_path), "m")
+    assert image_content_key(IMAGE_PATH, "m") != image_content_key(IMAGE_PATH, "other")
+
+    # Pixels are hashed in bands; the key must still cover every row exactly once.
+    for mode in ("RGB", "1"):
+        image = Image.effect_noise((1500, 1200), 64).convert(mode)
+        expected = hashlib.sha256(f"{mode}:1500x1200\0".encode("ascii") + image.tobytes() + b"\0m")
+        assert image_content_key(image, "m") == expected.hexdigest()
+
+
+def test_single_flight_shares_exceptions_and_forgets_finished_calls():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(1.0)
+        raise RuntimeError("boom")
+
+    def caller():
+        try:
+            flight.do("key", failing)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 2
+    while flight.shared_count < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert flight.shared_count == 2
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+def test_concurrent_identical_recognitions_send_one_request():
+    with StubOCRServer(content="same", latency=0.3) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.recognize(IMAGE_PATH)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [["same"]] * 4
+        assert server.request_count == 1
+
+
+def test_async_client_coalesces_identical_images():
+    async def run():
+        async with AsyncSiliconFlowOCR(api_key="sk-test", base_url=server.base_url) as client:
+            return await client.recognize_many([IMAGE_PATH] * 3)
+
+    with StubOCRServer(content="same", latency=0.1) as server:
+        assert asyncio.run(run()) == [["same"]] * 3
+        assert server.request_count == 1
@@ -0,0 +1,125 @@
+import os
+
+from PIL import Image
+
+from screenshot_ocr.errors import CircuitOpenError, OCRRequestError
+from screenshot_ocr.spool import JobSpool, SpoolDrainer, is_spoolable
+
+
+def make_capture(tmp_path, name):
+    path = tmp_path / f"{name}.png"
+    Image.new("RGB", (40, 20), "white").save(path)
+    return str(path)
+
+
+def test_spool_survives_restart_and_batches_completion_fsyncs(tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    spool = JobSpool(spool_dir, sync_batch=3, sync_interval=60)
+    jobs = [spool.enqueue(make_capture(tmp_path, f"c{index}"), metadata={"index": index}) for index in range(4)]
+    assert spool.fsync_count == 4
+
+    spool.mark_done(jobs[0].job_id, ["第一张"])
+    spool.mark_done(jobs[1].job_id, ["第二张"])
+    assert spool.fsync_count == 4
+    assert os.path.exists(jobs[0].image_path)
+    spool.mark_failed(jobs[2].job_id, "timeout")
+    assert spool.fsync_count == 5
+    assert not os.path.exists(jobs[0].image_path)
+
+    reopened = JobSpool(spool_dir)
+    pending = reopened.pending()
+    assert [job.job_id for job in pending] == [jobs[2].job_id, jobs[3].job_id]
+    assert pending[0].attempts == 1 and pending[0].metadata == {"index": 2}
+    assert [job.lines for job in reopened.completed()] == [["第一张"], ["第二张"]]
+
+    reopened.compact()
+    assert [job.job_id for job in JobSpool(spool_dir).pending()] == [jobs[2].job_id, jobs[3].job_id]
+
+
+def test_journal_is_compacted_while_running(tmp_path):
+    spool = JobSpool(str(tmp_path / "spool"), compact_after=3, keep_history=1)
+    jobs = [spool.enqueue(make_capture(tmp_path, f"c{index}")) for index in range(4)]
+    spool.mark_done(jobs[0].job_id, ["a"])
+    spool.drop(jobs[1].job_id)
+    spool.mark_done(jobs[2].job_id, ["c"])
+
+    with open(spool.journal_path, encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+    spool.mark_done(jobs[3].job_id, ["d"])
+    assert [job.lines for job in JobSpool(spool.directory).completed()] == [["c"], ["d"]]
+
+
+def test_drainer_logs_errors_outside_recognition(tmp_path, monkeypatch, capsys):
+    spool = JobSpool(str(tmp_path / "spool"))
+    spool.enqueue(make_capture(tmp_path, "c0"))
+
+    def broken_mark_done(job_id, lines):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(spool, "mark_done", broken_mark_done)
+    SpoolDrainer(spool, lambda path: ["text"]).drain()
+
+    assert "disk full" in capsys.readouterr().out
+
+
+def test_drainer_waits_for_health_and_stops_on_outage(tmp_path):
+    spool = JobSpool(str(tmp_path / "spool"))
+    for index in range(4):
+        spool.enqueue(make_capture(tmp_path, f"c{index}"))
+    healthy = {"value": False}
+    calls = []
+    delivered = []
+
+    def recognize(image_path):
+        calls.append(image_path)
+        if len(calls) == 2:
+            raise OCRRequestError("API 连接失败", retryable=True)
+        return [f"text {len(calls)}"]
+
+    drainer = SpoolDrainer(
+        spool,
+        recognize,
+        health_check=lambda: healthy["value"],
+        concurrency=1,
+        on_drained=delivered.append,
+    )
+
+    assert drainer.drain().skipped == 4 and calls == []
+
+    healthy["value"] = True
+    report = drainer.drain()
+    assert (len(report.done), report.failed, report.skipped) == (1, 1, 2)
+    assert len(spool) == 3 and delivered == [report]
+
+    report = drainer.drain()
+    assert len(report.done) == 3 and len(spool) == 0
+
+
+def test_permanent_failures_are_dropped_after_max_attempts(tmp_path):
+    assert is_spoolable(CircuitOpenError("熔断中"))
+    assert is_spoolable(OCRRequestError("busy", status_code=503))
+    assert not is_spoolable(OCRRequestError("bad request", status_code=400))
+    assert not is_spoolable(ValueError("bug"))
+
+    spool = JobSpool(str(tmp_path / "spool"))
+    job = spool.enqueue(make_capture(tmp_path, "bad"))
+
+    def reject(image_path):
+        raise OCRRequestError("bad request", status_code=400)
+
+    drainer = SpoolDrainer(spool, reject, max_attempts=2)
+    assert drainer.drain().failed == 1
+    assert drainer.drain().dropped == 1
+    assert len(spool) == 0 and not os.path.exists(job.image_path)
+
+
+def test_drained_results_are_appended_to_the_results_file(tmp_path):
+    spool = JobSpool(str(tmp_path / "spool"))
+    jobs = [spool.enqueue(make_capture(tmp_path, f"c{index}"), metadata={"captured_at": 0}) for index in range(3)]
+    done = [spool.mark_done(jobs[0].job_id, ["第一行", "第二行"]), spool.mark_done(jobs[1].job_id, [])]
+
+    assert spool.export_results(done) == 1
+    assert spool.export_results([spool.mark_done(jobs[2].job_id, ["第三张"])]) == 1
+    with open(spool.results_path, encoding="utf-8") as file:
+        text = file.read()
+    assert text.count("# 截图时间") == 2 and "第一行\n第二行\n\n" in text and text.endswith("第三张\n\n")
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from screenshot_ocr.errors import OCRRequestError
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.streaming import LineAssembler, iter_content_deltas, iter_sse_data
+from screenshot_ocr.stub_server import StubOCRServer
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "test2.png")
+
+
+def test_iter_sse_data_joins_fields_and_stops_at_done():
+    lines = [
+        b": keep-alive",
+        b"data: {\"a\": 1}",
+        b"",
+        "data: first".encode("utf-8"),
+        b"data: second",
+        b"",
+        b"data: [DONE]",
+        b"",
+        b"data: ignored",
+        b"",
+    ]
+
+    assert list(iter_sse_data(lines)) == ['{"a": 1}', "first\nsecond"]
+
+
+def test_iter_content_deltas_reads_delta_content_and_raises_on_errors():
+    events = ['{"choices": [{"delta": {"content": "你好"}}]}', '{"choices": [{"delta": {}}]}']
+
+    assert list(iter_content_deltas(events)) == ["你好"]
+    with pytest.raises(OCRRequestError):
+        list(iter_content_deltas(['{"error": {"message": "boom"}}']))
+
+
+def test_line_assembler_releases_complete_lines_only():
+    assembler = LineAssembler()
+
+    assert assembler.feed("ab") == []
+    assert assembler.feed("c\n\n de") == ["abc"]
+    assert assembler.feed("f\ng") == ["def"]
+    assert assembler.flush() == ["g"]
+
+
+def test_recognize_stream_yields_deduplicated_lines_from_stub():
+    with StubOCRServer(content="A\nA\nB B\nC", chunk_size=2) as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url)
+
+        assert list(client.recognize_stream(IMAGE_PATH)) == ["A", "B", "C"]
+        assert server.last_payload["stream"] is True
@@ -0,0 +1,100 @@
+import itertools
+import time
+
+import numpy as np
+from PIL import Image
+
+from screenshot_ocr.backends import OCRBackend
+from screenshot_ocr.ocr_client import PaddleOCRVL
+from screenshot_ocr.results import TextLine
+from screenshot_ocr.tiling import TiledOCRBackend, TilePolicy, merge_overlap, plan_tiles
+
+POLICY = TilePolicy(max_height=1024, max_width=1024, overlap=64, max_workers=8)
+
+
+def striped_capture(width=400, height=5000, pitch=60, bar=20):
+    """Text-like bars, each in its own gray level so a fake OCR can name it."""
+    pixels = np.full((height, width), 255, dtype=np.uint8)
+    for index, top in enumerate(range(10, height - bar, pitch)):
+        pixels[top:top + bar, 5:width - 5] = index
+    return Image.fromarray(pixels)
+
+
+class BarOCRBackend(OCRBackend):
+    """Reads each bar's gray level as a line, taking ``latency`` per image like a server.
+
+    A bar cut by the image edge reads as garbage, as a half line would.
+    """
+
+    name = "bars"
+
+    def __init__(self, latency=0.0, bar=20):
+        self.latency = latency
+        self.bar = bar
+
+    def recognize(self, image, model=None):
+        time.sleep(self.latency)
+        column = np.asarray(image.convert("L"))[:, 10].tolist()
+        lines = []
+        for level, rows in itertools.groupby(column):
+            if level != 255:
+                lines.append(f"line {level:03d}" if len(list(rows)) == self.bar else f"~{level}~")
+        return lines
+
+
+def test_tall_captures_are_cut_in_gaps_into_overlapping_bands():
+    image = striped_capture()
+    tiles = plan_tiles(image, POLICY)
+    assert len(tiles) > 4
+    assert all(tile.box[3] - tile.box[1] <= POLICY.max_height for tile in tiles)
+    assert tiles[0].box[1] == 0 and tiles[-1].box[3] == image.height
+    column = np.asarray(image)[:, 10]
+    for upper, lower in zip(tiles, tiles[1:]):
+        # Cuts in a gap get no overlap, so no tile holds part of a bar.
+        assert upper.box[3] == lower.box[1] and column[upper.box[3]] == 255
+    assert not any(text.startswith("~") for tile in tiles for text in BarOCRBackend().recognize(image.crop(tile.box)))
+
+    noise = Image.fromarray(np.random.default_rng(0).integers(0, 256, (3000, 300), dtype=np.uint8))
+    noise_tiles = plan_tiles(noise, POLICY)
+    assert all(tile.box[3] - tile.box[1] <= POLICY.max_height for tile in noise_tiles)
+    assert all(upper.box[3] - lower.box[1] == POLICY.overlap for upper, lower in zip(noise_tiles, noise_tiles[1:]))
+
+    wide = Image.new("L", (3000, 300), 255)
+    wide.paste(0, (10, 100, 1400, 120))
+    wide.paste(0, (1600, 100, 2990, 120))
+    left, right = plan_tiles(wide, TilePolicy(max_width=1600))
+    assert left.box[0] == 0 and 1400 < left.box[2] == right.box[0] < 1600 and right.box[2] == 3000
+    assert (left.column, right.column) == (0, 1)
+    assert len(plan_tiles(wide, TilePolicy(max_width=1024))) == 1
+    assert plan_tiles(Image.new("L", (800, 600)), POLICY)[0].box == (0, 0, 800, 600)
+
+
+def test_overlap_duplicates_and_fragments_are_merged_once():
+    lines = lambda *texts: [TextLine(text) for text in texts]
+    merged = merge_overlap(
+        lines("intro", "line 080 alpha", "line 082 beta", "line 084 ga"),
+        lines("line 084 gamma", "line 086 delta"),
+    )
+    assert [line.content for line in merged] == ["intro", "line 080 alpha", "line 082 beta", "line 084 gamma", "line 086 delta"]
+
+    merged = merge_overlap(lines("line 080", "line 081", "line 082"), lines("line 082", "line 083"))
+    assert [line.content for line in merged] == ["line 080", "line 081", "line 082", "line 083"]
+    merged = merge_overlap(lines("total 120 items"), lines("tota1 120 items", "next"))
+    assert [line.content for line in merged] == ["total 120 items", "next"]
+    assert len(merge_overlap(lines("a", "b"), lines("c", "d"))) == 4
+
+
+def test_tiles_are_recognised_concurrently_and_stitched_in_order():
+    image = striped_capture()
+    expected = BarOCRBackend().recognize(image)
+    tiled = TiledOCRBackend(BarOCRBackend(latency=0.2), POLICY)
+
+    started_at = time.perf_counter()
+    result = tiled.recognize_result(image)
+    elapsed = time.perf_counter() - started_at
+    assert result.texts == expected
+    assert len(plan_tiles(image, POLICY)) * 0.2 > 2 * elapsed
+
+    pipeline = PaddleOCRVL(vl_rec_backend="fake", vl_rec_tile_policy=POLICY)
+    assert isinstance(pipeline.backend, TiledOCRBackend)
+    assert list(pipeline.predict_stream(Image.new("RGB", (200, 100), "white"))) == ["fake text"]
@@ -0,0 +1,39 @@
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.stub_server import StubOCRServer
+from screenshot_ocr.transport import HTTPTransport
+
+
+def test_pooled_transport_reuses_one_connection():
+    with StubOCRServer(content="hello") as server, HTTPTransport() as transport:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, transport=transport)
+        payload = client._build_payload("")
+
+        for _ in range(3):
+            assert client._parse_response(client._request(payload)) == ["hello"]
+
+        assert server.request_count == 3
+        assert server.connection_count == 1
+
+
+def test_transport_without_keep_alive_opens_a_connection_per_request():
+    with StubOCRServer() as server, HTTPTransport(keep_alive=False) as transport:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, transport=transport)
+        payload = client._build_payload("")
+
+        client._request(payload)
+        client._request(payload)
+
+        assert server.connection_count == 2
+
+
+def test_connect_warms_the_proxy_connection_a_proxied_request_reuses(monkeypatch):
+    for name in ("NO_PROXY", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    with StubOCRServer(content="via proxy") as proxy, HTTPTransport() as transport:
+        monkeypatch.setenv("HTTP_PROXY", proxy.base_url.rsplit("/", 1)[0])
+        assert transport.connect("http://ocr.invalid/v1")
+        assert (proxy.connection_count, proxy.request_count) == (1, 0)
+
+        client = SiliconFlowOCR(api_key="sk-test", base_url="http://ocr.invalid/v1", transport=transport)
+        assert client._parse_response(client._request(client._build_payload(""))) == ["via proxy"]
+        assert proxy.connection_count == 1
@@ -1,8 +1,32 @@
 import queue
 
+import pytest
+
+from config.ocr_config import OCRConfig
+from screenshot_ocr import tray_app
 from screenshot_ocr.tray_app import HotkeyOCR
 
 
+class StreamingService:
+    def __init__(self, lines, error=None):
+        self.lines = lines
+        self.error = error
+
+    def recognize_file_stream(self, image):
+        yield from self.lines
+        if self.error is not None:
+            raise self.error
+
+
+def make_streaming_app(monkeypatch, service, clipboard):
+    monkeypatch.setattr(tray_app.pyperclip, "copy", clipboard.append)
+    monkeypatch.setattr(tray_app.pyperclip, "paste", lambda: clipboard[0])
+    app = object.__new__(HotkeyOCR)
+    app.ui_queue = queue.Queue()
+    app.ocr_service = service
+    return app
+
+
 def test_queue_status_adds_status_task():
     app = object.__new__(HotkeyOCR)
     app.ui_queue = queue.Queue()
@@ -14,3 +38,22 @@ def test_queue_status_adds_status_task():
     assert data["message"] == "正在识别..."
     assert data["duration_ms"] is None
     assert data["level"] == "info"
+
+
+def test_streamed_lines_update_the_clipboard_at_most_once_per_interval(monkeypatch):
+    monkeypatch.setattr(OCRConfig, "STREAM_CLIPBOARD_INTERVAL", 60.0)
+    clipboard = ["before"]
+    app = make_streaming_app(monkeypatch, StreamingService(["a", "b", "c"]), clipboard)
+
+    assert app._recognize_progressively("capture.png") == ["a", "b", "c"]
+    assert clipboard == ["before", "a"]
+
+
+def test_failed_stream_restores_the_previous_clipboard(monkeypatch):
+    monkeypatch.setattr(OCRConfig, "STREAM_CLIPBOARD_INTERVAL", 0.0)
+    clipboard = ["before"]
+    app = make_streaming_app(monkeypatch, StreamingService(["a", "b"], RuntimeError("cut off")), clipboard)
+
+    with pytest.raises(RuntimeError):
+        app._recognize_progressively("capture.png")
+    assert clipboard[-1] == "before"
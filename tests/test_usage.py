@@ -0,0 +1,121 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from screenshot_ocr.ocr_client import SiliconFlowOCR
+from screenshot_ocr.stub_server import StubOCRServer
+from screenshot_ocr.usage import QuotaExceededError, TokenThrottle, UsageLedger, UsageRecord
+
+NOON = datetime(2026, 3, 2, 12, 0).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now=NOON):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def test_ledger_persists_compact_rows_and_summarizes_by_day_and_model(tmp_path):
+    path = tmp_path / "usage.jsonl"
+    ledger = UsageLedger(str(path))
+    ledger.record(UsageRecord(NOON, "model-a", 100, 20, 4096, 1.5))
+    ledger.record(UsageRecord(NOON + 60, "model-b", 50, 5, 1024, 0.5, ok=False))
+    ledger.record(UsageRecord(NOON + 86400, "model-a", 10, 1, 512, 0.25))
+
+    assert path.read_text(encoding="utf-8").splitlines()[0] == f'[{NOON},"model-a",100,20,4096,1500,1]'
+
+    reloaded = UsageLedger(str(path))
+    day = reloaded.summarize(day="2026-03-02")
+    assert (day.requests, day.errors, day.total_tokens, day.bytes_uploaded) == (2, 1, 175, 5120)
+    assert reloaded.summarize(model="model-a").total_tokens == 131
+    assert sorted(reloaded.summarize_by_day_and_model()) == [
+        ("2026-03-02", "model-a"),
+        ("2026-03-02", "model-b"),
+        ("2026-03-03", "model-a"),
+    ]
+
+    # Raw rows beyond keep_recent are folded into the totals only.
+    bounded = UsageLedger(str(path), keep_recent=1)
+    assert [record.model for record in bounded.records()] == ["model-a"]
+    assert bounded.summarize().requests == 3
+
+
+def test_throttle_waits_for_minute_window_to_free_up():
+    clock = FakeClock()
+    throttle = TokenThrottle(tokens_per_minute=1000, time_module=clock)
+    throttle.record(600)
+    clock.now += 10
+    throttle.record(300)
+
+    assert throttle.acquire(500) == pytest.approx(50)
+    assert clock.now == pytest.approx(NOON + 60)
+    # With the first request expired the budget has plenty of room again.
+    assert throttle.acquire(500) == 0
+
+
+def test_throttle_paces_near_budget_and_rejects_when_daily_quota_is_spent(tmp_path):
+    ledger = UsageLedger()
+    ledger.record(UsageRecord(NOON - 3600, "m", 900, 50))
+    clock = FakeClock()
+    throttle = TokenThrottle(tokens_per_minute=1000, tokens_per_day=1000, ledger=ledger, time_module=clock)
+
+    with pytest.raises(QuotaExceededError):
+        throttle.acquire(100)
+
+    throttle = TokenThrottle(tokens_per_minute=1000, time_module=clock)
+    throttle.record(850)
+    assert throttle.acquire(100) == pytest.approx(6)
+
+
+def test_client_records_usage_and_feeds_throttle(monkeypatch):
+    ledger = UsageLedger()
+    throttle = TokenThrottle(tokens_per_minute=10_000)
+    client = SiliconFlowOCR(api_key="sk-test", model="m", usage_ledger=ledger, throttle=throttle)
+    monkeypatch.setattr(
+        client.transport,
+        "post",
+        lambda *args, **kwargs: FakeResponse(
+            {
+                "choices": [{"message": {"content": "hello"}}],
+                "usage": {"prompt_tokens": 120, "completion_tokens": 7, "total_tokens": 127},
+            }
+        ),
+    )
+
+    client._request(client._build_payload("QUJD"))
+
+    [record] = list(ledger.records())
+    assert (record.model, record.prompt_tokens, record.completion_tokens) == ("m", 120, 7)
+    assert record.bytes_uploaded > len("data:image/png;base64,QUJD")
+    assert throttle.estimate.value == 127
+
+
+def test_stream_usage_is_taken_from_final_chunk():
+    image_path = os.path.join(os.path.dirname(__file__), "test2.png")
+    ledger = UsageLedger()
+    with StubOCRServer(content="alpha\nbeta\n") as server:
+        client = SiliconFlowOCR(api_key="sk-test", base_url=server.base_url, usage_ledger=ledger)
+        assert list(client.recognize_stream(image_path)) == ["alpha", "beta"]
+        assert server.last_payload["stream_options"] == {"include_usage": True}
+
+    [record] = list(ledger.records())
+    assert record.ok and record.completion_tokens == len("alpha\nbeta\n")